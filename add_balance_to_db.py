@@ -1,49 +1,102 @@
+import argparse
 import json
 
+from json_stream import JsonStreamError, JsonStreamReader, stream_transform
+
 # Definisikan path file input dan output
 input_filename = 'final-ca080-default-rtdb-export (2).json'
 output_filename = 'database_with_balance.json'
 
-try:
+
+def add_balance(user_id, user_data):
+    """Menambahkan 'balance: 0.0' ke satu user jika belum ada."""
+    # Periksa apakah user_data adalah dictionary dan belum memiliki 'balance'
+    if isinstance(user_data, dict) and 'balance' not in user_data:
+        print(f"Adding 'balance: 0.0' to user: {user_id}")
+        user_data['balance'] = 0.0
+    return user_data
+
+
+def migrate_in_memory(compact):
+    """Mode lama: memuat seluruh file ke memori, mengubah 'users', lalu menulis semuanya."""
     # Buka dan baca file JSON asli
     with open(input_filename, 'r') as f:
         data = json.load(f)
 
-    # Periksa apakah ada node 'users'
+    # Periksa apakah ada node 'users' (atau 'user' jika ada yang typo)
     if 'users' in data and isinstance(data['users'], dict):
         users_node = data['users']
-        
-        # Iterasi melalui setiap user di dalam node 'users'
-        for user_id, user_data in users_node.items():
-            # Periksa apakah user_data adalah dictionary dan belum memiliki 'balance'
-            if isinstance(user_data, dict) and 'balance' not in user_data:
-                print(f"Adding 'balance: 0.0' to user: {user_id}")
-                user_data['balance'] = 0.0
-    
-    # Periksa apakah ada node 'user' (jika ada yang typo)
     elif 'user' in data and isinstance(data['user'], dict):
         users_node = data['user']
-        
-        # Iterasi melalui setiap user di dalam node 'user'
-        for user_id, user_data in users_node.items():
-            # Periksa apakah user_data adalah dictionary dan belum memiliki 'balance'
-            if isinstance(user_data, dict) and 'balance' not in user_data:
-                print(f"Adding 'balance: 0.0' to user: {user_id}")
-                user_data['balance'] = 0.0
     else:
+        users_node = None
         print("Warning: Node 'users' or 'user' not found or not in expected format.")
 
+    if users_node is not None:
+        # Iterasi melalui setiap user di dalam node
+        for user_id, user_data in users_node.items():
+            add_balance(user_id, user_data)
+
     # Tulis data yang sudah dimodifikasi ke file JSON baru
     with open(output_filename, 'w') as f:
-        # Gunakan indent=4 agar file JSON mudah dibaca
-        json.dump(data, f, indent=4)
-        
+        if compact:
+            json.dump(data, f, separators=(',', ':'))
+        else:
+            # Gunakan indent=4 agar file JSON mudah dibaca
+            json.dump(data, f, indent=4)
+
+
+def find_users_node(json_file_path):
+    """
+    Nama node user yang akan diproses ('users', atau 'user' jika 'users' tidak
+    ada/bukan object), sama seperti mode lama. Node lain hanya dipindai.
+    """
+    objects = set()
+    with open(json_file_path, 'rb') as f:
+        reader = JsonStreamReader(f)
+        reader.read_whitespace()
+        for _, _, key, _ in reader.iter_object_members():
+            if key in ('users', 'user') and reader.peek() == b'{':
+                objects.add(key)
+            reader.copy_value(lambda chunk: None)
+    for key in ('users', 'user'):
+        if key in objects:
+            return key
+    return None
+
+
+def migrate_streaming(compact):
+    """
+    Mode streaming: hanya child 'users' (atau 'user') yang di-parse, satu per
+    satu. Node lain (terutama 'orders') disalin byte demi byte, jadi memori tetap
+    datar berapa pun ukuran file export.
+    """
+    users_key = find_users_node(input_filename)
+    if users_key is None:
+        print("Warning: Node 'users' or 'user' not found or not in expected format.")
+    transforms = {users_key: add_balance} if users_key else {}
+    stream_transform(input_filename, output_filename, transforms, compact=compact)
+
+
+parser = argparse.ArgumentParser(description="Tambahkan 'balance: 0.0' ke setiap user.")
+parser.add_argument('--stream', action='store_true',
+                    help="proses file secara streaming (memori konstan)")
+parser.add_argument('--compact', action='store_true',
+                    help="tulis JSON tanpa whitespace (file lebih kecil)")
+args = parser.parse_args()
+
+try:
+    if args.stream:
+        migrate_streaming(args.compact)
+    else:
+        migrate_in_memory(args.compact)
+
     print(f"\nSuccessfully processed the file.")
     print(f"Updated data has been saved to: {output_filename}")
 
 except FileNotFoundError:
     print(f"Error: The file '{input_filename}' was not found.")
-except json.JSONDecodeError:
+except (json.JSONDecodeError, JsonStreamError):
     print(f"Error: The file '{input_filename}' is not a valid JSON file.")
 except Exception as e:
     print(f"An unexpected error occurred: {e}")
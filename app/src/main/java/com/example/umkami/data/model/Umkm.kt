@@ -9,6 +9,7 @@ data class Umkm(
     var category: String = "", // misal: makanan, jasa, minuman
     var address: String = "",
     var imageUrl: String = "", // Untuk dimuat oleh Coil di HomeScreen.kt
+    var imageThumbUrl: String = "", // Versi kecil (WebP) untuk kartu daftar, dari optimize_images.py
     var lat: Double = 0.0, // Atau String/Float, tergantung tipe data di JSON Anda
     var lng: Double = 0.0,
     var contact: String = "", // New field for contact number
@@ -27,6 +27,50 @@ class UmkmRepository {
     private val dbCarts = dbRoot.child("carts")
     private val dbWishlist = dbRoot.child("wishlist")
 
+    // Penanda UMKM yang review/menu/layanannya berubah, dibaca oleh
+    // materialize_summary.py agar hanya ringkasan UMKM tersebut yang dihitung ulang.
+    private fun summaryDirtyPath(umkmId: String) = "umkm_summary_dirty/$umkmId"
+
+    // Index lokasi geo_index/<geohash>/<umkmId> = {lat, lng}, sama dengan
+    // geo_index.py (presisi INDEX_PRECISION = 6 karakter).
+    private val geohashBase32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+    private val geoIndexPrecision = 6
+
+    private fun encodeGeohash(lat: Double, lng: Double): String {
+        var latMin = -90.0
+        var latMax = 90.0
+        var lngMin = -180.0
+        var lngMax = 180.0
+        val hash = StringBuilder()
+        var bits = 0
+        var value = 0
+        var even = true
+        while (hash.length < geoIndexPrecision) {
+            value = value shl 1
+            if (even) {
+                val middle = (lngMin + lngMax) / 2
+                if (lng >= middle) { value = value or 1; lngMin = middle } else lngMax = middle
+            } else {
+                val middle = (latMin + latMax) / 2
+                if (lat >= middle) { value = value or 1; latMin = middle } else latMax = middle
+            }
+            even = !even
+            bits++
+            if (bits == 5) {
+                hash.append(geohashBase32[value])
+                bits = 0
+                value = 0
+            }
+        }
+        return hash.toString()
+    }
+
+    private fun geoCell(lat: Double?, lng: Double?): String? {
+        if (lat == null || lng == null) return null
+        if (lat !in -90.0..90.0 || lng !in -180.0..180.0) return null
+        return encodeGeohash(lat, lng)
+    }
+
     // ============================================================
     // 1. Ambil semua UMKM
     // ============================================================
@@ -129,7 +173,11 @@ class UmkmRepository {
     // ============================================================
     suspend fun addReview(umkmId: String, review: Review): Boolean {
         return try {
-            dbReviews.child(umkmId).push().setValue(review).await()
+            val reviewKey = dbReviews.child(umkmId).push().key ?: return false
+            dbRoot.updateChildren(mapOf(
+                "reviews/$umkmId/$reviewKey" to review,
+                summaryDirtyPath(umkmId) to ServerValue.TIMESTAMP
+            )).await()
             true
         } catch (e: Exception) {
             Log.e("UmkmRepository", "Error adding review: $e")
@@ -209,8 +257,27 @@ class UmkmRepository {
                 umkmToSave.id = umkmId
             }
 
-            dbUmkm.child(umkmId).setValue(umkmToSave).await()
-            dbUsers.child(userId).child("umkmId").setValue(umkmId).await()
+            // Sel lama dibaca dulu supaya entri geo_index yang pindah ikut dihapus.
+            val oldSnapshot = dbUmkm.child(umkmId).get().await()
+            val oldCell = geoCell(
+                (oldSnapshot.child("lat").value as? Number)?.toDouble(),
+                (oldSnapshot.child("lng").value as? Number)?.toDouble()
+            )
+            val newCell = geoCell(umkmToSave.lat, umkmToSave.lng)
+
+            // UMKM, pemilik, dan geo_index ditulis dalam satu update atomik.
+            val updates = mutableMapOf<String, Any?>(
+                "umkm/$umkmId" to umkmToSave,
+                "users/$userId/umkmId" to umkmId
+            )
+            if (oldCell != null && oldCell != newCell) {
+                updates["geo_index/$oldCell/$umkmId"] = null
+            }
+            if (newCell != null) {
+                updates["geo_index/$newCell/$umkmId"] =
+                    mapOf("lat" to umkmToSave.lat, "lng" to umkmToSave.lng)
+            }
+            dbRoot.updateChildren(updates).await()
             umkmId
         } catch (e: Exception) {
             Log.e("UmkmRepository", "Error saving UMKM: $e")
@@ -295,7 +362,10 @@ class UmkmRepository {
 
     suspend fun saveMenu(umkmId: String, menu: List<MenuItem>): Boolean {
         return try {
-            dbMenu.child(umkmId).setValue(menu).await()
+            dbRoot.updateChildren(mapOf(
+                "umkm_menu/$umkmId" to menu,
+                summaryDirtyPath(umkmId) to ServerValue.TIMESTAMP
+            )).await()
             true
         } catch (e: Exception) {
             Log.e("UmkmRepository", "Error saving menu: $e")
@@ -305,7 +375,10 @@ class UmkmRepository {
 
     suspend fun saveServices(umkmId: String, services: List<ServiceItem>): Boolean {
         return try {
-            dbService.child(umkmId).setValue(services).await()
+            dbRoot.updateChildren(mapOf(
+                "umkm_services/$umkmId" to services,
+                summaryDirtyPath(umkmId) to ServerValue.TIMESTAMP
+            )).await()
             true
         } catch (e: Exception) {
             Log.e("UmkmRepository", "Error saving services: $e")
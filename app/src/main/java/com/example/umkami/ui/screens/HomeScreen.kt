@@ -194,7 +194,7 @@ fun UmkmItem(umkm: Umkm, onUmkmClick: (String) -> Unit) {
     ) {
         Column {
             AsyncImage(
-                model = umkm.imageUrl,
+                model = umkm.imageThumbUrl.ifBlank { umkm.imageUrl },
                 contentDescription = umkm.name,
                 modifier = Modifier
                     .fillMaxWidth()
@@ -244,7 +244,7 @@ fun RecommendedUmkmItem(umkm: Umkm, onUmkmClick: (String) -> Unit) {
     ) {
         Column {
             AsyncImage(
-                model = umkm.imageUrl,
+                model = umkm.imageThumbUrl.ifBlank { umkm.imageUrl },
                 contentDescription = umkm.name,
                 modifier = Modifier
                     .fillMaxWidth()
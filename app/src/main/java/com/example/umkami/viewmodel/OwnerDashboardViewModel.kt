@@ -182,8 +182,8 @@ class OwnerDashboardViewModel : ViewModel() {
                 val uploadTask = storageRef.putFile(imageUri).await()
                 val downloadUrl = uploadTask.storage.downloadUrl.await().toString()
                 _imageUrl.value = downloadUrl
-                // Also update the umkm state if it exists
-                _umkm.value = _umkm.value?.copy(imageUrl = downloadUrl)
+                // Also update the umkm state if it exists; the old optimized thumbnail no longer matches
+                _umkm.value = _umkm.value?.copy(imageUrl = downloadUrl, imageThumbUrl = "")
 
             } catch (e: Exception) {
                 _error.value = "Image upload failed: ${e.message}"
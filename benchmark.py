@@ -0,0 +1,291 @@
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+
+from firebase_emulator import FirebaseEmulator
+from generate_data import SyntheticDatabase, load_template
+from profiling import peak_rss_mb, percentile
+
+# ==============================================================================
+#                BENCHMARK UJI BEBAN SKRIP OPERASIONAL (LOKAL)
+# ==============================================================================
+# Menjalankan jalur upload, update, restore, sync, dan migrasi terhadap
+# emulator lokal (firebase_emulator.py) dengan data sintetis
+# (generate_data.py), lalu melaporkan untuk setiap jalur:
+# - durasi total, jumlah request, dan MB yang dikirim + diterima (untuk
+#   jalur tanpa jaringan seperti migrasi: MB file yang diproses)
+# - throughput (MB/s) dan latensi request p50/p95 (diukur di emulator)
+# - puncak memori (RSS) proses yang menjalankan skrip
+# Setiap skenario berjalan di proses terpisah (spawn) supaya angka memorinya
+# tidak tercampur dengan emulator maupun skenario sebelumnya. Setelah proses
+# anak selesai, hasilnya (data di emulator atau file keluaran) dibaca ulang dan
+# dibandingkan dengan hasil yang diharapkan; skenario yang hasilnya salah
+# dilaporkan sebagai ERROR walaupun skripnya tidak melempar exception.
+# ==============================================================================
+
+# ==============================================================================
+# SKENARIO
+# ==============================================================================
+# Setiap skenario adalah fungsi (url, data_path, work_dir) yang dijalankan di
+# proses anak. Atribut `preload` menentukan apakah emulator diisi data dulu.
+# Skenario tanpa jaringan mengembalikan jumlah byte yang diproses. Atribut
+# `check` adalah fungsi (emulator, document, work_dir) yang dijalankan di
+# proses induk dan melempar AssertionError jika hasilnya tidak sesuai.
+
+def _expect_equal(actual, expected, what):
+    if actual != expected:
+        raise AssertionError(f"{what} tidak sesuai hasil yang diharapkan")
+
+
+def check_database_equals_document(emulator, document, work_dir):
+    """Isi database harus sama persis dengan data sumber."""
+    _expect_equal(emulator.get_data(""), document, "isi database")
+
+
+def scenario_upload_full(url, data_path, work_dir):
+    """upload_to_firebase.py mode lama: satu PUT ke root."""
+    from firebase_client import FirebaseClient
+    with open(data_path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    with FirebaseClient(url) as client:
+        client.put("", document).raise_for_status()
+
+
+def scenario_upload_chunked(url, data_path, work_dir):
+    """upload_to_firebase.py --chunked."""
+    from chunked_upload import file_fingerprint, upload_chunked
+    from firebase_client import FirebaseClient
+    with open(data_path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    with FirebaseClient(url) as client:
+        stats = upload_chunked(client, document, file_fingerprint(data_path, 512 * 1024),
+                               checkpoint_path=os.path.join(work_dir, "checkpoint.json"))
+    if stats["failed"]:
+        raise RuntimeError(f"{stats['failed']} potongan gagal")
+scenario_upload_full.check = check_database_equals_document
+scenario_upload_chunked.check = check_database_equals_document
+
+
+def scenario_update(url, data_path, work_dir):
+    """update_firebase.py: multi-path PATCH untuk 200 UMKM (hapus + tulis ulang)."""
+    import update_firebase
+    from firebase_client import FirebaseClient
+    with FirebaseClient(url) as client:
+        snapshot = {node: client.get(node, params={"orderBy": '"$key"', "limitToFirst": "200"}).json() or {}
+                    for node in update_firebase.NODES}
+        ids = list(snapshot["umkm"])
+        new_data = {node: {umkm_id: entries[umkm_id] for umkm_id in ids if umkm_id in entries}
+                    for node, entries in snapshot.items()}
+        plan = update_firebase.build_update_plan(ids, new_data)
+        if not update_firebase.apply_update_plan(client, plan):
+            raise RuntimeError("update gagal")
+scenario_update.preload = True
+# Entri yang dihapus lalu ditulis ulang dengan isi yang sama: database tidak berubah.
+scenario_update.check = check_database_equals_document
+
+
+def scenario_restore(url, data_path, work_dir):
+    """restore_data.py: satu PATCH katalog ke root."""
+    import restore_data
+    restore_data.FIREBASE_URL = url
+    restore_data.restore_data()
+scenario_restore.preload = True
+
+
+def check_restore(emulator, document, work_dir):
+    from restore_data import RESTORE_DATA
+    for node, value in RESTORE_DATA.items():
+        _expect_equal(emulator.get_data(node), value, f"node '{node}'")
+scenario_restore.check = check_restore
+
+
+def scenario_sync(url, data_path, work_dir):
+    """sync_database.py: diff file lokal (1% order diubah) terhadap data di server."""
+    import sync_database
+    with open(data_path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    for key in list(document["orders"])[::100]:
+        document["orders"][key]["customerName"] = "Pelanggan Baru"
+    local_path = os.path.join(work_dir, "local.json")
+    with open(local_path, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+    sync_database.FIREBASE_URL = url
+    if not sync_database.sync_database(local_path):
+        raise RuntimeError("sync gagal")
+scenario_sync.preload = True
+
+
+def check_sync(emulator, document, work_dir):
+    from geo_index import with_geo_index
+    with open(os.path.join(work_dir, "local.json"), "r", encoding="utf-8") as f:
+        local = with_geo_index(json.load(f))
+    _expect_equal(emulator.get_data(""), local, "isi database")
+scenario_sync.check = check_sync
+
+
+def scenario_migration(url, data_path, work_dir):
+    """migrations.py: semua migrasi terdaftar dalam satu kali jalan (tanpa jaringan)."""
+    import migrations
+    migrations.run_migrations(data_path, os.path.join(work_dir, "migrated.json"))
+    return os.path.getsize(data_path)
+
+
+def check_migration(emulator, document, work_dir):
+    """File hasil harus JSON valid dan sama dengan migrasi yang diterapkan di memori."""
+    import migrations
+    from json_stream import DELETE
+    pending = tuple(migrations.MIGRATIONS)
+    expected = copy.deepcopy(document)
+    for node, children in expected.items():
+        if not isinstance(children, dict):
+            continue
+        for key in list(children):
+            value = migrations._apply_node_migrations(node, pending, key, children[key])
+            if isinstance(value, str) and value == DELETE:
+                del children[key]
+            else:
+                children[key] = value
+
+    with open(os.path.join(work_dir, "migrated.json"), "r", encoding="utf-8") as f:
+        migrated = json.load(f)
+    _expect_equal(sorted(migrated.pop(migrations.VERSION_NODE, {})), sorted(pending),
+                  f"node '{migrations.VERSION_NODE}'")
+    _expect_equal(migrated, expected, "file hasil migrasi")
+scenario_migration.check = check_migration
+
+
+SCENARIOS = {
+    "upload_full": scenario_upload_full,
+    "upload_chunked": scenario_upload_chunked,
+    "update": scenario_update,
+    "restore": scenario_restore,
+    "sync": scenario_sync,
+    "migration": scenario_migration,
+}
+
+
+def _run_child(name, url, data_path, work_dir, results):
+    """Badan proses anak: jalankan skenario, kirim durasi + puncak RSS ke induk."""
+    import builtins
+    import contextlib
+    import io
+    # Pesan progres skrip tidak ikut dicetak agar tabel tetap rapi.
+    builtins.input = lambda prompt="": "y"
+    start = time.perf_counter()
+    error, processed = None, None
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            processed = SCENARIOS[name](url, data_path, work_dir)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    results.put({"seconds": time.perf_counter() - start, "peak_mb": peak_rss_mb(),
+                 "error": error, "processed_bytes": processed})
+
+
+def _wait_for_result(process, results):
+    """Menunggu hasil proses anak; tidak menggantung jika anak mati sebelum melapor."""
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                return {"seconds": 0.0, "peak_mb": None, "processed_bytes": None,
+                        "error": f"proses anak berhenti (exit code {process.exitcode})"}
+
+
+def run_benchmark(data_path, names, repeat=1):
+    """Menjalankan skenario `names` dan mengembalikan list hasil per skenario."""
+    with open(data_path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    with FirebaseEmulator() as emulator, tempfile.TemporaryDirectory() as work_dir:
+        for name in names:
+            for _ in range(repeat):
+                emulator.root = None
+                if getattr(SCENARIOS[name], "preload", False):
+                    emulator.handle("PUT", "", {}, document)
+                log_start = len(emulator.request_log)
+
+                results = context.Queue()
+                process = context.Process(target=_run_child,
+                                          args=(name, emulator.url, data_path, work_dir, results))
+                process.start()
+                outcome = _wait_for_result(process, results)
+                process.join()
+
+                if outcome["error"] is None:
+                    try:
+                        SCENARIOS[name].check(emulator, document, work_dir)
+                    except (AssertionError, ValueError, OSError) as e:
+                        outcome["error"] = f"hasil salah: {e}"
+
+                log = emulator.request_log[log_start:]
+                sent = sum(entry[2] for entry in log) + sum(entry[3] for entry in log)
+                if not log and outcome["processed_bytes"]:
+                    sent = outcome["processed_bytes"]
+                latencies = [entry[4] * 1000 for entry in log]
+                rows.append({
+                    "scenario": name,
+                    "seconds": outcome["seconds"],
+                    "requests": len(log),
+                    "mb": sent / (1024 * 1024),
+                    "mb_per_s": sent / (1024 * 1024) / outcome["seconds"] if outcome["seconds"] else 0.0,
+                    "p50_ms": percentile(latencies, 0.50),
+                    "p95_ms": percentile(latencies, 0.95),
+                    "peak_mb": outcome["peak_mb"],
+                    "error": outcome["error"],
+                })
+    return rows
+
+
+def print_table(rows):
+    header = f"{'skenario':<16}{'detik':>9}{'request':>9}{'MB':>9}{'MB/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        peak = f"{row['peak_mb']:.0f}" if row["peak_mb"] is not None else "n/a"
+        print(f"{row['scenario']:<16}{row['seconds']:>9.2f}{row['requests']:>9}{row['mb']:>9.1f}"
+              f"{row['mb_per_s']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{peak:>9}")
+        if row["error"]:
+            print(f"  ERROR: {row['error']}")
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark skrip operasional terhadap emulator Firebase lokal.",
+        epilog="Contoh: python benchmark.py --orders 100000 --json hasil.json")
+    parser.add_argument("--data", help="file JSON yang dipakai (default: dibuat dari generate_data.py)")
+    parser.add_argument("--umkm", type=int, default=200)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--reviews", type=int, default=5000)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="skenario yang dijalankan (boleh diulang; default: semua)")
+    parser.add_argument("--repeat", type=int, default=1, help="jumlah pengulangan per skenario")
+    parser.add_argument("--json", help="simpan hasil ke file JSON untuk dibandingkan antar versi")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_path = args.data
+        if not data_path:
+            data_path = os.path.join(data_dir, "synthetic.json")
+            size = SyntheticDatabase(load_template(), args.umkm, args.users, args.orders,
+                                     args.reviews).write(data_path)
+            print(f"Data sintetis: {args.orders} order, {args.users} user, {args.reviews} review, "
+                  f"{args.umkm} UMKM ({size / (1024 * 1024):.1f} MB)\n")
+        rows = run_benchmark(data_path, args.scenario or list(SCENARIOS), args.repeat)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nHasil disimpan ke: {args.json}")
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from firebase_client import plan_patch_batches
+
+# ==============================================================================
+#            UNGGAH DATABASE BERTAHAP (CHUNKED, PARALEL, BISA DILANJUT)
+# ==============================================================================
+# Alih-alih satu PUT besar ke root, dokumen dipecah per node lalu per child
+# sampai setiap potongan muat dalam anggaran byte. Potongan-potongan itu
+# dikirim paralel sebagai multi-path PATCH ke root. Setiap potongan yang
+# berhasil dicatat di file checkpoint, sehingga jika proses terputus, menjalankan
+# ulang perintah yang sama hanya mengirim potongan yang belum selesai.
+#
+# Semantik "ganti seluruh database" tetap dipertahankan: child yang ada di
+# server tetapi tidak ada di file lokal ikut dihapus (dibaca lewat shallow GET).
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# Anggaran byte untuk setiap potongan (payload satu PATCH).
+DEFAULT_MAX_CHUNK_BYTES = 512 * 1024
+# Lokasi default file checkpoint.
+DEFAULT_CHECKPOINT_PATH = ".upload_checkpoint.json"
+
+
+def _json_size(value):
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _children(value):
+    """Child dari sebuah node; array diperlakukan seperti object ber-key indeks."""
+    if isinstance(value, dict):
+        return value.items()
+    if isinstance(value, list):
+        return ((str(index), item) for index, item in enumerate(value))
+    return ()
+
+
+def split_document(document, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """
+    Memecah dokumen menjadi (entries, containers).
+    - entries: dict {path: nilai} yang masing-masing muat dalam anggaran
+      (kecuali nilai skalar yang memang tidak bisa dipecah lagi).
+    - containers: list path yang dipecah menjadi child-nya; dipakai untuk
+      mencari child lama di server yang perlu dihapus.
+    Root selalu dipecah minimal per node level pertama.
+    """
+    entries = {}
+    containers = [""]
+    stack = [("", document)]
+    while stack:
+        prefix, node = stack.pop()
+        for key, child in _children(node):
+            path = f"{prefix}/{key}" if prefix else key
+            if _json_size(child) > max_chunk_bytes and isinstance(child, (dict, list)) and child:
+                containers.append(path)
+                stack.append((path, child))
+            else:
+                entries[path] = child
+    return entries, containers
+
+
+def plan_remote_deletions(client, document, containers):
+    """Mengembalikan {path: None} untuk child di server yang tidak ada di dokumen lokal."""
+    deletions = {}
+    for container in containers:
+        local = document
+        for key in filter(None, container.split("/")):
+            local = local[int(key)] if isinstance(local, list) else local[key]
+        local_keys = {key for key, _ in _children(local)}
+
+        response = client.get(container, params={"shallow": "true"})
+        response.raise_for_status()
+        remote = response.json()
+        if not isinstance(remote, dict):
+            continue
+        for key in remote:
+            if key not in local_keys:
+                deletions[f"{container}/{key}" if container else key] = None
+    return deletions
+
+
+def chunk_id(chunk):
+    """ID stabil sebuah potongan, dipakai sebagai kunci di checkpoint."""
+    return hashlib.sha1(json.dumps(chunk, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(checkpoint_path, fingerprint):
+    """Membaca ID potongan yang sudah selesai; checkpoint dari sumber lain diabaikan."""
+    try:
+        with open(checkpoint_path, "r") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+    if checkpoint.get("fingerprint") != fingerprint:
+        return set()
+    return set(checkpoint.get("completed", []))
+
+
+def save_checkpoint(checkpoint_path, fingerprint, completed):
+    """Menulis checkpoint secara atomik (tulis file sementara lalu rename)."""
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"fingerprint": fingerprint, "completed": sorted(completed)}, f)
+    os.replace(temp_path, checkpoint_path)
+
+
+def file_fingerprint(json_file_path, max_chunk_bytes):
+    """Sidik jari file sumber + anggaran byte; checkpoint hanya berlaku untuk kombinasi ini."""
+    digest = hashlib.sha1()
+    with open(json_file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    digest.update(str(max_chunk_bytes).encode("ascii"))
+    return digest.hexdigest()
+
+
+def upload_chunked(client, document, fingerprint, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                   checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """
+    Mengunggah `document` ke root secara bertahap dan paralel.
+    Mengembalikan dict statistik: jumlah potongan, yang dilewati (sudah selesai
+    di run sebelumnya), yang gagal, total byte terkirim, durasi, MB/s, chunk/s.
+    """
+    entries, containers = split_document(document, max_chunk_bytes)
+    deletions = plan_remote_deletions(client, document, containers)
+
+    # Penghapusan dikirim sebagai batch tersendiri supaya ID potongan data
+    # tetap stabil di antara run (checkpoint tidak ikut berubah).
+    chunks = (plan_patch_batches(deletions, max_bytes=max_chunk_bytes)
+              + plan_patch_batches(entries, max_bytes=max_chunk_bytes))
+
+    completed = load_checkpoint(checkpoint_path, fingerprint)
+    pending = [(chunk_id(chunk), chunk) for chunk in chunks]
+    pending = [(cid, chunk) for cid, chunk in pending if cid not in completed]
+    skipped = len(chunks) - len(pending)
+
+    def send(item):
+        cid, chunk = item
+        payload_bytes = _json_size(chunk)
+        return cid, payload_bytes, client.patch("", chunk)
+
+    sent_bytes, failed = 0, 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        futures = [executor.submit(send, item) for item in pending]
+        for future in as_completed(futures):
+            cid, payload_bytes, response = future.result()
+            if response.status_code == 200:
+                sent_bytes += payload_bytes
+                completed.add(cid)
+                save_checkpoint(checkpoint_path, fingerprint, completed)
+            else:
+                failed += 1
+                print(f"  Potongan gagal (Status: {response.status_code}): {response.text}")
+    elapsed = time.perf_counter() - start
+
+    # Semua potongan selesai: checkpoint tidak diperlukan lagi.
+    if failed == 0 and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    uploaded = len(pending) - failed
+    return {
+        "chunks": len(chunks),
+        "skipped": skipped,
+        "uploaded": uploaded,
+        "failed": failed,
+        "bytes": sent_bytes,
+        "seconds": elapsed,
+        "mb_per_s": (sent_bytes / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0,
+        "chunks_per_s": uploaded / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def print_upload_stats(stats):
+    """Mencetak ringkasan hasil upload_chunked()."""
+    print(f"Potongan total    : {stats['chunks']} "
+          f"(dilewati dari checkpoint: {stats['skipped']})")
+    print(f"Potongan terkirim : {stats['uploaded']} (gagal: {stats['failed']})")
+    print(f"Data terkirim     : {stats['bytes'] / (1024 * 1024):.2f} MB "
+          f"dalam {stats['seconds']:.2f} detik")
+    print(f"Throughput        : {stats['mb_per_s']:.2f} MB/s, "
+          f"{stats['chunks_per_s']:.1f} chunk/s")
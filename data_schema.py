@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from json_stream import DEFAULT_BATCH_SIZE, DELETE, JsonStreamReader, stream_transform
+
+# ==============================================================================
+#            SKEMA, VALIDATOR, DAN NORMALIZER REVIEWS / MENU / LAYANAN
+# ==============================================================================
+# Bentuk data di database campur aduk:
+# - reviews/<umkmId>/<key>  : string polos (r1, r2, ...) atau {author, comment, rating}
+# - umkm_menu/<umkmId>      : array item, atau dibungkus {"menu_items": [...]}
+# - umkm_services/<umkmId>  : array item dengan key 'service' atau 'name',
+#                             atau dibungkus {"service_packages": [...]}
+#
+# Bentuk kanonik mengikuti model di aplikasi (Review, MenuItem, ServiceItem):
+#   reviews/<umkmId>/<key>    = {author: str, comment: str, rating: angka}
+#   umkm_menu/<umkmId>        = [{name: str, price: int, ...}]
+#   umkm_services/<umkmId>    = [{service: str, price: int, ...}]
+#
+# Pembungkus yang punya field lain selain list-nya (mis. contact_phone dan
+# operational_hours di umkm_services) tidak dibuka: list di dalamnya
+# dinormalisasi dan field lain tetap di tempatnya agar tidak ada data yang
+# hilang. Validator tetap melaporkannya sampai field tersebut dipindahkan.
+#
+# Validator meng-compile SCHEMA sekali menjadi fungsi pemeriksa, lalu memeriksa
+# file export dalam satu kali baca (streaming, node lain dilewati tanpa
+# di-parse) dan melaporkan error per path. Normalizer menulis ulang file ke
+# bentuk kanonik lewat json_stream, juga tersedia sebagai migrasi
+# '0002_normalize_reviews_catalog' di migrations.py.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# Nilai default sama dengan default di model Kotlin.
+DEFAULT_AUTHOR = "Anonymous"
+# Rating untuk review format lama (string polos), sama seperti di aplikasi.
+LEGACY_REVIEW_RATING = 3.0
+# Jumlah contoh path yang dicetak per jenis error.
+MAX_ERRORS_SHOWN = 5
+
+
+class Value:
+    """Spesifikasi nilai skalar: tipe yang diizinkan plus batas opsional."""
+
+    def __init__(self, types, minimum=None, maximum=None):
+        self.types = types if isinstance(types, tuple) else (types,)
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+REVIEW = {"author": Value(str), "comment": Value(str), "rating": Value((int, float), 0, 5)}
+MENU_ITEM = {"name": Value(str), "price": Value(int, 0)}
+SERVICE_ITEM = {"service": Value(str), "price": Value(int, 0)}
+
+# Skema per child node level pertama. Aturan spesifikasi:
+# - Value(...)        : skalar dengan tipe/batas tertentu
+# - {"*": spec}       : object dengan key bebas, setiap nilai sesuai spec
+# - {"field": spec}   : object dengan field wajib (field lain boleh ada)
+# - [spec]            : array, setiap item sesuai spec
+SCHEMA = {
+    "reviews": {"*": REVIEW},
+    "umkm_menu": [MENU_ITEM],
+    "umkm_services": [SERVICE_ITEM],
+}
+
+
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", bool: "boolean",
+               int: "angka", float: "angka", type(None): "null"}
+# Nama field di skema; dipakai untuk mengelompokkan error per field.
+_FIELD_NAMES = set(REVIEW) | set(MENU_ITEM) | set(SERVICE_ITEM)
+
+
+def _type_name(value):
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def compile_schema(spec):
+    """
+    Mengubah spesifikasi menjadi fungsi check(value, path, errors) yang
+    menambahkan (path, pesan) ke `errors` untuk setiap pelanggaran.
+    """
+    if isinstance(spec, list):
+        check_item = compile_schema(spec[0])
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append((path, f"harus array, bukan {_type_name(value)}"))
+                return
+            for index, item in enumerate(value):
+                check_item(item, f"{path}/{index}", errors)
+        return check_array
+
+    if isinstance(spec, dict) and "*" in spec:
+        check_child = compile_schema(spec["*"])
+
+        def check_map(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append((path, f"harus object, bukan {_type_name(value)}"))
+                return
+            for key, child in value.items():
+                check_child(child, f"{path}/{key}", errors)
+        return check_map
+
+    if isinstance(spec, dict):
+        fields = [(name, compile_schema(field_spec)) for name, field_spec in spec.items()]
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append((path, f"harus object, bukan {_type_name(value)}"))
+                return
+            for name, check_field in fields:
+                if name not in value:
+                    errors.append((f"{path}/{name}", "field wajib tidak ada"))
+                else:
+                    check_field(value[name], f"{path}/{name}", errors)
+        return check_object
+
+    types, minimum, maximum = spec.types, spec.minimum, spec.maximum
+    expected = "/".join(sorted({_TYPE_NAMES[t] for t in types}))
+
+    def check_value(value, path, errors):
+        # bool adalah subclass int di Python, tetapi bukan angka di JSON.
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            errors.append((path, f"harus {expected}, bukan {_type_name(value)}"))
+        elif minimum is not None and value < minimum:
+            errors.append((path, f"minimal {minimum}"))
+        elif maximum is not None and value > maximum:
+            errors.append((path, f"maksimal {maximum}"))
+    return check_value
+
+
+def validate_export(json_file_path, schema=SCHEMA):
+    """
+    Memeriksa file export terhadap `schema` dalam satu kali baca. Hanya child
+    node yang ada di skema yang di-parse, satu per satu. Mengembalikan
+    (jumlah_child_diperiksa, list (path, pesan)).
+    """
+    checks = {node: compile_schema(spec) for node, spec in schema.items()}
+    errors = []
+    checked = 0
+    with open(json_file_path, "rb") as f:
+        reader = JsonStreamReader(f)
+        reader.read_whitespace()
+        for _, _, node, _ in reader.iter_object_members():
+            check = checks.get(node)
+            if check is None:
+                reader.copy_value(lambda chunk: None)
+            elif reader.peek() != b"{":
+                value = json.loads(reader.read_value_bytes())
+                errors.append((node, f"harus object, bukan {_type_name(value)}"))
+            else:
+                for _, _, key, _ in reader.iter_object_members():
+                    check(json.loads(reader.read_value_bytes()), f"{node}/{key}", errors)
+                    checked += 1
+    return checked, errors
+
+
+def print_errors(errors, limit=MAX_ERRORS_SHOWN):
+    """Mencetak error dikelompokkan per jenis (pesan + pola path)."""
+    groups = Counter()
+    examples = {}
+    for path, message in errors:
+        # Pola: id UMKM, key review, dan indeks array diganti '*'.
+        segments = path.split("/")
+        pattern = "/".join(segments[:1] + [segment if segment in _FIELD_NAMES else "*"
+                                           for segment in segments[1:]])
+        groups[(pattern, message)] += 1
+        shown = examples.setdefault((pattern, message), [])
+        if len(shown) < limit:
+            shown.append(path)
+    for (pattern, message), count in groups.most_common():
+        print(f"  {count:>7}x  {pattern}: {message}")
+        for path in examples[(pattern, message)]:
+            print(f"             - {path}")
+
+
+# ==============================================================================
+# NORMALIZER (BENTUK LAMA -> BENTUK KANONIK)
+# ==============================================================================
+# Fungsi normalize_* menerima (umkmId, nilai child) dan mengembalikan nilai
+# kanonik, sehingga bisa langsung dipakai sebagai transformasi stream_transform.
+
+def _as_list(value):
+    """Array Firebase bisa tersimpan sebagai object ber-key indeks."""
+    if isinstance(value, dict):
+        return [value[key] for key in sorted(value, key=lambda k: int(k) if k.isdigit() else -1)]
+    return value if isinstance(value, list) else []
+
+
+def _to_number(value, default=0):
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        return default
+
+
+# Harga format Indonesia: titik pemisah ribuan, koma desimal ("15.000", "1.250,50").
+_GROUPED_PRICE = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?")
+_CURRENCY_PREFIX = re.compile(r"^rp\.?\s*", re.IGNORECASE)
+
+
+def _to_price(value):
+    if isinstance(value, str):
+        value = _CURRENCY_PREFIX.sub("", value.strip())
+        if _GROUPED_PRICE.fullmatch(value):
+            value = value.replace(".", "").replace(",", ".")
+    return int(round(_to_number(value)))
+
+
+def normalize_review(review):
+    """Satu review ke bentuk {author, comment, rating}; None jika tidak bisa dipakai."""
+    if isinstance(review, str):
+        return {"author": DEFAULT_AUTHOR, "comment": review, "rating": LEGACY_REVIEW_RATING}
+    if not isinstance(review, dict):
+        return None
+    normalized = dict(review)
+    if not isinstance(normalized.get("author"), str):
+        normalized["author"] = DEFAULT_AUTHOR
+    if not isinstance(normalized.get("comment"), str):
+        normalized["comment"] = ""
+    normalized["rating"] = min(5.0, max(0.0, float(_to_number(normalized.get("rating"), 0.0))))
+    return normalized
+
+
+def normalize_reviews(umkm_id, reviews):
+    if isinstance(reviews, list):
+        reviews = {str(index): review for index, review in enumerate(reviews)}
+    if not isinstance(reviews, dict):
+        return DELETE
+    normalized = {}
+    for key, review in reviews.items():
+        review = normalize_review(review)
+        if review is not None:
+            normalized[key] = review
+    return normalized or DELETE
+
+
+def _normalize_items(items, name_field, aliases):
+    normalized = []
+    for item in _as_list(items):
+        if not isinstance(item, dict):
+            continue
+        item = dict(item)
+        for alias in aliases:
+            if name_field not in item and isinstance(item.get(alias), str):
+                item[name_field] = item.pop(alias)
+        if not isinstance(item.get(name_field), str):
+            item[name_field] = ""
+        item["price"] = _to_price(item.get("price"))
+        normalized.append(item)
+    return normalized or DELETE
+
+
+def _normalize_wrapped(value, list_field, name_field, aliases):
+    """
+    Membuka pembungkus {list_field: [...]} menjadi array kanonik. Jika pembungkus
+    punya field lain, pembungkusnya dipertahankan dan hanya list-nya yang
+    dinormalisasi.
+    """
+    if not isinstance(value, dict) or list_field not in value:
+        return _normalize_items(value, name_field, aliases)
+    items = _normalize_items(value[list_field], name_field, aliases)
+    if set(value) == {list_field}:
+        return items
+    return dict(value, **{list_field: [] if isinstance(items, str) and items == DELETE else items})
+
+
+def normalize_menu(umkm_id, menu):
+    return _normalize_wrapped(menu, "menu_items", "name", ["menu", "item"])
+
+
+def normalize_services(umkm_id, services):
+    return _normalize_wrapped(services, "service_packages", "service", ["name"])
+
+
+NORMALIZERS = {
+    "reviews": normalize_reviews,
+    "umkm_menu": normalize_menu,
+    "umkm_services": normalize_services,
+}
+
+
+def normalize_export(input_path, output_path, compact=False, workers=1,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    """Menulis ulang file ke bentuk kanonik secara streaming; mengembalikan {node: berubah}."""
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        return stream_transform(input_path, output_path, NORMALIZERS, compact=compact,
+                                executor=executor, workers=workers, batch_size=batch_size)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validasi (dan normalisasi) bentuk reviews, umkm_menu, dan umkm_services.",
+        epilog="Contoh: python data_schema.py umkm.json --normalize umkm_normalized.json")
+    parser.add_argument("json_file", help="file export JSON yang diperiksa")
+    parser.add_argument("--normalize", metavar="OUTPUT_FILE",
+                        help="tulis versi kanonik ke file ini lalu validasi hasilnya")
+    parser.add_argument("--compact", action="store_true", help="tulis JSON tanpa whitespace")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="jumlah proses untuk normalisasi node besar (default: 1)")
+    args = parser.parse_args()
+
+    if args.normalize:
+        start = time.perf_counter()
+        changed = normalize_export(args.json_file, args.normalize, args.compact, args.workers)
+        print(f"Normalisasi selesai dalam {time.perf_counter() - start:.2f} detik "
+              f"({os.path.getsize(args.normalize) / 1024:.1f} KB):")
+        for node in sorted(changed):
+            print(f"  {node}: {changed[node]} child berubah")
+        print()
+
+    target = args.normalize or args.json_file
+    start = time.perf_counter()
+    checked, errors = validate_export(target)
+    print(f"'{target}': {checked} child diperiksa dalam {time.perf_counter() - start:.2f} detik, "
+          f"{len(errors)} error.")
+    print_errors(errors)
@@ -0,0 +1,488 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from firebase_client import FirebaseClient
+
+# ==============================================================================
+#          MIRROR DATABASE LOKAL YANG SELALU TERBARU (STREAM REST FIREBASE)
+# ==============================================================================
+# Proses jangka panjang yang membuka stream REST Firebase
+# (Accept: text/event-stream). Event 'put' pertama berisi seluruh database
+# (muatan awal); setelah itu setiap event put/patch diterapkan ke store SQLite
+# lokal (mirror.db), sehingga skrip lain bisa membaca data terkini dalam
+# milidetik tanpa mengunduh ulang tree dari Firebase.
+#
+# Store menyimpan satu baris per child node level pertama (mis. umkm/umkm4,
+# orders/<id>), sama seperti blob di snapshot_store.py. Setiap event menaikkan
+# nomor revisi dan mencatat nilai lama baris yang berubah (riwayat), sehingga
+# data bisa dibaca persis seperti pada revisi mana pun yang masih disimpan
+# (snapshot-at-revision), atau dibekukan ke snapshot_store.py.
+#
+# Jika koneksi putus, stream dibuka ulang; put '/' pertamanya dibandingkan
+# per baris dengan isi store, jadi hanya baris yang berubah yang ditulis.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# File store mirror.
+MIRROR_DB = "mirror.db"
+# Stream dianggap putus jika tidak ada data (termasuk keep-alive) selama ini.
+STREAM_READ_TIMEOUT = 90
+# Jeda sebelum membuka ulang stream (detik), naik dua kali lipat sampai maksimum.
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+# Jumlah revisi terakhir yang riwayatnya disimpan (None = semua).
+KEEP_REVISIONS = 100000
+# Selang (detik) pengecekan `stop` selama stream menunggu data.
+STOP_POLL_INTERVAL = 0.2
+
+# Key child untuk nilai skalar di level pertama (key Firebase tidak bisa kosong).
+_SCALAR = ""
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _split(path):
+    return [segment for segment in path.strip("/").split("/") if segment]
+
+
+def _normalize(value):
+    """Bentuk penyimpanan Firebase: array -> object ber-key indeks, node kosong dibuang."""
+    if isinstance(value, list):
+        value = {str(index): item for index, item in enumerate(value)}
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            child = _normalize(child)
+            if child is not None:
+                result[str(key)] = child
+        return result or None
+    return value
+
+
+def _export(value):
+    """Seperti respons GET Firebase: object ber-key indeks yang cukup padat menjadi array."""
+    if not isinstance(value, dict):
+        return value
+    exported = {key: _export(child) for key, child in value.items()}
+    if exported and all(key.isdigit() and key == str(int(key)) for key in exported):
+        indices = [int(key) for key in exported]
+        if max(indices) < 2 * len(indices):
+            array = [None] * (max(indices) + 1)
+            for index in indices:
+                array[index] = exported[str(index)]
+            return array
+    return exported
+
+
+def _set_in(value, segments, new_value):
+    """Salinan `value` (bentuk ternormalisasi) dengan `segments` diganti `new_value`."""
+    if not segments:
+        return _normalize(new_value)
+    node = dict(value) if isinstance(value, dict) else {}
+    child = _set_in(node.get(segments[0]), segments[1:], new_value)
+    if child is None:
+        node.pop(segments[0], None)
+    else:
+        node[segments[0]] = child
+    return node or None
+
+
+def _descend(value, segments):
+    for segment in segments:
+        if not isinstance(value, dict) or segment not in value:
+            return None
+        value = value[segment]
+    return value
+
+
+def _replace_rows(current, desired):
+    """Perubahan baris yang mengganti seluruh `current` dengan `desired`."""
+    changes = {key: None for key, value in current.items() if value is not None and key not in desired}
+    changes.update({key: value for key, value in desired.items() if current.get(key) != value})
+    return changes
+
+
+class MirrorStore:
+    """Store SQLite: baris (node, child) terkini + riwayat nilai lama per revisi."""
+
+    def __init__(self, path=MIRROR_DB):
+        self.path = path
+        # check_same_thread=False: penulis stream dan pembaca boleh di thread berbeda;
+        # akses dijaga oleh self.lock.
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (node TEXT, child TEXT, value TEXT NOT NULL,
+                                             PRIMARY KEY (node, child));
+            CREATE TABLE IF NOT EXISTS history (revision INTEGER, node TEXT, child TEXT,
+                                                old_value TEXT);
+            CREATE INDEX IF NOT EXISTS history_row ON history (node, child, revision);
+            CREATE TABLE IF NOT EXISTS revisions (revision INTEGER PRIMARY KEY, received REAL,
+                                                  event TEXT, path TEXT, changed_rows INTEGER);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def revision(self):
+        """Revisi terakhir yang diterapkan (0 jika store masih kosong)."""
+        row = self.db.execute("SELECT MAX(revision) FROM revisions").fetchone()
+        return row[0] or 0
+
+    # --- Menerapkan event ---
+
+    def _current_rows(self, node=None, children=None):
+        if node is None:
+            cursor = self.db.execute("SELECT node, child, value FROM rows")
+        elif children is None:
+            cursor = self.db.execute("SELECT node, child, value FROM rows WHERE node = ?", (node,))
+        else:
+            cursor = self.db.execute(
+                f"SELECT node, child, value FROM rows WHERE node = ? AND child IN "
+                f"({', '.join('?' * len(children))})", [node, *children])
+        return {(row_node, child): value for row_node, child, value in cursor}
+
+    def _rows_of(self, node, value):
+        """Baris untuk seluruh nilai satu node level pertama."""
+        value = _normalize(value)
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            return {(node, _SCALAR): _canonical(value)}
+        return {(node, child): _canonical(child_value) for child, child_value in value.items()}
+
+    def _plan_put(self, segments, data, pending):
+        """Perubahan baris {(node, child): nilai_baru atau None} untuk satu put."""
+        if not segments:
+            root = _normalize(data)
+            if not isinstance(root, dict):
+                root = {}
+            current = self._current_rows()
+            current.update(pending)
+            desired = {}
+            for node, value in root.items():
+                desired.update(self._rows_of(node, value))
+            return _replace_rows(current, desired)
+
+        node = segments[0]
+        # Put di bawah satu child cukup membaca baris child itu (dan baris skalar node).
+        children = None if len(segments) == 1 else [segments[1], _SCALAR]
+        current = self._current_rows(node, children)
+        current.update({key: value for key, value in pending.items()
+                        if key[0] == node and (children is None or key[1] in children)})
+        if len(segments) == 1:
+            return _replace_rows(current, self._rows_of(node, data))
+
+        child = segments[1]
+        changes = {}
+        if current.get((node, _SCALAR)) is not None:
+            # Node yang tadinya skalar menjadi object.
+            changes[(node, _SCALAR)] = None
+        old = current.get((node, child))
+        new = _set_in(json.loads(old) if old is not None else None, segments[2:], data)
+        new = _canonical(new) if new is not None else None
+        if new != old:
+            changes[(node, child)] = new
+        return changes
+
+    def apply_event(self, event, path, data, received=None):
+        """
+        Menerapkan satu event stream ('put' atau 'patch') sebagai satu revisi.
+        Mengembalikan nomor revisi baru, atau None jika tidak ada baris berubah.
+        """
+        segments = _split(path)
+        if event == "put":
+            updates = [(segments, data)]
+        elif event == "patch":
+            updates = [(segments + _split(key), value) for key, value in (data or {}).items()]
+        else:
+            raise ValueError(f"Event '{event}' tidak dikenal.")
+
+        with self.lock:
+            pending = {}
+            for update_segments, value in updates:
+                pending.update(self._plan_put(update_segments, value, pending))
+            current = {}
+            for node, child in pending:
+                row = self.db.execute("SELECT value FROM rows WHERE node = ? AND child = ?",
+                                      (node, child)).fetchone()
+                current[(node, child)] = row[0] if row else None
+            changed = {key: value for key, value in pending.items() if current[key] != value}
+            if not changed:
+                return None
+
+            revision = self.revision + 1
+            with self.db:
+                self.db.execute("INSERT INTO revisions VALUES (?, ?, ?, ?, ?)",
+                                (revision, received or time.time(), event, "/" + "/".join(segments),
+                                 len(changed)))
+                self.db.executemany("INSERT INTO history VALUES (?, ?, ?, ?)",
+                                    [(revision, node, child, current[(node, child)])
+                                     for node, child in changed])
+                self.db.executemany("DELETE FROM rows WHERE node = ? AND child = ?",
+                                    [key for key, value in changed.items() if value is None])
+                self.db.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?)",
+                                    [(node, child, value) for (node, child), value in changed.items()
+                                     if value is not None])
+            return revision
+
+    def prune(self, keep=KEEP_REVISIONS):
+        """Membuang riwayat yang lebih tua dari `keep` revisi terakhir."""
+        with self.lock, self.db:
+            oldest = self.revision - keep
+            self.db.execute("DELETE FROM history WHERE revision <= ?", (oldest,))
+            self.db.execute("DELETE FROM revisions WHERE revision <= ? AND revision < "
+                            "(SELECT MAX(revision) FROM revisions)", (oldest,))
+
+    # --- Membaca ---
+
+    def oldest_revision(self):
+        """Revisi tertua yang masih bisa dibaca dengan `revision=`."""
+        row = self.db.execute("SELECT MIN(revision) FROM revisions").fetchone()
+        return max((row[0] or 1) - 1, 0)
+
+    def _rows_at(self, node, child, revision):
+        """{(node, child): teks JSON} pada `revision` (None = terkini) untuk node/child tertentu."""
+        where, args = [], []
+        if node is not None:
+            where.append("node = ?")
+            args.append(node)
+        if child is not None:
+            where.append("child = ?")
+            args.append(child)
+        condition = f" WHERE {' AND '.join(where)}" if where else ""
+        with self.lock:
+            rows = {(row_node, row_child): value for row_node, row_child, value in
+                    self.db.execute(f"SELECT node, child, value FROM rows{condition}", args)}
+            if revision is None or revision >= self.revision:
+                return rows
+            if revision < self.oldest_revision():
+                raise ValueError(f"Riwayat revisi {revision} sudah dibuang "
+                                 f"(tertua: {self.oldest_revision()}).")
+            # Nilai lama pada perubahan pertama setelah `revision` adalah nilai saat itu.
+            history_condition = f"{condition} AND revision > ?" if where else " WHERE revision > ?"
+            for row_node, row_child, old_value in self.db.execute(
+                    f"SELECT node, child, old_value FROM history{history_condition} "
+                    "ORDER BY revision DESC", args + [revision]):
+                rows[(row_node, row_child)] = old_value
+        return {key: value for key, value in rows.items() if value is not None}
+
+    def _assemble(self, rows):
+        tree = {}
+        for (node, child), value in rows.items():
+            value = json.loads(value)
+            if child == _SCALAR:
+                tree[node] = value
+            else:
+                tree.setdefault(node, {})[child] = value
+        return tree
+
+    def get(self, path="", revision=None):
+        """Nilai pada `path` seperti respons GET Firebase, terkini atau pada `revision`."""
+        segments = _split(path)
+        if len(segments) >= 2:
+            # Cukup satu baris: child level pertama yang dituju.
+            rows = self._rows_at(segments[0], segments[1], revision)
+            if not rows:
+                return None
+            return _export(_descend(json.loads(rows[(segments[0], segments[1])]), segments[2:]))
+        tree = self._assemble(self._rows_at(segments[0] if segments else None, None, revision))
+        value = _descend(tree, segments)
+        return _export(value) if value not in ({}, None) else None
+
+    def shallow(self, path="", revision=None):
+        """Seperti GET shallow=true: child langsung dengan nilai object diganti True."""
+        value = self.get(path, revision)
+        if isinstance(value, list):
+            value = {str(index): child for index, child in enumerate(value) if child is not None}
+        if not isinstance(value, dict):
+            return value
+        return {key: True if isinstance(child, (dict, list)) else child for key, child in value.items()}
+
+    def iter_nodes(self, revision=None):
+        """(node, nilai_atau_iterator_child) seperti snapshot_store.iter_json_export()."""
+        rows = self._rows_at(None, None, revision)
+        nodes = {}
+        for (node, child), value in sorted(rows.items()):
+            nodes.setdefault(node, []).append((child, value))
+        for node, children in nodes.items():
+            if children[0][0] == _SCALAR:
+                yield node, json.loads(children[0][1])
+            else:
+                yield node, ((child, json.loads(value)) for child, value in children)
+
+    def revisions(self, limit=20):
+        rows = self.db.execute("SELECT revision, received, event, path, changed_rows FROM revisions "
+                               "ORDER BY revision DESC LIMIT ?", (limit,)).fetchall()
+        keys = ["revision", "received", "event", "path", "changed_rows"]
+        return [dict(zip(keys, row)) for row in rows]
+
+
+# ==============================================================================
+# STREAM
+# ==============================================================================
+
+def iter_events(lines):
+    """Mem-parse baris text/event-stream menjadi (nama_event, data_json)."""
+    event, data = None, []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line == "":
+            if event is not None:
+                yield event, json.loads("\n".join(data)) if data else None
+            event, data = None, []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+def _close_stream_on_stop(stop, finished, current):
+    """
+    Thread pengawas run_mirror: begitu `stop` diset, socket stream yang sedang
+    terbuka (current["response"]) ditutup supaya iter_lines langsung kembali
+    tanpa menunggu event berikutnya atau STREAM_READ_TIMEOUT.
+    """
+    while not finished.wait(STOP_POLL_INTERVAL):
+        if stop.is_set():
+            response = current.get("response")
+            if response is not None:
+                # close() saja tidak membangunkan recv di thread lain (Linux);
+                # shutdown() ada sejak urllib3 2.3.
+                shutdown = getattr(response.raw, "shutdown", None)
+                shutdown() if shutdown else response.close()
+            return
+
+
+def run_mirror(store, base_url=None, stop=None, on_revision=None, prune_every=1000):
+    """
+    Menjalankan mirror sampai `stop` (threading.Event) diset: membuka stream,
+    menerapkan event ke `store`, dan membuka ulang stream jika putus.
+    `on_revision(revision, event, path)` dipanggil setiap revisi baru.
+    Stream yang sedang menunggu data ditutup dalam STOP_POLL_INTERVAL setelah
+    `stop` diset.
+    """
+    stop = stop or threading.Event()
+    delay = RECONNECT_DELAY
+    applied = 0
+    current, finished = {}, threading.Event()
+    watcher = threading.Thread(target=_close_stream_on_stop, args=(stop, finished, current),
+                               daemon=True)
+    watcher.start()
+    try:
+        with FirebaseClient(base_url or FIREBASE_URL) as client:
+            while not stop.is_set():
+                try:
+                    with client.stream("", read_timeout=STREAM_READ_TIMEOUT) as response:
+                        current["response"] = response
+                        if stop.is_set():
+                            break
+                        # chunk_size=None: setiap event diproses begitu tiba, tanpa
+                        # menunggu buffer penuh.
+                        delay = RECONNECT_DELAY
+                        for event, data in iter_events(response.iter_lines(chunk_size=None)):
+                            if event in ("put", "patch"):
+                                revision = store.apply_event(event, data["path"], data["data"])
+                                if revision is not None:
+                                    applied += 1
+                                    if on_revision:
+                                        on_revision(revision, event, data["path"])
+                                    if KEEP_REVISIONS and applied % prune_every == 0:
+                                        store.prune(KEEP_REVISIONS)
+                            elif event in ("cancel", "auth_revoked"):
+                                print(f"Stream dihentikan server ({event}): {data}")
+                                break
+                            if stop.is_set():
+                                break
+                except (requests.RequestException, ValueError) as e:
+                    if stop.is_set():
+                        break
+                    print(f"Stream terputus ({e}); mencoba lagi dalam {delay} detik.")
+                stop.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+    finally:
+        finished.set()
+        watcher.join()
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mirror lokal database Firebase lewat stream REST, plus baca cepat per revisi.")
+    parser.add_argument("--db", default=MIRROR_DB, help=f"file store mirror (default: {MIRROR_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("run", help="jalankan mirror (muat awal lalu ikuti perubahan)")
+
+    get = commands.add_parser("get", help="cetak nilai satu path dari mirror")
+    get.add_argument("path", nargs="?", default="", help="mis. 'umkm/umkm4' (default: root)")
+    get.add_argument("--at", type=int, help="baca pada revisi ini")
+    get.add_argument("--shallow", action="store_true", help="hanya key child langsung")
+
+    commands.add_parser("status", help="revisi terakhir dan event terbaru")
+
+    snapshot = commands.add_parser("snapshot", help="bekukan isi mirror ke snapshot_store.py")
+    snapshot.add_argument("name", help="nama snapshot")
+    snapshot.add_argument("--at", type=int, help="revisi (default: terkini)")
+    snapshot.add_argument("--store", default="snapshots.db", help="file snapshot store (default: snapshots.db)")
+    args = parser.parse_args()
+
+    if args.command != "run" and not os.path.exists(args.db):
+        parser.error(f"'{args.db}' belum ada; jalankan 'run' dulu")
+
+    with MirrorStore(args.db) as store:
+        if args.command == "run":
+            print(f"Mirror {FIREBASE_URL} -> '{args.db}' (revisi {store.revision}). Ctrl+C untuk berhenti.")
+            stop = threading.Event()
+
+            def report(revision, event, path):
+                print(f"  r{revision:<8} {event:<6} {path}")
+
+            try:
+                run_mirror(store, stop=stop, on_revision=report)
+            except KeyboardInterrupt:
+                stop.set()
+                print(f"\nMirror berhenti di revisi {store.revision}.")
+        elif args.command == "get":
+            start = time.perf_counter()
+            value = store.shallow(args.path, args.at) if args.shallow else store.get(args.path, args.at)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(json.dumps(value, indent=2, ensure_ascii=False))
+            print(f"\n(revisi {args.at if args.at is not None else store.revision}, {elapsed:.1f} ms)")
+        elif args.command == "status":
+            rows = store.db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+            print(f"Revisi {store.revision} (riwayat sejak revisi {store.oldest_revision()}), "
+                  f"{rows} baris, {os.path.getsize(args.db) / 1024:.1f} KB.")
+            for entry in store.revisions():
+                received = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["received"]))
+                print(f"  r{entry['revision']:<8} {received}  {entry['event']:<6} "
+                      f"{entry['path']:<40} {entry['changed_rows']} baris")
+        else:
+            from snapshot_store import SnapshotStore
+            revision = args.at if args.at is not None else store.revision
+            with SnapshotStore(args.store) as snapshots:
+                stats = snapshots.add_snapshot(args.name, store.iter_nodes(revision),
+                                               source=f"mirror:{args.db}@r{revision}")
+            print(f"Snapshot '{args.name}' (revisi {revision}) disimpan ke '{args.store}': "
+                  f"{stats['new_objects']} objek baru ({stats['new_bytes'] / 1024:.1f} KB).")
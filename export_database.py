@@ -0,0 +1,239 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from firebase_client import FirebaseClient
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
+
+# ==============================================================================
+#              EKSPOR DATABASE PER HALAMAN KE NDJSON (BISA DILANJUTKAN)
+# ==============================================================================
+# Pengganti export manual dari console (satu dokumen raksasa):
+# 1. Daftar node level pertama diambil dengan shallow=true.
+# 2. Key setiap node juga diambil shallow, lalu dibagi menjadi halaman
+#    berukuran tetap. Setiap halaman diambil dengan orderBy="$key" +
+#    startAt/endAt, beberapa halaman sekaligus secara paralel.
+# 3. Setiap halaman langsung ditulis ke <node>.ndjson (atau .ndjson.gz), satu
+#    record per baris: {"key": ..., "value": ...}. Memori hanya sebesar
+#    halaman yang sedang diproses.
+# 4. manifest.json mencatat rencana halaman, halaman yang selesai, dan ukuran
+#    file, sehingga ekspor yang terputus bisa dilanjutkan per halaman
+#    (--resume) tanpa mengulang dari awal.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Jumlah child per halaman.
+DEFAULT_PAGE_SIZE = 2000
+# Jumlah halaman yang diambil bersamaan.
+DEFAULT_WORKERS = 8
+MANIFEST_FILE = "manifest.json"
+
+
+def _int_key(key):
+    """
+    Nilai key yang diurutkan Firebase secara numerik: bilangan bulat 32-bit
+    kanonik ('7', '-12'). Selain itu None, mis. '0001' atau '628123456789'
+    yang diurutkan sebagai string.
+    """
+    digits = key[1:] if key.startswith("-") else key
+    if not (digits.isascii() and digits.isdigit()) or key != str(int(key)):
+        return None
+    value = int(key)
+    return value if -2**31 <= value <= 2**31 - 1 else None
+
+
+def _key_order(key):
+    """Urutan key Firebase: key bilangan bulat 32-bit lebih dulu (numerik), lalu string."""
+    value = _int_key(key)
+    return (0, value, "") if value is not None else (1, 0, key)
+
+
+def node_file_name(node, compress):
+    return f"{node}.ndjson.gz" if compress else f"{node}.ndjson"
+
+
+def plan_export(client, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Menyusun rencana ekspor: {"nodes": {node: {"pages": [[awal, akhir], ...]}},
+    "scalars": {node: nilai}}. Batas halaman berupa key pertama dan terakhir.
+    """
+    response = client.get("", params={"shallow": "true"})
+    response.raise_for_status()
+    root = response.json() or {}
+
+    nodes, scalars = {}, {}
+    for node in sorted(root, key=_key_order):
+        if root[node] is not True:
+            # Nilai skalar di level pertama disimpan langsung di manifest.
+            scalars[node] = root[node]
+            continue
+        response = client.get(node, params={"shallow": "true"})
+        response.raise_for_status()
+        keys = sorted(response.json() or {}, key=_key_order)
+        pages = [[keys[start], keys[min(start + page_size, len(keys)) - 1]]
+                 for start in range(0, len(keys), page_size)]
+        # Halaman terakhir dibiarkan terbuka agar child yang ditambahkan
+        # setelah rencana dibuat tetap ikut terekspor.
+        if pages:
+            pages[-1][1] = None
+        nodes[node] = {"pages": pages, "done": [], "records": 0, "bytes": 0}
+    return {"nodes": nodes, "scalars": scalars}
+
+
+def fetch_page(client, node, start, end):
+    """Mengambil satu halaman child node dan mengembalikan list (key, nilai) urut key."""
+    params = {"orderBy": '"$key"', "startAt": json.dumps(start)}
+    if end is not None:
+        params["endAt"] = json.dumps(end)
+    response = client.get(node, params=params)
+    response.raise_for_status()
+    value = response.json() or {}
+    if isinstance(value, list):
+        value = {str(index): item for index, item in enumerate(value) if item is not None}
+    return sorted(value.items(), key=lambda item: _key_order(item[0]))
+
+
+def encode_page(records, compress):
+    """Baris NDJSON untuk satu halaman; dengan kompresi jadi satu member gzip."""
+    data = "".join(json.dumps({"key": key, "value": value}, ensure_ascii=False,
+                              separators=(",", ":")) + "\n"
+                   for key, value in records).encode("utf-8")
+    return gzip.compress(data) if compress else data
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def export_database(client, output_dir, page_size=DEFAULT_PAGE_SIZE, workers=DEFAULT_WORKERS,
+                    compress=False, resume=False):
+    """
+    Mengekspor seluruh database ke `output_dir`. Dengan resume=True, halaman
+    yang sudah tercatat selesai di manifest dilewati. Mengembalikan manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir) if resume else None
+    if manifest is None:
+        with phase("plan"):
+            manifest = plan_export(client, page_size)
+        manifest.update({"source": client.base_url, "compress": compress,
+                         "page_size": page_size, "complete": False})
+        for node in manifest["nodes"]:
+            path = os.path.join(output_dir, node_file_name(node, compress))
+            if os.path.exists(path):
+                os.remove(path)
+        save_manifest(output_dir, manifest)
+    compress = manifest["compress"]
+
+    # Buang sisa tulisan halaman yang belum tercatat (mis. proses mati di tengah).
+    handles = {}
+    for node, info in manifest["nodes"].items():
+        path = os.path.join(output_dir, node_file_name(node, compress))
+        if info["bytes"] and (not os.path.exists(path) or os.path.getsize(path) < info["bytes"]):
+            raise RuntimeError(f"'{path}' lebih pendek dari catatan manifest; ulangi ekspor dari awal.")
+        f = open(path, "ab")
+        f.truncate(info["bytes"])
+        f.seek(info["bytes"])
+        handles[node] = f
+
+    pending = deque((node, index, start, end)
+                    for node, info in manifest["nodes"].items()
+                    for index, (start, end) in enumerate(info["pages"])
+                    if index not in info["done"])
+    try:
+        with phase("download"), ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+            while pending or in_flight:
+                # Jumlah halaman di memori dibatasi: paling banyak 2x jumlah worker.
+                while pending and len(in_flight) < 2 * workers:
+                    node, index, start, end = pending.popleft()
+                    future = executor.submit(fetch_page, client, node, start, end)
+                    in_flight[future] = (node, index)
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node, index = in_flight.pop(future)
+                    records = future.result()
+                    data = encode_page(records, compress)
+                    handles[node].write(data)
+                    handles[node].flush()
+                    info = manifest["nodes"][node]
+                    info["done"].append(index)
+                    info["records"] += len(records)
+                    info["bytes"] += len(data)
+                    save_manifest(output_dir, manifest)
+    finally:
+        for f in handles.values():
+            f.close()
+
+    manifest["complete"] = True
+    save_manifest(output_dir, manifest)
+    return manifest
+
+
+def iter_records(path):
+    """Iterasi (key, nilai) dari file .ndjson atau .ndjson.gz hasil ekspor."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["key"], record["value"]
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ekspor database Firebase per halaman ke file NDJSON per node.",
+        epilog="Contoh: python export_database.py backup_2025 --gzip --workers 8")
+    parser.add_argument("output_dir", help="folder tujuan (berisi <node>.ndjson + manifest.json)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"jumlah child per halaman (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"jumlah halaman yang diambil bersamaan (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--gzip", action="store_true", help="kompres file NDJSON dengan gzip")
+    parser.add_argument("--resume", action="store_true",
+                        help="lanjutkan ekspor yang terputus berdasarkan manifest.json")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    existing = load_manifest(args.output_dir)
+    if existing and not args.resume:
+        state = "selesai" if existing.get("complete") else "belum selesai"
+        parser.error(f"'{args.output_dir}' sudah berisi ekspor ({state}); "
+                     "pakai --resume atau folder lain")
+    start_profiling(args)
+
+    try:
+        start_time = time.perf_counter()
+        with FirebaseClient(FIREBASE_URL, max_workers=args.workers) as client:
+            manifest = export_database(client, args.output_dir, args.page_size, args.workers,
+                                       args.gzip, args.resume)
+        elapsed = time.perf_counter() - start_time
+
+        total_bytes = 0
+        for node, info in manifest["nodes"].items():
+            total_bytes += info["bytes"]
+            print(f"  {node_file_name(node, manifest['compress']):<32}{info['records']:>10} record"
+                  f"{len(info['pages']):>6} halaman{info['bytes'] / 1024:>12.1f} KB")
+        print(f"\nEkspor selesai dalam {elapsed:.2f} detik "
+              f"({total_bytes / (1024 * 1024):.1f} MB ditulis ke '{args.output_dir}').")
+    finally:
+        finish_profiling(args)
@@ -0,0 +1,222 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import profiling
+
+# ==============================================================================
+#                 KLIEN REST FIREBASE BERSAMA (POOLED + KONKUREN)
+# ==============================================================================
+# Modul ini dipakai oleh semua skrip operasional (update_firebase.py,
+# restore_data.py, upload_database.py, upload_to_firebase.py, dst.).
+# - Satu requests.Session dengan connection pool, jadi koneksi TLS dipakai ulang
+#   (keep-alive) alih-alih membuka koneksi baru di setiap request.
+# - Operasi tulis yang saling independen dijalankan paralel lewat thread pool
+#   yang ukurannya dibatasi.
+# - Respons 429/5xx dan error koneksi dicoba ulang dengan exponential backoff.
+# - Jika profiling.py aktif (--profile), setiap request dicatat di sana.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Jumlah maksimum request yang berjalan bersamaan.
+DEFAULT_MAX_WORKERS = 8
+# Jumlah percobaan ulang untuk respons 429/5xx atau error koneksi.
+DEFAULT_MAX_RETRIES = 5
+# Jeda dasar (detik) untuk exponential backoff: 0.5, 1, 2, 4, ...
+DEFAULT_BACKOFF_FACTOR = 0.5
+# Batas waktu (detik) untuk setiap request.
+DEFAULT_TIMEOUT = 30
+# Status HTTP yang dianggap sementara dan layak dicoba ulang.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Batas ukuran payload (byte) dan jumlah path untuk satu multi-path PATCH.
+DEFAULT_BATCH_MAX_BYTES = 256 * 1024
+DEFAULT_BATCH_MAX_PATHS = 500
+
+
+def check_disjoint_paths(paths):
+    """
+    Memastikan tidak ada path yang merupakan leluhur path lain (mis. 'umkm' dan
+    'umkm/umkm5'); Firebase menolak multi-path PATCH seperti itu.
+    """
+    # Diurutkan per segmen (bukan per string) supaya turunan sebuah path selalu
+    # tepat setelahnya; secara string 'umkm-x' terurut di antara 'umkm' dan 'umkm/a'.
+    ordered = sorted(tuple(segment for segment in path.strip("/").split("/") if segment)
+                     for path in paths)
+    for parent, child in zip(ordered, ordered[1:]):
+        if child[:len(parent)] == parent:
+            raise ValueError(f"Path '{'/'.join(parent)}' bertumpuk dengan '{'/'.join(child)}'.")
+
+
+def plan_patch_batches(updates, max_bytes=DEFAULT_BATCH_MAX_BYTES,
+                       max_paths=DEFAULT_BATCH_MAX_PATHS):
+    """
+    Membagi dict {path: nilai} menjadi list payload multi-path PATCH untuk root.
+    Nilai None berarti hapus. Setiap batch dibatasi `max_bytes` dan `max_paths`;
+    entri yang sendirian sudah melebihi `max_bytes` tetap dikirim sebagai satu
+    batch tersendiri. Setiap batch diterapkan Firebase secara atomik.
+    """
+    check_disjoint_paths(updates.keys())
+
+    batches = []
+    current, current_bytes = {}, 2  # 2 byte untuk '{}'
+    for path, value in updates.items():
+        path = path.strip("/")
+        # Perkiraan ukuran: "path": nilai,
+        entry_bytes = len(json.dumps(path)) + len(json.dumps(value)) + 2
+        if current and (current_bytes + entry_bytes > max_bytes or len(current) >= max_paths):
+            batches.append(current)
+            current, current_bytes = {}, 2
+        current[path] = value
+        current_bytes += entry_bytes
+    if current:
+        batches.append(current)
+    return batches
+
+
+class FirebaseClient:
+    """Klien REST Realtime Database dengan koneksi keep-alive, retry, dan paralelisme."""
+
+    def __init__(self, base_url=FIREBASE_URL, max_workers=DEFAULT_MAX_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        # Ukuran pool disamakan dengan jumlah worker supaya setiap thread
+        # selalu mendapat koneksi yang sudah terbuka.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Menutup semua koneksi di pool."""
+        self.session.close()
+
+    def url(self, path=""):
+        """Mengubah path node (mis. 'umkm/umkm5') menjadi URL REST '.json'."""
+        path = path.strip("/")
+        if not path:
+            return f"{self.base_url}/.json"
+        return f"{self.base_url}/{path}.json"
+
+    def _backoff_delay(self, attempt, response=None):
+        """Menghitung jeda sebelum percobaan ulang ke-`attempt`."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        # Jitter kecil agar worker yang gagal bersamaan tidak retry serentak.
+        return self.backoff_factor * (2 ** attempt) + random.uniform(0, self.backoff_factor)
+
+    def request(self, method, path="", payload=None, params=None):
+        """
+        Mengirim satu request ke `path` dan mengembalikan objek Response.
+        `payload` (jika ada) di-serialisasi ke JSON. Respons 429/5xx dan error
+        koneksi dicoba ulang; setelah percobaan habis, respons terakhir
+        dikembalikan (atau exception koneksi terakhir dilempar ulang).
+        """
+        url = self.url(path)
+        data = json.dumps(payload) if payload is not None else None
+        profiler = profiling.active()
+        start = time.perf_counter()
+
+        def record(received_bytes, status):
+            sent_bytes = len(data.encode("utf-8")) if data is not None else 0
+            profiler.record_request(method, path, payload, sent_bytes, received_bytes,
+                                    time.perf_counter() - start, attempt, status)
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, data=data, params=params,
+                                                timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    if profiler is not None:
+                        record(0, type(e).__name__)
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._backoff_delay(attempt, response))
+                attempt += 1
+                continue
+            if profiler is not None:
+                record(len(response.content), response.status_code)
+            return response
+
+    def get(self, path="", params=None):
+        return self.request("GET", path, params=params)
+
+    def stream(self, path="", read_timeout=None):
+        """
+        Membuka stream event (text/event-stream) pada `path`. Mengembalikan
+        Response dengan stream=True; tutup setelah selesai (pakai `with`).
+        """
+        response = self.session.get(self.url(path), headers={"Accept": "text/event-stream"},
+                                    stream=True, timeout=(self.timeout, read_timeout))
+        response.raise_for_status()
+        return response
+
+    def put(self, path, payload):
+        return self.request("PUT", path, payload)
+
+    def patch(self, path, payload):
+        return self.request("PATCH", path, payload)
+
+    def delete(self, path):
+        return self.request("DELETE", path)
+
+    def run_parallel(self, operations):
+        """
+        Menjalankan banyak operasi independen secara paralel.
+        `operations` adalah list tuple (method, path, payload); hasilnya list
+        tuple (operasi, response) dengan urutan yang sama seperti input.
+        """
+        operations = list(operations)
+        if not operations:
+            return []
+
+        def run(operation):
+            method, path, payload = operation
+            return operation, self.request(method, path, payload)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(run, operations))
+
+    def apply_batches(self, batches):
+        """Mengirim setiap payload dari plan_patch_batches() sebagai PATCH ke root."""
+        return self.run_parallel(("PATCH", "", batch) for batch in batches)
+
+# ==============================================================================
+# CARA MEMAKAI MODUL INI:
+# ==============================================================================
+# from firebase_client import FirebaseClient
+#
+# with FirebaseClient() as client:
+#     client.put("umkm/umkm5", {...})
+#     client.run_parallel([("DELETE", "reviews/umkm5", None),
+#                          ("DELETE", "reviews/umkm9", None)])
+#
+#     # Banyak tulisan sekaligus: satu PATCH ke root, None = hapus.
+#     batches = plan_patch_batches({"umkm/umkm5": None, "reviews/umkm9": {...}})
+#     client.apply_batches(batches)
+# ==============================================================================
@@ -0,0 +1,386 @@
+import copy
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# ==============================================================================
+#            EMULATOR REALTIME DATABASE LOKAL (UNTUK UJI & BENCHMARK)
+# ==============================================================================
+# Server HTTP in-process yang meniru semantik REST Firebase yang dipakai
+# skrip-skrip operasional, supaya semuanya bisa dijalankan tanpa menyentuh
+# https://final-ca080-default-rtdb.firebaseio.com:
+# - GET/PUT/PATCH/DELETE pada /<path>.json
+# - multi-path PATCH (key berupa path, null = hapus)
+# - shallow=true
+# - orderBy ("$key", "$value", atau nama child), startAt/endAt/equalTo,
+#   limitToFirst/limitToLast
+# - stream (Accept: text/event-stream): event put/patch/keep-alive
+# Seperti Firebase, array disimpan sebagai object ber-key indeks dan node
+# kosong otomatis hilang.
+# ==============================================================================
+
+# Jeda event keep-alive pada stream (Firebase mengirimnya tiap ~30 detik).
+SSE_KEEPALIVE_SECONDS = 30
+
+
+def _normalize(value):
+    """Mengubah nilai JSON ke bentuk penyimpanan Firebase (array -> object, buang kosong)."""
+    if isinstance(value, list):
+        value = {str(index): item for index, item in enumerate(value)}
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            child = _normalize(child)
+            if child is not None:
+                result[str(key)] = child
+        return result or None
+    return value
+
+
+def _export(value):
+    """Kebalikan _normalize: object ber-key indeks yang cukup padat dikembalikan sebagai array."""
+    if not isinstance(value, dict):
+        return value
+    exported = {key: _export(child) for key, child in value.items()}
+    # Hanya key bilangan bulat kanonik ("0", "12", bukan "007") yang dianggap indeks.
+    if exported and all(key.isdigit() and key == str(int(key)) for key in exported):
+        indices = [int(key) for key in exported]
+        # Aturan Firebase: dianggap array jika lebih dari separuh slot terisi.
+        if max(indices) < 2 * len(indices):
+            array = [None] * (max(indices) + 1)
+            for index in indices:
+                array[index] = exported[str(index)]
+            return array
+    return exported
+
+
+def _order_rank(value):
+    """Urutan tipe Firebase: null < false < true < angka < string < object."""
+    if value is None:
+        return (0, 0)
+    if value is False:
+        return (1, 0)
+    if value is True:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, 0)
+
+
+def _int_key(key):
+    """
+    Nilai key yang diurutkan Firebase secara numerik: bilangan bulat 32-bit
+    kanonik ('7', '-12'). Selain itu None, mis. '0001' atau '628123456789'
+    yang diurutkan sebagai string.
+    """
+    digits = key[1:] if key.startswith("-") else key
+    if not (digits.isascii() and digits.isdigit()) or key != str(int(key)):
+        return None
+    value = int(key)
+    return value if -2**31 <= value <= 2**31 - 1 else None
+
+
+def _key_rank(key):
+    """Urutan key Firebase: key bilangan bulat 32-bit lebih dulu (numerik), lalu string."""
+    value = _int_key(key)
+    return (0, value, "") if value is not None else (1, 0, key)
+
+
+class FirebaseEmulator:
+    """Emulator in-process. Pakai sebagai context manager atau panggil start()/stop()."""
+
+    def __init__(self, data=None, host="127.0.0.1", port=0):
+        self.root = _normalize(copy.deepcopy(data)) if data is not None else None
+        self.lock = threading.RLock()
+        # Setiap request dicatat: (method, path, byte_masuk, byte_keluar, detik).
+        self.request_log = []
+        # Stream yang sedang terbuka: list (segmen path, antrean event).
+        self.listeners = []
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    # --- Siklus hidup server ---
+
+    def start(self):
+        """Menjalankan server di thread latar belakang dan mengembalikan base URL."""
+        emulator = self
+
+        class Handler(_EmulatorHandler):
+            pass
+        Handler.emulator = emulator
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        with self.lock:
+            for _, events in self.listeners:
+                events.put(None)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    # --- Operasi data ---
+
+    def get_data(self, path=""):
+        """Salinan data pada `path` dalam bentuk yang sama seperti respons GET."""
+        with self.lock:
+            return _export(copy.deepcopy(self._get(self._split(path))))
+
+    @staticmethod
+    def _split(path):
+        return [unquote(segment) for segment in path.strip("/").split("/") if segment]
+
+    def _get(self, segments):
+        node = self.root
+        for segment in segments:
+            if not isinstance(node, dict) or segment not in node:
+                return None
+            node = node[segment]
+        return node
+
+    def _set(self, segments, value):
+        value = _normalize(value)
+        if not segments:
+            self.root = value
+            return
+        if value is None:
+            self._delete(segments)
+            return
+        if not isinstance(self.root, dict):
+            self.root = {}
+        node = self.root
+        for segment in segments[:-1]:
+            if not isinstance(node.get(segment), dict):
+                node[segment] = {}
+            node = node[segment]
+        node[segments[-1]] = value
+
+    def _delete(self, segments):
+        # Simpan jalur induk supaya induk yang menjadi kosong ikut dihapus.
+        parents = []
+        node = self.root
+        for segment in segments[:-1]:
+            if not isinstance(node, dict) or segment not in node:
+                return
+            parents.append((node, segment))
+            node = node[segment]
+        if not isinstance(node, dict) or segments[-1] not in node:
+            return
+        del node[segments[-1]]
+        while parents and not node:
+            parent, key = parents.pop()
+            del parent[key]
+            node = parent
+        if not self.root:
+            self.root = None
+
+    def _query(self, value, params):
+        """Menerapkan orderBy/startAt/endAt/equalTo/limitTo* pada children `value`."""
+        if "orderBy" not in params or not isinstance(value, dict):
+            return value
+        order_by = json.loads(params["orderBy"])
+
+        def sort_value(item):
+            key, child = item
+            if order_by == "$key":
+                return key
+            if order_by == "$value":
+                return child
+            node = child
+            for segment in order_by.split("/"):
+                node = node.get(segment) if isinstance(node, dict) else None
+            return node
+
+        def rank(item):
+            if order_by == "$key":
+                return _key_rank(item[0])
+            return (_order_rank(sort_value(item)), _key_rank(item[0]))
+
+        items = sorted(value.items(), key=rank)
+        for name, keep in (("startAt", lambda v, b: v >= b), ("endAt", lambda v, b: v <= b),
+                           ("equalTo", lambda v, b: v == b)):
+            if name in params:
+                bound = json.loads(params[name])
+                if order_by == "$key":
+                    items = [item for item in items if keep(_key_rank(item[0]), _key_rank(str(bound)))]
+                else:
+                    items = [item for item in items
+                             if keep(_order_rank(sort_value(item)), _order_rank(bound))]
+        if "limitToFirst" in params:
+            items = items[:int(params["limitToFirst"])]
+        if "limitToLast" in params:
+            items = items[-int(params["limitToLast"]):] if int(params["limitToLast"]) else []
+        return dict(items)
+
+    # --- Streaming ---
+
+    def subscribe(self, path=""):
+        """
+        Mendaftarkan stream pada `path`; mengembalikan antrean event (nama, data)
+        yang diawali put '/' berisi nilai saat ini. None menandai emulator berhenti.
+        """
+        segments = self._split(path)
+        events = queue.Queue()
+        with self.lock:
+            events.put(("put", {"path": "/", "data": _export(copy.deepcopy(self._get(segments)))}))
+            self.listeners.append((segments, events))
+        return events
+
+    def unsubscribe(self, events):
+        with self.lock:
+            self.listeners = [listener for listener in self.listeners if listener[1] is not events]
+
+    def _notify(self, method, segments, body):
+        """Meneruskan satu tulisan ke stream yang path-nya bersinggungan (dipanggil di dalam lock)."""
+        for listen_segments, events in self.listeners:
+            if segments[:len(listen_segments)] == listen_segments:
+                relative = "/" + "/".join(segments[len(listen_segments):])
+                if method == "PATCH":
+                    events.put(("patch", {"path": relative, "data": copy.deepcopy(body)}))
+                else:
+                    events.put(("put", {"path": relative,
+                                        "data": None if method == "DELETE" else copy.deepcopy(body)}))
+            elif listen_segments[:len(segments)] == segments:
+                # Tulisan di atas path stream: kirim ulang nilai path stream.
+                value = _export(copy.deepcopy(self._get(listen_segments)))
+                events.put(("put", {"path": "/", "data": value}))
+
+    def handle(self, method, path, params, body):
+        """Menjalankan satu request REST; mengembalikan (status, nilai_respons)."""
+        segments = self._split(path)
+        with self.lock:
+            if method == "GET":
+                value = self._get(segments)
+                if params.get("shallow") == "true" and isinstance(value, dict):
+                    return 200, {key: True if isinstance(child, dict) else child
+                                 for key, child in value.items()}
+                value = self._query(value, params)
+                return 200, _export(copy.deepcopy(value))
+            if method == "PUT":
+                self._set(segments, body)
+                self._notify(method, segments, body)
+                return 200, body
+            if method == "PATCH":
+                if not isinstance(body, dict):
+                    return 400, {"error": "Invalid data; couldn't parse JSON object."}
+                paths = sorted(tuple(self._split(key)) for key in body)
+                for parent, child in zip(paths, paths[1:]):
+                    if child[:len(parent)] == parent:
+                        return 400, {"error": "Invalid data; ancestor paths in update."}
+                for key, child in body.items():
+                    self._set(segments + self._split(key), child)
+                self._notify(method, segments, body)
+                return 200, body
+            if method == "DELETE":
+                self._set(segments, None)
+                self._notify(method, segments, None)
+                return 200, None
+        return 405, {"error": "Method not allowed."}
+
+
+class _EmulatorHandler(BaseHTTPRequestHandler):
+    """Adapter HTTP untuk FirebaseEmulator; `emulator` diisi oleh start()."""
+
+    emulator = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _stream(self, path):
+        """Melayani GET dengan Accept: text/event-stream sampai klien putus."""
+        events = self.emulator.subscribe(path)
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    event = ("keep-alive", None)
+                if event is None:
+                    break
+                name, data = event
+                chunk = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.emulator.unsubscribe(events)
+
+    def _handle(self):
+        start = time.perf_counter()
+        parsed = urlparse(self.path)
+        if (self.command == "GET" and "text/event-stream" in self.headers.get("Accept", "")
+                and parsed.path.endswith(".json")):
+            self._stream(parsed.path[:-len(".json")])
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        if not parsed.path.endswith(".json"):
+            status, value = 404, {"error": "Path harus diakhiri '.json'."}
+        else:
+            params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except json.JSONDecodeError:
+                status, value = 400, {"error": "Invalid data; couldn't parse JSON object."}
+            else:
+                status, value = self.emulator.handle(self.command, parsed.path[:-len(".json")],
+                                                     params, body)
+
+        payload = json.dumps(value).encode("utf-8")
+        # Dicatat sebelum respons dikirim, supaya klien yang sudah menerima
+        # respons selalu melihat entri log-nya.
+        self.emulator.request_log.append(
+            (self.command, parsed.path, length, len(payload), time.perf_counter() - start))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_PUT = do_PATCH = do_DELETE = _handle
+
+# ==============================================================================
+# CARA MEMAKAI MODUL INI:
+# ==============================================================================
+# from firebase_client import FirebaseClient
+# from firebase_emulator import FirebaseEmulator
+#
+# with FirebaseEmulator(json.load(open("umkm.json"))) as emulator:
+#     with FirebaseClient(emulator.url) as client:
+#         client.get("umkm", params={"shallow": "true"})
+# ==============================================================================
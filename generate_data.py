@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import random
+import string
+import time
+
+# ==============================================================================
+#                   GENERATOR DATA SINTETIS (SKEMA FIREBASE UMKAMI)
+# ==============================================================================
+# Membuat file export palsu dengan skema yang sama seperti
+# 'databaseStraightUpFromFirebase.json', tetapi dengan ukuran yang bisa diatur
+# (10 ribu sampai jutaan order/user/review). Record UMKM, menu, dan layanan
+# diambil dari file template lalu digandakan. File ditulis secara streaming
+# (per record), jadi memori tetap kecil berapa pun jumlah order-nya.
+# Dengan --seed yang sama, hasilnya selalu identik.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# File export asli yang dijadikan template skema.
+TEMPLATE_FILE = "databaseStraightUpFromFirebase.json"
+
+_PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_FIRST_NAMES = ["budi", "siti", "agus", "dewi", "joko", "rina", "andi", "putri", "eko", "sari"]
+_REVIEW_COMMENTS = ["Enak dan murah!", "Pelayanan cepat.", "Tempatnya bersih.",
+                    "Porsi besar, recommended.", "Harga mahasiswa, mantap.", "Agak lama antrinya."]
+
+
+def push_id(rng, timestamp_ms):
+    """Key mirip push() Firebase: 8 karakter waktu + 12 karakter acak (urut kronologis)."""
+    chars = []
+    for _ in range(8):
+        chars.append(_PUSH_CHARS[timestamp_ms % 64])
+        timestamp_ms //= 64
+    return "".join(reversed(chars)) + "".join(rng.choice(_PUSH_CHARS) for _ in range(12))
+
+
+def _uid(rng):
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(28))
+
+
+class SyntheticDatabase:
+    """Pembangkit record per node; setiap metode iter_* menghasilkan (key, nilai)."""
+
+    def __init__(self, template, umkm_count, user_count, order_count, review_count, seed=0):
+        self.template = template
+        self.umkm_count = umkm_count
+        self.user_count = user_count
+        self.order_count = order_count
+        self.review_count = review_count
+        self.seed = seed
+
+        # Hanya record template yang lengkap (punya lat/lng) yang digandakan.
+        self.base_umkm = [(key, umkm) for key, umkm in template["umkm"].items()
+                          if isinstance(umkm, dict) and "lat" in umkm and "lng" in umkm]
+        self.umkm_ids = [f"umkm{index}" for index in range(umkm_count)]
+        rng = random.Random(seed)
+        self.user_ids = [_uid(rng) for _ in range(user_count)]
+
+    def _base(self, index):
+        return self.base_umkm[index % len(self.base_umkm)][1]
+
+    def _catalog(self, index):
+        """(node, daftar_item) dari template untuk UMKM ke-index: menu atau layanan."""
+        base_id = self.base_umkm[index % len(self.base_umkm)][0]
+        if base_id in self.template.get("umkm_services", {}):
+            return "umkm_services", self.template["umkm_services"][base_id]
+        return "umkm_menu", self.template.get("umkm_menu", {}).get(base_id, [])
+
+    def iter_umkm(self):
+        rng = random.Random(self.seed + 1)
+        for index, umkm_id in enumerate(self.umkm_ids):
+            record = dict(self._base(index))
+            record["id"] = umkm_id
+            if index >= len(self.base_umkm):
+                record["name"] = f"{record['name']} #{index}"
+            # Sebar lokasi di sekitar Malang (kurang lebih 15 km).
+            record["lat"] = round(-7.96 + rng.uniform(-0.07, 0.07), 6)
+            record["lng"] = round(112.62 + rng.uniform(-0.07, 0.07), 6)
+            yield umkm_id, record
+
+    def iter_catalog(self, node):
+        for index, umkm_id in enumerate(self.umkm_ids):
+            catalog_node, items = self._catalog(index)
+            if catalog_node == node and items:
+                yield umkm_id, items
+
+    def iter_reviews(self):
+        rng = random.Random(self.seed + 2)
+        per_umkm = [0] * self.umkm_count
+        for _ in range(self.review_count):
+            per_umkm[rng.randrange(self.umkm_count)] += 1
+        timestamp = 1763000000000
+        for umkm_id, count in zip(self.umkm_ids, per_umkm):
+            if not count:
+                continue
+            reviews = {}
+            for number in range(count):
+                # Sepertiga review memakai format lama (string polos r1, r2, ...).
+                if number < 3 and rng.random() < 0.33:
+                    reviews[f"r{number + 1}"] = rng.choice(_REVIEW_COMMENTS)
+                else:
+                    timestamp += rng.randint(1000, 600000)
+                    reviews[push_id(rng, timestamp)] = {
+                        "author": rng.choice(_FIRST_NAMES),
+                        "comment": rng.choice(_REVIEW_COMMENTS),
+                        "rating": rng.randint(1, 5),
+                    }
+            yield umkm_id, reviews
+
+    def iter_orders(self):
+        rng = random.Random(self.seed + 3)
+        timestamp = 1763881400391
+        for _ in range(self.order_count):
+            index = rng.randrange(self.umkm_count)
+            umkm_id = self.umkm_ids[index]
+            name = self._base(index)["name"]
+            _, catalog = self._catalog(index)
+            items, total = [], 0
+            for entry in rng.sample(catalog, k=rng.randint(1, len(catalog))) if catalog else []:
+                quantity = rng.randint(1, 6)
+                item_name = entry.get("name") or entry.get("service", "")
+                items.append({"item": {"name": item_name, "price": entry["price"], "umkmId": umkm_id},
+                              "quantity": quantity, "umkmId": umkm_id, "umkmName": name})
+                total += entry["price"] * quantity
+            timestamp += rng.randint(1000, 120000)
+            order = {"customerName": "Anonymous Customer", "items": items,
+                     "orderTimestamp": timestamp, "totalPrice": total, "umkmId": umkm_id}
+            if self.user_ids:
+                order["userId"] = rng.choice(self.user_ids)
+            yield push_id(rng, timestamp), order
+
+    def iter_users(self):
+        rng = random.Random(self.seed + 4)
+        for index, uid in enumerate(self.user_ids):
+            name = f"{rng.choice(_FIRST_NAMES)}{index}"
+            yield uid, {"address": "", "balance": float(rng.randrange(0, 500000, 1000)),
+                        "displayName": name, "email": f"{name}@gmail.com",
+                        "role": "customer", "uid": uid}
+
+    def iter_wishlist(self):
+        rng = random.Random(self.seed + 5)
+        for uid in self.user_ids[::10]:
+            picks = rng.sample(self.umkm_ids, k=min(3, len(self.umkm_ids)))
+            yield uid, {umkm_id: True for umkm_id in picks}
+
+    def nodes(self):
+        """Semua node level pertama, urut abjad seperti export Firebase."""
+        return {
+            "orders": self.iter_orders,
+            "reviews": self.iter_reviews,
+            "umkm": self.iter_umkm,
+            "umkm_menu": lambda: self.iter_catalog("umkm_menu"),
+            "umkm_services": lambda: self.iter_catalog("umkm_services"),
+            "users": self.iter_users,
+            "wishlist": self.iter_wishlist,
+        }
+
+    def to_dict(self):
+        """Seluruh database sebagai dict (hanya untuk ukuran kecil)."""
+        return {node: dict(records()) for node, records in self.nodes().items()}
+
+    def write(self, output_path, compact=True):
+        """Menulis database ke file JSON secara streaming; mengembalikan ukuran byte."""
+        separators = (",", ":") if compact else (", ", ": ")
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("{")
+            for node_index, (node, records) in enumerate(self.nodes().items()):
+                f.write(("," if node_index else "") + ("" if compact else "\n") + json.dumps(node) + ":{")
+                for index, (key, value) in enumerate(records()):
+                    if index:
+                        f.write(",")
+                    if not compact:
+                        f.write("\n  ")
+                    f.write(json.dumps(key) + ":" + json.dumps(value, separators=separators,
+                                                               ensure_ascii=False))
+                f.write("}")
+            f.write("\n}\n" if not compact else "}")
+        return os.path.getsize(output_path)
+
+
+def load_template(template_path=TEMPLATE_FILE):
+    with open(template_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Buat database sintetis berskema UMKami untuk uji beban.",
+        epilog="Contoh: python generate_data.py synthetic.json --orders 100000 --users 20000")
+    parser.add_argument("output_file", help="file JSON hasil")
+    parser.add_argument("--umkm", type=int, default=200, help="jumlah UMKM (default: 200)")
+    parser.add_argument("--users", type=int, default=2000, help="jumlah user (default: 2000)")
+    parser.add_argument("--orders", type=int, default=10000, help="jumlah order (default: 10000)")
+    parser.add_argument("--reviews", type=int, default=5000, help="jumlah review (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0, help="seed acak (default: 0)")
+    parser.add_argument("--pretty", action="store_true", help="tulis dengan baris baru per record")
+    parser.add_argument("--template", default=TEMPLATE_FILE, help=f"template skema (default: {TEMPLATE_FILE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    database = SyntheticDatabase(load_template(args.template), args.umkm, args.users,
+                                 args.orders, args.reviews, args.seed)
+    size = database.write(args.output_file, compact=not args.pretty)
+    print(f"Berhasil membuat '{args.output_file}' ({size / (1024 * 1024):.1f} MB) "
+          f"dalam {time.perf_counter() - start:.1f} detik.")
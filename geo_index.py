@@ -0,0 +1,363 @@
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_client import FirebaseClient, plan_patch_batches
+
+# ==============================================================================
+#            INDEX GEOHASH UMKM (NODE 'geo_index') UNTUK QUERY "DEKAT SAYA"
+# ==============================================================================
+# Tanpa index, mencari UMKM terdekat berarti mengunduh seluruh 'umkm' lalu
+# menyaring di HP. Skrip ini menulis:
+#
+#   geo_index/<geohash>/<umkmId> = {lat, lng}
+#
+# dengan <geohash> berpresisi INDEX_PRECISION. Query radius menghitung sel
+# geohash yang menutupi kotak pembatas lingkaran, memilih presisi tertinggi
+# yang jumlah selnya masih <= MAX_QUERY_CELLS, lalu membaca setiap sel (atau
+# semua sel yang diawali prefix tersebut lewat orderBy="$key") secara paralel.
+# Biaya query bergantung pada kepadatan UMKM di sekitar titik, bukan jumlah
+# UMKM di seluruh katalog.
+#
+# Index dijaga tetap terbaru oleh semua penulis 'umkm':
+# - update_firebase.py / restore_data.py : index_updates_for_plan()
+# - sync_database.py, upload_*.py        : with_geo_index()
+# - aplikasi (UmkmRepository.saveUmkm)   : geo_index/<sel>/<id> ditulis, dan sel
+#   lama dihapus, dalam updateChildren yang sama dengan umkm/<id>
+# Menjalankan skrip ini langsung membangun ulang index dari 'umkm' dan hanya
+# mengirim sel yang berbeda (mis. setelah perubahan manual di console).
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Node tujuan index.
+GEO_INDEX_NODE = "geo_index"
+# Panjang geohash sel index; 6 karakter ~ 1,2 km x 0,6 km.
+INDEX_PRECISION = 6
+# Batas jumlah sel yang dibaca untuk satu query radius.
+MAX_QUERY_CELLS = 16
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_M = 6371000.0
+# Diturunkan dari radius yang sama dengan distance_m, supaya kotak query selalu
+# menutupi lingkaran haversine.
+_METERS_PER_DEGREE = math.radians(1) * _EARTH_RADIUS_M
+
+
+def encode_geohash(lat, lng, precision=INDEX_PRECISION):
+    """Geohash (base32) untuk satu titik."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Ukuran sel geohash dalam derajat: (tinggi_lat, lebar_lng)."""
+    total_bits = 5 * precision
+    return 180.0 / 2 ** (total_bits // 2), 360.0 / 2 ** ((total_bits + 1) // 2)
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """Jarak haversine dalam meter."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def cells_covering(south, west, north, east, precision):
+    """Semua sel geohash berpresisi `precision` yang beririsan dengan kotak."""
+    lat_step, lng_step = cell_size(precision)
+    cells = set()
+    lat = south
+    while True:
+        lng = west
+        while True:
+            cells.add(encode_geohash(lat, lng, precision))
+            if lng >= east:
+                break
+            lng = min(lng + lng_step, east)
+        if lat >= north:
+            break
+        lat = min(lat + lat_step, north)
+    return cells
+
+
+def query_cells(lat, lng, radius_m, max_cells=MAX_QUERY_CELLS):
+    """Sel (prefix geohash) yang dibaca untuk query radius; presisi setinggi mungkin."""
+    lat_delta = radius_m / _METERS_PER_DEGREE
+    # Lebar bujur lingkaran pada bola: asin(sin(d) / cos(lat)), sedikit lebih
+    # lebar dari d / cos(lat); dekat kutub lingkaran mencakup semua bujur.
+    angle, cos_lat = radius_m / _EARTH_RADIUS_M, math.cos(math.radians(lat))
+    lng_delta = (math.degrees(math.asin(math.sin(angle) / cos_lat))
+                 if math.sin(angle) < cos_lat else 180.0)
+    box = (max(lat - lat_delta, -90.0), max(lng - lng_delta, -180.0),
+           min(lat + lat_delta, 90.0), min(lng + lng_delta, 180.0))
+    for precision in range(INDEX_PRECISION, 0, -1):
+        cells = cells_covering(*box, precision)
+        if len(cells) <= max_cells:
+            return sorted(cells)
+    return sorted(cells_covering(*box, 1))
+
+
+def index_entry(umkm):
+    """(sel, nilai index) untuk satu record UMKM, atau None jika tanpa lokasi valid."""
+    if not isinstance(umkm, dict):
+        return None
+    lat, lng = umkm.get("lat"), umkm.get("lng")
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool)
+               for value in (lat, lng)):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return encode_geohash(lat, lng), {"lat": lat, "lng": lng}
+
+
+def _as_children(value):
+    if isinstance(value, list):
+        return {str(index): item for index, item in enumerate(value) if item is not None}
+    return value if isinstance(value, dict) else {}
+
+
+def build_index(umkm_node):
+    """Isi lengkap node geo_index untuk seluruh child 'umkm'."""
+    index = {}
+    for umkm_id, umkm in _as_children(umkm_node).items():
+        entry = index_entry(umkm)
+        if entry is not None:
+            index.setdefault(entry[0], {})[umkm_id] = entry[1]
+    return index
+
+
+def plan_index_updates(before, after):
+    """
+    Multi-path update {path: nilai} untuk geo_index dari kondisi UMKM sebelum
+    dan sesudah perubahan ({umkmId: record atau None}). UMKM yang lokasinya
+    tidak berubah dilewati; UMKM yang pindah sel dihapus dari sel lamanya.
+    """
+    plan = {}
+    for umkm_id in set(before) | set(after):
+        old, new = index_entry(before.get(umkm_id)), index_entry(after.get(umkm_id))
+        if old == new:
+            continue
+        if old is not None and (new is None or old[0] != new[0]):
+            plan[f"{GEO_INDEX_NODE}/{old[0]}/{umkm_id}"] = None
+        if new is not None:
+            plan[f"{GEO_INDEX_NODE}/{new[0]}/{umkm_id}"] = new[1]
+    return plan
+
+
+def _apply_change(record, segments, value):
+    """Menerapkan satu path update pada salinan record (segments relatif ke record)."""
+    if not segments:
+        return value
+    record = dict(_as_children(record))
+    child = _apply_change(record.get(segments[0]), segments[1:], value)
+    if child is None:
+        record.pop(segments[0], None)
+    else:
+        record[segments[0]] = child
+    return record or None
+
+
+def index_updates_for_plan(client, plan):
+    """
+    Update geo_index untuk multi-path plan {path: nilai} yang akan dikirim ke
+    root. Record UMKM yang tersentuh dibaca dulu dari Firebase (paralel) agar
+    sel lamanya bisa dihapus. Hasilnya bisa langsung digabung ke plan.
+    """
+    changes = [(path.strip("/").split("/"), value) for path, value in plan.items()]
+    changes = [(segments[1:], value) for segments, value in changes if segments[0] == "umkm"]
+    if not changes:
+        return {}
+
+    if any(not segments for segments, _ in changes):
+        # Seluruh node 'umkm' ditimpa: semua UMKM tersentuh.
+        response = client.get("umkm")
+        response.raise_for_status()
+        before = _as_children(response.json())
+    else:
+        umkm_ids = sorted({segments[0] for segments, _ in changes})
+        with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+            responses = list(executor.map(lambda umkm_id: client.get(f"umkm/{umkm_id}"), umkm_ids))
+        before = {}
+        for umkm_id, response in zip(umkm_ids, responses):
+            response.raise_for_status()
+            before[umkm_id] = response.json()
+
+    after = dict(before)
+    for segments, value in changes:
+        if not segments:
+            after = {umkm_id: None for umkm_id in before}
+            after.update(_as_children(value))
+        else:
+            after[segments[0]] = _apply_change(after.get(segments[0]), segments[1:], value)
+    return plan_index_updates(before, after)
+
+
+def with_geo_index(document):
+    """
+    Untuk unggah/sinkronisasi dokumen root: menambahkan geo_index yang dibangun
+    dari 'umkm' jika dokumen belum membawanya sendiri.
+    """
+    if not isinstance(document, dict) or "umkm" not in document or GEO_INDEX_NODE in document:
+        return document
+    return dict(document, **{GEO_INDEX_NODE: build_index(document["umkm"])})
+
+
+def query_nearby(client, lat, lng, radius_m):
+    """
+    Mencari UMKM dalam radius `radius_m` meter dari (lat, lng) lewat geo_index.
+    Mengembalikan list (jarak_m, umkmId), terdekat lebih dulu.
+    """
+    def read(cell):
+        if len(cell) == INDEX_PRECISION:
+            response = client.get(f"{GEO_INDEX_NODE}/{cell}")
+            response.raise_for_status()
+            return {cell: response.json()}
+        # Sel lebih kasar: semua sel index yang diawali prefix ini. Catatan:
+        # rentang $key ini mengandalkan key bukan bilangan bulat; geohash
+        # yang seluruhnya angka hanya muncul jauh di belahan bumi barat.
+        response = client.get(GEO_INDEX_NODE, params={
+            "orderBy": '"$key"', "startAt": json.dumps(cell), "endAt": json.dumps(cell + "~")})
+        response.raise_for_status()
+        return response.json()
+
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        pages = list(executor.map(read, query_cells(lat, lng, radius_m)))
+
+    found = []
+    for page in pages:
+        for members in _as_children(page).values():
+            for umkm_id, location in _as_children(members).items():
+                if isinstance(location, dict) and "lat" in location and "lng" in location:
+                    distance = distance_m(lat, lng, location["lat"], location["lng"])
+                    if distance <= radius_m:
+                        found.append((round(distance, 1), umkm_id))
+    return sorted(found)
+
+
+def rebuild_index(dry_run=False):
+    """Membangun geo_index dari 'umkm' di Firebase dan hanya mengirim sel yang berbeda."""
+    from sync_database import diff_documents
+
+    with FirebaseClient(FIREBASE_URL) as client:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = list(executor.map(client.get, ["umkm", GEO_INDEX_NODE]))
+        for response in responses:
+            response.raise_for_status()
+        umkm_node, existing = (response.json() for response in responses)
+
+        index = build_index(umkm_node)
+        plan = diff_documents(existing or {}, index, GEO_INDEX_NODE)
+        print(f"{sum(len(members) for members in index.values())} UMKM di {len(index)} sel, "
+              f"{len(plan)} path berubah.")
+        if dry_run or not plan:
+            for path in sorted(plan):
+                print(f"  {'HAPUS' if plan[path] is None else 'TULIS'}  {path}")
+            return True
+
+        results = client.apply_batches(plan_patch_batches(plan))
+        failed = [response for _, response in results if not response.ok]
+        for response in failed:
+            print(f"Gagal menulis index (status {response.status_code}): {response.text}")
+        return not failed
+
+
+# ==============================================================================
+# BENCHMARK (EMULATOR LOKAL)
+# ==============================================================================
+
+def run_benchmark(umkm_counts, radius_m, queries=20, seed=0):
+    """
+    Membandingkan byte yang dibaca query radius lewat geo_index dengan scan
+    penuh node 'umkm', terhadap emulator berisi UMKM sintetis di sekitar Malang.
+    """
+    from profiling import percentile
+    from firebase_emulator import FirebaseEmulator
+    from generate_data import SyntheticDatabase, load_template
+
+    template = load_template()
+    rows = []
+    for count in umkm_counts:
+        umkm_node = dict(SyntheticDatabase(template, count, 0, 0, 0, seed).iter_umkm())
+        rng = random.Random(seed)
+        with FirebaseEmulator({"umkm": umkm_node, GEO_INDEX_NODE: build_index(umkm_node)}) as emulator, \
+                FirebaseClient(emulator.url) as client:
+            scan_bytes, index_bytes, reads, index_ms = [], [], [], []
+            for _ in range(queries):
+                lat, lng = -7.96 + rng.uniform(-0.05, 0.05), 112.62 + rng.uniform(-0.05, 0.05)
+
+                log_start = len(emulator.request_log)
+                response = client.get("umkm")
+                response.raise_for_status()
+                expected = sorted(
+                    (round(distance_m(lat, lng, umkm["lat"], umkm["lng"]), 1), umkm_id)
+                    for umkm_id, umkm in response.json().items()
+                    if distance_m(lat, lng, umkm["lat"], umkm["lng"]) <= radius_m)
+                scan_bytes.append(sum(entry[3] for entry in emulator.request_log[log_start:]))
+
+                log_start = len(emulator.request_log)
+                start = time.perf_counter()
+                found = query_nearby(client, lat, lng, radius_m)
+                index_ms.append((time.perf_counter() - start) * 1000)
+                log = emulator.request_log[log_start:]
+                index_bytes.append(sum(entry[3] for entry in log))
+                reads.append(len(log))
+                if found != expected:
+                    raise AssertionError(f"Hasil query index berbeda dari scan penuh di ({lat}, {lng}).")
+        rows.append((count, sum(scan_bytes) / queries, sum(index_bytes) / queries,
+                     sum(reads) / queries, percentile(index_ms, 0.5)))
+
+    print(f"\nQuery radius {radius_m:.0f} m, {queries} titik acak per ukuran katalog:")
+    print(f"  {'UMKM':>8}{'scan penuh':>14}{'geo_index':>14}{'hemat':>8}{'request':>10}{'p50 ms':>9}")
+    for count, scan, indexed, read_count, p50 in rows:
+        print(f"  {count:>8}{scan / 1024:>11.1f} KB{indexed / 1024:>11.1f} KB"
+              f"{100 - 100 * indexed / max(scan, 1):>7.0f}%{read_count:>10.1f}{p50:>9.1f}")
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Bangun node '{GEO_INDEX_NODE}' (index geohash UMKM) atau jalankan query radius.",
+        epilog="Contoh: python geo_index.py --near -7.956 112.615 --radius 1000")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="tampilkan path index yang akan berubah tanpa mengirim apa pun")
+    parser.add_argument("--near", nargs=2, type=float, metavar=("LAT", "LNG"),
+                        help="cari UMKM di sekitar titik ini lewat index")
+    parser.add_argument("--radius", type=float, default=1000, help="radius query dalam meter (default: 1000)")
+    parser.add_argument("--benchmark", nargs="*", type=int, metavar="JUMLAH_UMKM",
+                        help="bandingkan byte query index vs scan penuh di emulator lokal "
+                             "(default: 1000 10000 50000)")
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        run_benchmark(args.benchmark or [1000, 10000, 50000], args.radius)
+    elif args.near:
+        with FirebaseClient(FIREBASE_URL) as client:
+            for distance, umkm_id in query_nearby(client, args.near[0], args.near[1], args.radius):
+                print(f"  {distance:>8.0f} m  {umkm_id}")
+    elif rebuild_index(args.dry_run):
+        print(f"\n>>> Node '{GEO_INDEX_NODE}' sudah terbaru. <<<")
+    else:
+        print(f"\n>>> Sebagian index gagal ditulis, jalankan ulang skrip ini. <<<")
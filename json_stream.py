@@ -0,0 +1,446 @@
+import json
+import operator
+import re
+from itertools import accumulate, islice
+
+# ==============================================================================
+#              MIGRASI JSON STREAMING (MEMORI KONSTAN, TANPA json.load)
+# ==============================================================================
+# Membaca file export Firebase sedikit demi sedikit. Node level pertama yang
+# tidak ditargetkan (mis. 'orders') disalin apa adanya byte demi byte tanpa
+# pernah di-parse. Node yang ditargetkan (mis. 'users') diproses per child:
+# hanya satu child yang di-parse pada satu waktu, lalu ditulis ulang. Child
+# yang tidak berubah juga disalin byte demi byte.
+#
+# Dengan compact=True, semua whitespace di luar string dibuang sehingga file
+# hasil jauh lebih kecil daripada json.dump(..., indent=4).
+# ==============================================================================
+
+# Ukuran blok baca dari disk.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Pola "unrolled loop" untuk string JSON: linear, tanpa backtracking berlebihan.
+_STRING_TOKEN = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")')
+# Awalan buffer yang tidak berakhir di tengah string.
+_SAFE_PREFIX = re.compile(rb'[^"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"]*)*')
+# Satu langkah: isi non-kurung (termasuk string utuh) lalu tepat satu kurung.
+_BRACKET_STEP = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*[{}\[\]]')
+_NON_BRACKETS = bytes(byte for byte in range(256) if byte not in b"{}[]")
+_DEPTH_DELTA = {ord("{"): 1, ord("["): 1, ord("}"): -1, ord("]"): -1}
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb'[\s,\]}]')
+_WHITESPACE = b" \t\n\r"
+_INITIAL_SCAN_WINDOW = 1024
+
+
+def _safe_end(buf, pos, limit):
+    """Posisi akhir awalan buf[pos:limit] yang tidak berakhir di tengah string."""
+    if buf.find(b'\\"', pos, limit) == -1:
+        # Tanpa kutip ter-escape, string cukup dibatasi tanda kutip: jumlah kutip
+        # ganjil berarti string terakhir terpotong, jadi potong di kutip terakhir.
+        if buf.count(b'"', pos, limit) % 2:
+            return buf.rfind(b'"', pos, limit)
+        return limit
+    return _SAFE_PREFIX.match(buf, pos, limit).end()
+
+
+def _split_strings(segment):
+    """
+    Memecah segmen (yang tidak terpotong di tengah string) menjadi bagian-bagian:
+    indeks genap di luar string, indeks ganjil isi string.
+    """
+    if b'\\"' not in segment:
+        return segment.split(b'"')
+    return _STRING_TOKEN.split(segment)
+
+
+def _strip_outside_strings(segment):
+    """Membuang whitespace di luar string dari sebuah segmen."""
+    if b'\\"' not in segment:
+        parts = segment.split(b'"')
+        parts[::2] = [part.translate(None, _WHITESPACE) for part in parts[::2]]
+        return b'"'.join(parts)
+    parts = _STRING_TOKEN.split(segment)
+    parts[::2] = [part.translate(None, _WHITESPACE) for part in parts[::2]]
+    return b"".join(parts)
+
+
+class JsonStreamError(ValueError):
+    """Dilempar jika struktur JSON tidak sesuai yang diharapkan."""
+
+
+class JsonStreamReader:
+    """Pembaca token JSON berbasis buffer yang bisa menyalin nilai tanpa mem-parse-nya."""
+
+    def __init__(self, f, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.buf = b""
+        self.pos = 0
+
+    def _fill(self):
+        """Memastikan buffer berisi data; False jika file sudah habis."""
+        if self.pos < len(self.buf):
+            return True
+        self.buf = self.f.read(self.buffer_size)
+        self.pos = 0
+        return bool(self.buf)
+
+    def peek(self):
+        """Byte berikutnya tanpa mengonsumsinya (b'' jika EOF)."""
+        if not self._fill():
+            return b""
+        return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """Mengonsumsi satu byte struktural dan memastikan nilainya `char`."""
+        found = self.peek()
+        if found != char:
+            raise JsonStreamError(f"Diharapkan {char!r}, ditemukan {found!r}.")
+        self.pos += 1
+        return found
+
+    def read_whitespace(self):
+        """Mengonsumsi whitespace dan mengembalikannya (untuk disalin apa adanya)."""
+        parts = []
+        while self._fill():
+            start = self.pos
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            parts.append(self.buf[start:self.pos])
+            if self.pos < len(self.buf):
+                break
+        return b"".join(parts)
+
+    def copy_string(self, write):
+        """Menyalin satu string JSON (termasuk tanda kutip) ke `write`."""
+        write(self.expect(b'"'))
+        while True:
+            if not self._fill():
+                raise JsonStreamError("String tidak ditutup sebelum akhir file.")
+            match = _STRING_SPECIAL.search(self.buf, self.pos)
+            if match is None:
+                write(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                continue
+            end = match.end()
+            write(self.buf[self.pos:end])
+            self.pos = end
+            if match.group() == b'"':
+                return
+            # Backslash: byte berikutnya bagian dari escape, bisa jadi ada di blok berikutnya.
+            if not self._fill():
+                raise JsonStreamError("Escape tidak lengkap di akhir file.")
+            write(self.buf[self.pos:self.pos + 1])
+            self.pos += 1
+
+    def copy_value(self, write, compact=False):
+        """
+        Menyalin satu nilai JSON (object, array, string, atau skalar) ke `write`
+        tanpa mem-parse-nya. Dengan compact=True whitespace di luar string dibuang.
+        """
+        def emit(chunk):
+            if compact:
+                chunk = _strip_outside_strings(chunk)
+            if chunk:
+                write(chunk)
+
+        first = self.peek()
+        if first == b'"':
+            self.copy_string(write)
+            return
+        if first not in (b"{", b"["):
+            # Angka, true, false, null: salin sampai delimiter berikutnya.
+            while self._fill():
+                match = _SCALAR_END.search(self.buf, self.pos)
+                end = match.start() if match else len(self.buf)
+                write(self.buf[self.pos:end])
+                self.pos = end
+                if match:
+                    return
+            return
+
+        # Jendela pindai dimulai kecil dan terus digandakan, supaya nilai kecil
+        # (mis. satu order) tidak memindai sisa buffer yang besar.
+        depth = 0
+        window = _INITIAL_SCAN_WINDOW
+        while True:
+            if not self._fill():
+                raise JsonStreamError("Object/array tidak ditutup sebelum akhir file.")
+            end = _safe_end(self.buf, self.pos, min(len(self.buf), self.pos + window))
+            window *= 2
+            if end == self.pos:
+                # String terpotong di batas buffer: salin lewat jalur lambat yang aman.
+                self.copy_string(write)
+                continue
+            segment = self.buf[self.pos:end]
+            # Kedalaman kurung dihitung di luar loop Python: string dibuang, sisakan
+            # kurungnya saja, lalu cari titik kedalaman kembali ke 0.
+            brackets = b"".join(_split_strings(segment)[::2]).translate(None, _NON_BRACKETS)
+            depths = accumulate(map(_DEPTH_DELTA.__getitem__, brackets), initial=depth)
+            try:
+                closing = operator.indexOf(islice(depths, 1, None), 0)
+            except ValueError:
+                depth += (brackets.count(b"{") + brackets.count(b"[")
+                          - brackets.count(b"}") - brackets.count(b"]"))
+                emit(segment)
+                self.pos = end
+                continue
+            # Nilai berakhir di segmen ini: cari posisi persis kurung penutupnya.
+            match = next(islice(_BRACKET_STEP.finditer(self.buf, self.pos, end), closing, None))
+            emit(self.buf[self.pos:match.end()])
+            self.pos = match.end()
+            return
+
+    def read_value_bytes(self):
+        """Membaca satu nilai utuh sebagai bytes mentah (untuk subtree kecil)."""
+        parts = []
+        self.copy_value(parts.append)
+        return b"".join(parts)
+
+    def iter_object_members(self):
+        """
+        Iterasi member object pada posisi saat ini. Menghasilkan tuple
+        (awalan, key_mentah, key, pemisah): `awalan` adalah teks mentah sebelum
+        key (whitespace, plus koma untuk member kedua dst.), `pemisah` adalah
+        teks mentah di sekitar ':'. Pemanggil wajib mengonsumsi nilainya
+        sebelum lanjut ke member berikutnya.
+        Whitespace penutup sebelum '}' tersedia di atribut `trailing_whitespace`.
+        """
+        self.expect(b"{")
+        self.trailing_whitespace = b""
+        first = True
+        while True:
+            leading = self.read_whitespace()
+            if self.peek() == b"}":
+                self.trailing_whitespace = leading
+                self.pos += 1
+                return
+            if not first:
+                leading += self.expect(b",") + self.read_whitespace()
+            first = False
+            key_parts = []
+            self.copy_string(key_parts.append)
+            raw_key = b"".join(key_parts)
+            separator = self.read_whitespace()
+            self.expect(b":")
+            separator += b":" + self.read_whitespace()
+            yield leading, raw_key, json.loads(raw_key), separator
+
+
+# Nilai khusus yang dikembalikan transformasi untuk menghapus child.
+DELETE = "__json_stream_delete__"
+
+# Jumlah child per batch ketika transformasi dijalankan di process pool.
+DEFAULT_BATCH_SIZE = 2000
+
+
+def _indent_unit(leading, depth):
+    """
+    Satu tingkat lekukan file asli, ditebak dari whitespace di baris child pada
+    kedalaman `depth`. None jika child tidak diawali baris baru (file satu baris).
+    """
+    whitespace = leading.replace(b",", b"")
+    if b"\n" not in whitespace:
+        return None
+    line_indent = whitespace.rsplit(b"\n", 1)[-1]
+    width = len(line_indent) // depth
+    return ("\t" if b"\t" in line_indent else " ") * width or " " * 4
+
+
+def _dump_child(value, compact, leading, indent, depth=2):
+    """
+    Serialisasi nilai hasil transformasi untuk child pada kedalaman `depth`.
+    Lekukan dihitung dari `indent` (atau satu tingkat lekukan file asli jika
+    None) dikali `depth`; file satu baris tetap ditulis satu baris. Jenis baris
+    baru mengikuti file asli.
+    """
+    if compact:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    unit = _indent_unit(leading, depth) if indent is None else indent
+    if unit is None:
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+    if isinstance(unit, int):
+        unit = " " * unit
+    newline = "\r\n" if b"\r\n" in leading else "\n"
+    text = json.dumps(value, indent=unit, ensure_ascii=False)
+    return text.replace("\n", newline + unit * depth).encode("utf-8")
+
+
+def _transform_batch(transform, items, compact, indent):
+    """
+    Menjalankan `transform` untuk sekumpulan child mentah (bisa di proses lain).
+    `items` berisi tuple (awalan, key, nilai_mentah); hasilnya list tuple
+    (bytes_nilai_atau_None_jika_dihapus, berubah).
+    """
+    results = []
+    for leading, child_key, raw_value in items:
+        original = json.loads(raw_value)
+        result = transform(child_key, json.loads(raw_value))
+        if isinstance(result, str) and result == DELETE:
+            results.append((None, True))
+        elif result == original and not compact:
+            results.append((raw_value, False))
+        else:
+            results.append((_dump_child(result, compact, leading, indent), result != original))
+    return results
+
+
+def stream_transform(input_path, output_path, transforms, compact=False, indent=None,
+                     buffer_size=DEFAULT_BUFFER_SIZE, replace_nodes=None, executor=None,
+                     workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Menyalin `input_path` ke `output_path` sambil menerapkan transformasi per child.
+    `transforms` adalah dict {node_level_pertama: fn(child_key, child_value) -> nilai_baru};
+    fn boleh mengembalikan DELETE untuk membuang child tersebut.
+    Node lain disalin byte demi byte (atau diminifikasi jika compact=True).
+    `indent=None` berarti lekukan child yang ditulis ulang mengikuti file asli.
+    Node yang berupa array diperlakukan sebagai object ber-key indeks.
+    `replace_nodes` ({node: nilai}) mengganti/menambah node level pertama secara utuh.
+    Jika `executor` (mis. ProcessPoolExecutor) diberikan, node yang child-nya lebih
+    dari `batch_size` diproses per batch secara paralel; fn harus bisa di-pickle.
+    `workers` adalah jumlah worker executor tersebut, dipakai untuk membatasi
+    batch yang sedang berjalan.
+    Mengembalikan dict {node: jumlah_child_yang_berubah} untuk node yang ditemukan.
+    """
+    replace_nodes = dict(replace_nodes or {})
+    changed = {}
+    with open(input_path, "rb") as src, open(output_path, "wb") as dst:
+        reader = JsonStreamReader(src, buffer_size)
+        write = dst.write
+
+        def write_ws(whitespace):
+            if not compact:
+                write(whitespace)
+
+        def write_member_prefix(leading, is_first):
+            # Koma ditulis ulang sendiri supaya tetap valid ketika ada child yang dihapus.
+            write(b"" if is_first else b",")
+            write_ws(leading.replace(b",", b""))
+
+        def transform_node(key, transform):
+            changed[key] = 0
+            write(b"{")
+            written = [0]
+            pending = []
+            batch = []
+
+            def flush(items, results):
+                for (leading, raw_key, separator, _), (value_bytes, was_changed) in zip(items, results):
+                    changed[key] += was_changed
+                    if value_bytes is None:
+                        continue
+                    write_member_prefix(leading, written[0] == 0)
+                    written[0] += 1
+                    write(raw_key)
+                    write(b":" if compact else separator)
+                    write(value_bytes)
+
+            def submit(items):
+                work = [(leading, child_key, raw) for leading, _, _, (child_key, raw) in items]
+                if executor is None:
+                    flush(items, _transform_batch(transform, work, compact, indent))
+                    return
+                pending.append((items, executor.submit(_transform_batch, transform, work,
+                                                       compact, indent)))
+                # Batasi batch yang sedang berjalan agar memori tetap datar.
+                while len(pending) > 2 * workers:
+                    done_items, future = pending.pop(0)
+                    flush(done_items, future.result())
+
+            for leading, raw_key, child_key, separator in reader.iter_object_members():
+                batch.append((leading, raw_key, separator, (child_key, reader.read_value_bytes())))
+                if len(batch) >= batch_size:
+                    submit(batch)
+                    batch = []
+            trailing = reader.trailing_whitespace
+            if batch:
+                # Node kecil (atau sisa batch) cukup diproses langsung.
+                if pending:
+                    submit(batch)
+                else:
+                    work = [(leading, child_key, raw) for leading, _, _, (child_key, raw) in batch]
+                    flush(batch, _transform_batch(transform, work, compact, indent))
+            for done_items, future in pending:
+                flush(done_items, future.result())
+            write_ws(trailing)
+            write(b"}")
+
+        def transform_array_node(key, transform, leading):
+            # Node berbentuk array (export Firebase untuk key 0..n yang padat):
+            # key child adalah indeksnya. Node di-parse utuh; child yang dihapus
+            # menjadi null supaya indeks (= key di Firebase) child lain tidak bergeser.
+            raw_value = reader.read_value_bytes()
+            children = json.loads(raw_value)
+            results = []
+            changed[key] = 0
+            for index, child in enumerate(children):
+                if child is None:
+                    results.append(None)
+                    continue
+                result = transform(str(index), json.loads(json.dumps(child)))
+                if isinstance(result, str) and result == DELETE:
+                    result = None
+                changed[key] += result != child
+                results.append(result)
+            if changed[key] == 0 and not compact:
+                write(raw_value)
+            else:
+                write(_dump_child(results, compact, leading, indent, depth=1))
+
+        write_ws(reader.read_whitespace())
+        write(b"{")
+        first_member = True
+        leading = b""
+        for leading, raw_key, key, separator in reader.iter_object_members():
+            write_member_prefix(leading, first_member)
+            first_member = False
+            write(raw_key)
+            write(b":" if compact else separator)
+
+            if key in replace_nodes:
+                reader.copy_value(lambda chunk: None)
+                write(_dump_child(replace_nodes.pop(key), compact, leading, indent, depth=1))
+                continue
+
+            transform = transforms.get(key)
+            if transform is not None and reader.peek() == b"[":
+                transform_array_node(key, transform, leading)
+                continue
+            if transform is None or reader.peek() != b"{":
+                reader.copy_value(write, compact)
+                continue
+            transform_node(key, transform)
+
+        trailing = reader.trailing_whitespace
+        # Node pengganti yang belum ada di file ditambahkan di akhir object root.
+        for key, value in replace_nodes.items():
+            write_member_prefix(leading if not first_member else b"\n  ", first_member)
+            first_member = False
+            write(json.dumps(key).encode("utf-8"))
+            write(b":" if compact else b": ")
+            write(_dump_child(value, compact, leading or b"\n  ", indent, depth=1))
+        write_ws(trailing)
+        write(b"}")
+        write_ws(reader.read_whitespace())
+    return changed
+
+
+def validate_file(path, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Memastikan file export berisi JSON valid tanpa memuatnya utuh: object root
+    dan node level pertama dipindai, lalu setiap child di-parse satu per satu.
+    Melempar JsonStreamError atau json.JSONDecodeError jika tidak valid.
+    """
+    with open(path, "rb") as f:
+        reader = JsonStreamReader(f, buffer_size)
+        reader.read_whitespace()
+        for _ in reader.iter_object_members():
+            if reader.peek() != b"{":
+                json.loads(reader.read_value_bytes())
+                continue
+            for _ in reader.iter_object_members():
+                json.loads(reader.read_value_bytes())
+        reader.read_whitespace()
+        if reader.peek():
+            raise JsonStreamError("Ada data lain setelah object root.")
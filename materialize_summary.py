@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_client import FirebaseClient, plan_patch_batches
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
+
+# ==============================================================================
+#              MATERIALIZER RINGKASAN UMKM (NODE 'umkm_summary')
+# ==============================================================================
+# Halaman daftar UMKM di aplikasi butuh rating dan kisaran harga, tetapi
+# UmkmRepository harus mengambil reviews/umkm_menu/umkm_services per UMKM
+# (N kali fetch). Skrip ini menulis ringkasan kecil per UMKM:
+#
+#   umkm_summary/<umkmId> = {avgRating, reviewCount, minPrice, maxPrice,
+#                            itemCount, sourceHash, updatedAt}
+#
+# sehingga daftar cukup membaca satu node kecil. 'sourceHash' adalah hash dari
+# data sumber UMKM tersebut; UMKM yang hash-nya sama dengan run sebelumnya
+# dilewati, jadi hanya ringkasan yang sumbernya berubah yang ditulis ulang
+# (multi-path PATCH). Ringkasan UMKM yang sudah dihapus ikut dihapus.
+#
+# Supaya biaya baca tidak ikut tumbuh dengan seluruh database, setiap penulis
+# sumber menandai UMKM yang disentuhnya:
+#
+#   umkm_summary_dirty/<umkmId> = timestamp ms
+#
+# (aplikasi lewat UmkmRepository, skrip update/restore/sync lewat
+# dirty_marks_for_plan). Run biasa hanya membaca reviews/umkm_menu/
+# umkm_services milik UMKM yang ditandai atau belum punya ringkasan, plus daftar
+# id 'umkm' dan 'umkm_summary' (shallow). Penanda '_all' (mis. setelah seluruh
+# node sumber ditimpa) atau flag --full membaca semua sumber seperti semula.
+# Jalankan --full setelah menulis sumber dari luar jalur di atas, mis. edit
+# manual di console.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Node tujuan ringkasan.
+SUMMARY_NODE = "umkm_summary"
+# Node sumber ringkasan.
+SOURCE_NODES = ["reviews", "umkm_menu", "umkm_services"]
+# Node penanda UMKM yang sumbernya berubah, dan key penanda "semua berubah".
+DIRTY_NODE = "umkm_summary_dirty"
+ALL_DIRTY_KEY = "_all"
+# Rating untuk review format lama (string polos), sama seperti di aplikasi.
+LEGACY_REVIEW_RATING = 3.0
+
+
+def _children(value):
+    """Child sebuah node sebagai list; array Firebase bisa datang sebagai object."""
+    if isinstance(value, dict):
+        return list(value.values())
+    if isinstance(value, list):
+        return [item for item in value if item is not None]
+    return []
+
+
+def source_hash(reviews, menu, services):
+    """Hash data sumber satu UMKM; berubah jika salah satu sumbernya berubah."""
+    canonical = json.dumps([reviews, menu, services], sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def summarize_umkm(reviews, menu, services):
+    """Menghitung ringkasan satu UMKM dari child reviews, menu, dan layanannya."""
+    ratings = []
+    for review in _children(reviews):
+        if isinstance(review, dict):
+            rating = review.get("rating")
+            if isinstance(rating, (int, float)) and not isinstance(rating, bool):
+                ratings.append(float(rating))
+        elif isinstance(review, str):
+            ratings.append(LEGACY_REVIEW_RATING)
+
+    prices = [item["price"] for item in _children(menu) + _children(services)
+              if isinstance(item, dict) and isinstance(item.get("price"), (int, float))]
+
+    summary = {
+        "avgRating": round(sum(ratings) / len(ratings), 2) if ratings else 0,
+        "reviewCount": len(ratings),
+        "itemCount": len(prices),
+        "sourceHash": source_hash(reviews, menu, services),
+    }
+    # Tanpa menu/layanan, minPrice/maxPrice tidak ditulis (null di Firebase).
+    if prices:
+        summary["minPrice"] = min(prices)
+        summary["maxPrice"] = max(prices)
+    return summary
+
+
+def build_summary_plan(umkm_ids, sources, existing, now=None):
+    """
+    Menyusun multi-path update {path: nilai} untuk node ringkasan.
+    `sources` adalah {node_sumber: {umkmId: child}}, `existing` isi
+    umkm_summary saat ini. UMKM yang sourceHash-nya tidak berubah dilewati.
+    """
+    now = now if now is not None else int(time.time() * 1000)
+    existing = existing if isinstance(existing, dict) else {}
+    plan = {}
+    for umkm_id in umkm_ids:
+        reviews, menu, services = (sources.get(node, {}).get(umkm_id) for node in SOURCE_NODES)
+        digest = source_hash(reviews, menu, services)
+        current = existing.get(umkm_id)
+        if isinstance(current, dict) and current.get("sourceHash") == digest:
+            continue
+        summary = summarize_umkm(reviews, menu, services)
+        summary["updatedAt"] = now
+        plan[f"{SUMMARY_NODE}/{umkm_id}"] = summary
+    for umkm_id in set(existing) - set(umkm_ids):
+        plan[f"{SUMMARY_NODE}/{umkm_id}"] = None
+    return plan
+
+
+def dirty_marks_for_plan(plan, now=None):
+    """
+    Penanda DIRTY_NODE untuk multi-path update `plan` yang menyentuh node
+    sumber: satu penanda per UMKM, atau '_all' jika seluruh node ditimpa.
+    """
+    now = now if now is not None else int(time.time() * 1000)
+    marks = {}
+    for path in plan:
+        segments = [segment for segment in path.strip("/").split("/") if segment]
+        if not segments or (segments[0] in SOURCE_NODES and len(segments) == 1):
+            marks[f"{DIRTY_NODE}/{ALL_DIRTY_KEY}"] = now
+        elif segments[0] in SOURCE_NODES:
+            marks[f"{DIRTY_NODE}/{segments[1]}"] = now
+    return marks
+
+
+def _read_values(client, paths, params=None):
+    """GET paralel untuk setiap path; mengembalikan {path: nilai}."""
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        responses = list(executor.map(lambda path: client.get(path, params), paths))
+    values = {}
+    for path, response in zip(paths, responses):
+        response.raise_for_status()
+        values[path] = response.json()
+    return values
+
+
+def materialize_summaries(dry_run=False, full=False):
+    """
+    Menulis ringkasan yang berubah. Hanya sumber UMKM yang ditandai di
+    DIRTY_NODE (atau belum punya ringkasan) yang dibaca, kecuali full=True.
+    """
+    with FirebaseClient(FIREBASE_URL) as client:
+        # Daftar id cukup shallow; penanda kecil dibaca utuh.
+        with phase("read"):
+            shallow = _read_values(client, ["umkm", SUMMARY_NODE], {"shallow": "true"})
+            dirty = _read_values(client, [DIRTY_NODE])[DIRTY_NODE]
+        umkm_ids = sorted(shallow["umkm"]) if isinstance(shallow["umkm"], dict) else []
+        summary_ids = set(shallow[SUMMARY_NODE]) if isinstance(shallow[SUMMARY_NODE], dict) else set()
+        dirty = dirty if isinstance(dirty, dict) else {}
+        full = full or ALL_DIRTY_KEY in dirty
+
+        with phase("read"):
+            if full:
+                values = _read_values(client, SOURCE_NODES + [SUMMARY_NODE])
+                sources = {node: values[node] if isinstance(values[node], dict) else {}
+                           for node in SOURCE_NODES}
+                existing = values[SUMMARY_NODE] if isinstance(values[SUMMARY_NODE], dict) else {}
+                checked = umkm_ids
+            else:
+                checked = sorted((set(dirty) | (set(umkm_ids) - summary_ids)) & set(umkm_ids))
+                values = _read_values(client, [f"{node}/{umkm_id}" for umkm_id in checked
+                                               for node in SOURCE_NODES + [SUMMARY_NODE]])
+                sources = {node: {umkm_id: values[f"{node}/{umkm_id}"] for umkm_id in checked}
+                           for node in SOURCE_NODES}
+                existing = {umkm_id: values[f"{SUMMARY_NODE}/{umkm_id}"] for umkm_id in checked}
+
+        with phase("transform"):
+            plan = build_summary_plan(checked, sources, existing)
+            for umkm_id in summary_ids - set(umkm_ids):
+                plan[f"{SUMMARY_NODE}/{umkm_id}"] = None
+
+        written = sum(1 for value in plan.values() if value is not None)
+        print(f"{len(checked)} dari {len(umkm_ids)} UMKM diperiksa{' (penuh)' if full else ''}: "
+              f"{written} ringkasan ditulis, {len(plan) - written} dihapus, "
+              f"{len(checked) - written} tidak berubah.")
+        if dry_run:
+            for path in sorted(plan):
+                print(f"  {'HAPUS' if plan[path] is None else 'TULIS'}  {path}")
+            return True
+
+        failed = []
+        if plan:
+            with phase("upload"):
+                results = client.apply_batches(plan_patch_batches(plan))
+            failed = [response for _, response in results if not response.ok]
+            for response in failed:
+                print(f"Gagal menulis ringkasan (status {response.status_code}): {response.text}")
+        if failed or not dirty:
+            return not failed
+
+        # Penanda yang ditulis ulang selama run ini (nilainya berubah) dibiarkan
+        # untuk run berikutnya.
+        with phase("upload"):
+            current = _read_values(client, [DIRTY_NODE])[DIRTY_NODE]
+            current = current if isinstance(current, dict) else {}
+            cleared = {f"{DIRTY_NODE}/{key}": None for key, value in dirty.items()
+                       if current.get(key) == value}
+            if cleared:
+                results = client.apply_batches(plan_patch_batches(cleared))
+                failed = [response for _, response in results if not response.ok]
+        return not failed
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Perbarui node '{SUMMARY_NODE}' (rating & harga per UMKM) secara incremental.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="tampilkan ringkasan yang akan ditulis tanpa mengirim apa pun")
+    parser.add_argument("--full", action="store_true",
+                        help=f"baca semua sumber, bukan hanya UMKM yang ditandai di '{DIRTY_NODE}'")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        if materialize_summaries(args.dry_run, args.full):
+            print("\n>>> Ringkasan UMKM sudah terbaru. <<<")
+        else:
+            print("\n>>> Sebagian ringkasan gagal ditulis, jalankan ulang skrip ini. <<<")
+    finally:
+        finish_profiling(args)
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from data_schema import NORMALIZERS
+from json_stream import (DEFAULT_BATCH_SIZE, DELETE, JsonStreamReader, stream_transform,
+                         validate_file)
+
+# ==============================================================================
+#                 MESIN MIGRASI DEKLARATIF (SATU KALI JALAN)
+# ==============================================================================
+# Setiap perbaikan data didaftarkan sebagai migrasi dengan pola path node,
+# mis. 'users/*', 'orders/*', atau 'reviews/*/*'. Semua migrasi yang belum
+# dijalankan digabung (fused) menjadi satu kali traversal streaming atas file
+# export: setiap child hanya di-parse sekali lalu semua migrasi yang cocok
+# diterapkan berurutan. Node besar dibagi per batch ke process pool. Node yang
+# diekspor Firebase sebagai array diperlakukan sebagai object ber-key indeks.
+#
+# Migrasi yang sudah diterapkan dicatat di node 'schema_version'
+# ({id_migrasi: timestamp_ms}), sehingga menjalankan ulang tidak mengulang.
+# ==============================================================================
+
+# Node level pertama yang menyimpan penanda versi.
+VERSION_NODE = "schema_version"
+
+# Semua migrasi terdaftar, urut sesuai pendaftaran: {id: (pola-pola, fungsi)}.
+MIGRATIONS = {}
+
+
+def migration(migration_id, *patterns):
+    """
+    Dekorator untuk mendaftarkan migrasi. Setiap pola minimal dua segmen dan
+    segmen pertama harus nama node (bukan '*'). Fungsi menerima (path, nilai)
+    dengan path berupa tuple key, dan mengembalikan nilai baru atau DELETE.
+    """
+    def register(fn):
+        if migration_id in MIGRATIONS:
+            raise ValueError(f"Migrasi '{migration_id}' sudah terdaftar.")
+        parsed = []
+        for pattern in patterns:
+            segments = tuple(pattern.strip("/").split("/"))
+            if len(segments) < 2 or segments[0] == "*":
+                raise ValueError(f"Pola '{pattern}' harus berbentuk '<node>/<child>[/...]'.")
+            parsed.append(segments)
+        MIGRATIONS[migration_id] = (tuple(parsed), fn)
+        return fn
+    return register
+
+
+def _apply_at(value, segments, fn, path):
+    """Menerapkan `fn` pada setiap posisi di `value` yang cocok dengan `segments`."""
+    if not segments:
+        return fn(path, value)
+    if isinstance(value, dict):
+        keys = list(value.keys())
+    elif isinstance(value, list):
+        keys = [str(index) for index in range(len(value))]
+    else:
+        return value
+
+    segment, rest = segments[0], segments[1:]
+    removed = set()
+    for key in keys:
+        if segment != "*" and segment != key:
+            continue
+        child = value[int(key)] if isinstance(value, list) else value[key]
+        result = _apply_at(child, rest, fn, path + (key,))
+        if isinstance(result, str) and result == DELETE:
+            removed.add(key)
+        elif isinstance(value, list):
+            value[int(key)] = result
+        else:
+            value[key] = result
+
+    if isinstance(value, list):
+        return [item for index, item in enumerate(value) if str(index) not in removed]
+    for key in removed:
+        del value[key]
+    return value
+
+
+def _apply_node_migrations(node, migration_ids, child_key, value):
+    """Fungsi gabungan untuk satu child node: semua migrasi diterapkan berurutan."""
+    for migration_id in migration_ids:
+        patterns, fn = MIGRATIONS[migration_id]
+        for segments in patterns:
+            if segments[0] != node or segments[1] not in ("*", child_key):
+                continue
+            value = _apply_at(value, segments[2:], fn, (node, child_key))
+            if isinstance(value, str) and value == DELETE:
+                return DELETE
+    return value
+
+
+def read_applied_migrations(json_file_path):
+    """
+    Membaca node penanda versi dari file export. Node lain hanya dipindai
+    (tidak di-parse), jadi jauh lebih murah daripada json.load.
+    """
+    with open(json_file_path, "rb") as f:
+        reader = JsonStreamReader(f)
+        reader.read_whitespace()
+        for _, _, key, _ in reader.iter_object_members():
+            if key == VERSION_NODE:
+                applied = json.loads(reader.read_value_bytes())
+                return applied if isinstance(applied, dict) else {}
+            reader.copy_value(lambda chunk: None)
+    return {}
+
+
+def run_migrations(input_path, output_path, compact=False, workers=None,
+                   batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Menjalankan semua migrasi yang belum tercatat dalam satu kali traversal.
+    Hasil ditulis ke file sementara dan baru menggantikan `output_path` (boleh
+    sama dengan `input_path`) setelah di-parse ulang tanpa error.
+    Mengembalikan list id migrasi yang diterapkan.
+    """
+    applied = read_applied_migrations(input_path)
+    pending = [migration_id for migration_id in MIGRATIONS if migration_id not in applied]
+    if not pending:
+        return []
+
+    nodes = {segments[0] for migration_id in pending for segments in MIGRATIONS[migration_id][0]}
+    transforms = {node: partial(_apply_node_migrations, node, tuple(pending)) for node in nodes}
+
+    now = int(time.time() * 1000)
+    marker = dict(applied)
+    marker.update({migration_id: now for migration_id in pending})
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    temp_path = output_path + ".tmp"
+    try:
+        changed = stream_transform(input_path, temp_path, transforms, compact=compact,
+                                   replace_nodes={VERSION_NODE: marker},
+                                   executor=executor, workers=workers, batch_size=batch_size)
+        validate_file(temp_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    os.replace(temp_path, output_path)
+
+    for node in sorted(changed):
+        print(f"  {node}: {changed[node]} child berubah")
+    return pending
+
+
+# ==============================================================================
+# DAFTAR MIGRASI
+# ==============================================================================
+# Tambahkan migrasi baru di bawah ini dengan id berurutan. Jangan mengubah
+# migrasi yang sudah pernah dijalankan; buat migrasi baru untuk koreksi.
+# ==============================================================================
+
+@migration("0001_add_user_balance", "users/*", "user/*")
+def add_user_balance(path, user_data):
+    """Menambahkan 'balance: 0.0' ke user yang belum memilikinya (lihat add_balance_to_db.py)."""
+    if isinstance(user_data, dict) and "balance" not in user_data:
+        user_data["balance"] = 0.0
+    return user_data
+
+
+@migration("0002_normalize_reviews_catalog", "reviews/*", "umkm_menu/*", "umkm_services/*")
+def normalize_reviews_catalog(path, value):
+    """Bentuk kanonik untuk reviews, umkm_menu, dan umkm_services (lihat data_schema.py)."""
+    node, umkm_id = path
+    return NORMALIZERS[node](umkm_id, value)
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Jalankan semua migrasi yang belum diterapkan dalam satu kali jalan.",
+        epilog="Contoh: python migrations.py \"final-ca080-default-rtdb-export (2).json\" migrated.json")
+    parser.add_argument("input_file", help="file export JSON sumber")
+    parser.add_argument("output_file", nargs="?",
+                        help="file hasil migrasi (boleh sama dengan input_file)")
+    parser.add_argument("--list", action="store_true", help="tampilkan status migrasi saja")
+    parser.add_argument("--compact", action="store_true", help="tulis JSON tanpa whitespace")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="jumlah proses untuk node besar (default: jumlah CPU, 1 = tanpa pool)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"jumlah child per batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    if args.list:
+        applied = read_applied_migrations(args.input_file)
+        for migration_id in MIGRATIONS:
+            status = "SUDAH" if migration_id in applied else "BELUM"
+            print(f"  [{status}] {migration_id}")
+    elif not args.output_file:
+        parser.error("output_file wajib diisi kecuali memakai --list")
+    else:
+        start = time.perf_counter()
+        applied_now = run_migrations(args.input_file, args.output_file, args.compact,
+                                     args.workers, args.batch_size)
+        if applied_now:
+            print(f"\n{len(applied_now)} migrasi diterapkan dalam "
+                  f"{time.perf_counter() - start:.2f} detik: {', '.join(applied_now)}")
+            print(f"Hasil disimpan ke: {args.output_file}")
+        else:
+            print("Tidak ada migrasi yang perlu dijalankan.")
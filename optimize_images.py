@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote, unquote
+
+from PIL import Image, ImageOps
+
+# ==============================================================================
+#              OPTIMASI GAMBAR UMKM KE WEBP (THUMBNAIL + DETAIL)
+# ==============================================================================
+# Setiap 'umkm/*/imageUrl' menunjuk file mentah di assets/images/ (JPG/PNG
+# berukuran penuh) yang diunduh utuh oleh setiap HP. Skrip ini:
+# 1. Memindai assets/images/umkm*/ dan membuat varian WebP berukuran tetap
+#    (thumb untuk daftar, detail untuk halaman detail) memakai process pool.
+# 2. Melewati file yang isinya tidak berubah berdasarkan hash SHA-256 di
+#    manifest (assets/optimized/manifest.json).
+# 3. Menulis ulang umkm.json: 'imageUrl' menjadi varian detail, ditambah
+#    'imageThumbUrl' dan 'imageOriginalUrl'. Setelah itu jalankan
+#    sync_database.py umkm.json agar URL baru terkirim ke Firebase.
+# URL baru memakai raw.githubusercontent.com langsung, jadi tidak ada redirect
+# tambahan seperti pada URL '.../blob/master/...?raw=true'.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# Folder sumber gambar dan folder hasil optimasi.
+IMAGES_DIR = os.path.join("assets", "images")
+OUTPUT_DIR = os.path.join("assets", "optimized")
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.json")
+# File data yang imageUrl-nya ditulis ulang.
+UMKM_JSON_FILE = "umkm.json"
+# Base URL file mentah di repo GitHub.
+RAW_BASE_URL = "https://raw.githubusercontent.com/G4l1le30/project/master"
+# Sisi terpanjang (piksel) setiap varian. Gambar kecil tidak diperbesar.
+VARIANTS = {"thumb": 480, "detail": 1280}
+# Kualitas WebP (0-100).
+WEBP_QUALITY = 80
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+_ASSET_URL = re.compile(r"/assets/images/([^?#]+)")
+_OPTIMIZED_URL = re.compile(r"/assets/optimized/")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_hash():
+    """Hash pengaturan varian; jika berubah, semua gambar dibuat ulang."""
+    return hashlib.sha256(json.dumps([VARIANTS, WEBP_QUALITY]).encode("utf-8")).hexdigest()[:16]
+
+
+def find_images(images_dir=IMAGES_DIR):
+    """Path relatif (pakai '/') semua gambar di images_dir/umkm*/."""
+    found = []
+    for folder in sorted(os.listdir(images_dir)):
+        folder_path = os.path.join(images_dir, folder)
+        if not folder.startswith("umkm") or not os.path.isdir(folder_path):
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                found.append(f"{folder}/{name}")
+    return found
+
+
+def variant_path(relative_path, variant):
+    """
+    assets/optimized/<umkm>/<nama.ext>-<varian>.webp untuk gambar sumber
+    relative_path. Ekstensi sumber ikut dipakai supaya x.jpg dan x.png di
+    folder yang sama tidak saling menimpa.
+    """
+    folder, name = relative_path.rsplit("/", 1)
+    return os.path.join(OUTPUT_DIR, folder, f"{name}-{variant}.webp")
+
+
+def _variants_current(path, entry):
+    """True jika semua varian entry manifest ada dan memakai nama saat ini."""
+    variants = entry.get("variants", {})
+    return set(variants) == set(VARIANTS) and all(
+        info["path"] == variant_path(path, name).replace(os.sep, "/") and os.path.exists(info["path"])
+        for name, info in variants.items())
+
+
+def _remove_stale_variants(old_entry, new_entry=None):
+    """Menghapus file varian lama yang tidak dipakai lagi oleh new_entry."""
+    keep = {info["path"] for info in (new_entry or {}).get("variants", {}).values()}
+    for info in (old_entry or {}).get("variants", {}).values():
+        if info["path"] not in keep and os.path.exists(info["path"]):
+            os.remove(info["path"])
+
+
+def optimize_image(relative_path):
+    """
+    Membuat semua varian WebP untuk satu gambar (dijalankan di proses worker).
+    Mengembalikan (relative_path, info varian).
+    """
+    source = os.path.join(IMAGES_DIR, *relative_path.split("/"))
+    variants = {}
+    with Image.open(source) as image:
+        # Hormati orientasi EXIF dari kamera HP sebelum di-resize.
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        for variant, max_side in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side), Image.LANCZOS)
+            output = variant_path(relative_path, variant)
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            resized.save(output, "WEBP", quality=WEBP_QUALITY, method=6)
+            variants[variant] = {"path": output.replace(os.sep, "/"), "width": resized.width,
+                                 "height": resized.height, "bytes": os.path.getsize(output)}
+    return relative_path, variants
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {"settings": settings_hash(), "images": {}}
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("settings") != settings_hash():
+        print("Pengaturan varian berubah, semua gambar dibuat ulang.")
+        return {"settings": settings_hash(), "images": {}}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def optimize_all(workers=None, force=False):
+    """Memproses gambar baru/berubah secara paralel; mengembalikan (manifest, jumlah diproses)."""
+    manifest = load_manifest()
+    images = manifest["images"]
+    sources = find_images()
+    hashes = {path: file_hash(os.path.join(IMAGES_DIR, *path.split("/"))) for path in sources}
+
+    changed = [path for path in sources
+               if force or images.get(path, {}).get("sha256") != hashes[path]
+               or not _variants_current(path, images[path])]
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path, variants in executor.map(optimize_image, changed):
+                source_bytes = os.path.getsize(os.path.join(IMAGES_DIR, *path.split("/")))
+                entry = {"sha256": hashes[path], "bytes": source_bytes, "variants": variants}
+                _remove_stale_variants(images.get(path), entry)
+                images[path] = entry
+                sizes = ", ".join(f"{name} {info['bytes'] / 1024:.0f} KB"
+                                  for name, info in variants.items())
+                print(f"  {path} ({source_bytes / 1024:.0f} KB) -> {sizes}")
+
+    # Gambar sumber yang sudah dihapus tidak dicatat lagi.
+    for path in set(images) - set(sources):
+        _remove_stale_variants(images.pop(path))
+    save_manifest(manifest)
+    return manifest, len(changed)
+
+
+def asset_url(path):
+    return f"{RAW_BASE_URL}/{quote(path)}"
+
+
+def rewrite_image_urls(manifest, json_file_path=UMKM_JSON_FILE):
+    """
+    Menulis ulang imageUrl di file JSON ke varian WebP. URL asli disimpan di
+    imageOriginalUrl sehingga skrip bisa dijalankan ulang. imageUrl yang sudah
+    diganti pemilik (bukan varian assets/optimized/) menjadi sumber baru.
+    Mengembalikan jumlah UMKM yang berubah.
+    """
+    with open(json_file_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    umkm_node = data.get("umkm", data)
+
+    changed = 0
+    for umkm in umkm_node.values():
+        if not isinstance(umkm, dict):
+            continue
+        original = umkm.get("imageUrl") or ""
+        if _OPTIMIZED_URL.search(original):
+            original = umkm.get("imageOriginalUrl") or original
+        match = _ASSET_URL.search(original)
+        entry = manifest["images"].get(unquote(match.group(1))) if match else None
+        if entry is not None:
+            updated = dict(umkm, imageOriginalUrl=original,
+                           imageUrl=asset_url(entry["variants"]["detail"]["path"]),
+                           imageThumbUrl=asset_url(entry["variants"]["thumb"]["path"]))
+        elif _OPTIMIZED_URL.search(original):
+            continue
+        else:
+            # Gambar baru di luar assets/images: varian lama tidak berlaku lagi.
+            updated = {key: value for key, value in umkm.items()
+                       if key not in ("imageOriginalUrl", "imageThumbUrl")}
+        if updated != umkm:
+            umkm.clear()
+            umkm.update(updated)
+            changed += 1
+
+    if changed:
+        # Pertahankan format file: indentasi 2 spasi dan jenis baris baru aslinya.
+        text = json.dumps(data, indent=2)
+        if b"\r\n" in raw:
+            text = text.replace("\n", "\r\n")
+        with open(json_file_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    return changed
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Buat varian WebP untuk gambar UMKM dan tulis ulang imageUrl di umkm.json.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="jumlah proses (default: jumlah CPU)")
+    parser.add_argument("--force", action="store_true", help="proses ulang semua gambar")
+    parser.add_argument("--json-file", default=UMKM_JSON_FILE,
+                        help=f"file yang imageUrl-nya ditulis ulang (default: {UMKM_JSON_FILE})")
+    parser.add_argument("--no-rewrite", action="store_true", help="hanya buat varian, jangan ubah JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, processed = optimize_all(args.workers, args.force)
+    source_total = sum(entry["bytes"] for entry in manifest["images"].values())
+    print(f"\n{processed} gambar diproses, {len(manifest['images']) - processed} tidak berubah "
+          f"({time.perf_counter() - start:.2f} detik).")
+    for variant in VARIANTS:
+        total = sum(entry["variants"][variant]["bytes"] for entry in manifest["images"].values())
+        print(f"  {variant:<8}{total / 1024:>9.0f} KB  (asli {source_total / 1024:.0f} KB, "
+              f"hemat {100 - 100 * total / max(source_total, 1):.0f}%)")
+
+    if not args.no_rewrite:
+        changed = rewrite_image_urls(manifest, args.json_file)
+        print(f"\n{changed} imageUrl ditulis ulang di '{args.json_file}'.")
+        if changed:
+            print(f"Kirim ke Firebase dengan: python sync_database.py {args.json_file}")
@@ -0,0 +1,355 @@
+import argparse
+import io
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from firebase_client import FirebaseClient
+from json_stream import JsonStreamReader
+
+# ==============================================================================
+#                 ANALITIK ORDER BERBASIS KOLOM (NUMPY)
+# ==============================================================================
+# Node 'orders' diratakan sekali menjadi array kolom NumPy:
+# - per order : umkmId, orderTimestamp, totalPrice
+# - per item  : indeks order, indeks menu (umkmId + nama), harga, quantity
+# String (umkmId, nama menu) disimpan sebagai kamus + indeks int32, jadi semua
+# laporan (pendapatan per UMKM, per menu, per jam/hari, cek konsistensi
+# totalPrice) cukup memakai bincount/unique tanpa loop Python.
+#
+# Store bisa disimpan ke file .npz dan ditambah secara incremental: hanya order
+# dengan key baru yang diratakan, tanpa membangun ulang dari awal. Key push()
+# Firebase urut waktu, jadi pengambilan dari server cukup mulai dari key
+# terakhir yang sudah ada di store.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# File store default untuk mode incremental.
+DEFAULT_STORE_PATH = "orders_store.npz"
+# Zona waktu untuk bucket jam/hari (WIB = UTC+7).
+TIMEZONE_OFFSET_HOURS = 7
+# Selisih (rupiah) antara totalPrice dan jumlah item yang masih dianggap sama.
+PRICE_TOLERANCE = 0.5
+# Jumlah order per halaman saat mengambil order baru dari Firebase.
+FETCH_PAGE_SIZE = 5000
+
+_ORDER_COLUMNS = {"umkm": np.int32, "timestamp": np.int64, "total_price": np.float64}
+_ITEM_COLUMNS = {"order": np.int64, "item": np.int32, "price": np.float64, "quantity": np.float64}
+_HOUR_MS = 3600 * 1000
+_DAY_MS = 24 * _HOUR_MS
+
+
+def _number(value):
+    """Angka dari field JSON; nilai kosong atau bukan angka dianggap 0."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0
+    return value
+
+
+class OrderStore:
+    """Store kolom untuk node 'orders' yang bisa ditambah secara incremental."""
+
+    def __init__(self):
+        self.order_keys = []
+        self._key_index = set()
+        self.umkm_ids = []
+        self._umkm_index = {}
+        # Setiap menu adalah pasangan (indeks UMKM, nama).
+        self.items = []
+        self._item_index = {}
+        # Kolom disimpan sebagai list potongan array; digabung saat laporan dibuat.
+        self._orders = {name: [] for name in _ORDER_COLUMNS}
+        self._order_items = {name: [] for name in _ITEM_COLUMNS}
+
+    def __len__(self):
+        return len(self.order_keys)
+
+    @property
+    def last_key(self):
+        """Key order terbesar (terbaru) di store, atau None jika store kosong."""
+        return max(self.order_keys) if self.order_keys else None
+
+    def _umkm(self, umkm_id):
+        umkm_id = umkm_id if isinstance(umkm_id, str) else ""
+        if umkm_id not in self._umkm_index:
+            self._umkm_index[umkm_id] = len(self.umkm_ids)
+            self.umkm_ids.append(umkm_id)
+        return self._umkm_index[umkm_id]
+
+    def _item(self, umkm, name):
+        key = (umkm, name if isinstance(name, str) else "")
+        if key not in self._item_index:
+            self._item_index[key] = len(self.items)
+            self.items.append(key)
+        return self._item_index[key]
+
+    def append(self, orders):
+        """
+        Meratakan order dari iterable (key, order) dan menambahkannya ke store.
+        Key yang sudah ada dilewati. Mengembalikan jumlah order yang ditambahkan.
+        """
+        order_rows = {name: [] for name in _ORDER_COLUMNS}
+        item_rows = {name: [] for name in _ITEM_COLUMNS}
+        added = 0
+        for key, order in orders:
+            if key in self._key_index or not isinstance(order, dict):
+                continue
+            self._key_index.add(key)
+            self.order_keys.append(key)
+            index = len(self.order_keys) - 1
+            umkm = self._umkm(order.get("umkmId"))
+            order_rows["umkm"].append(umkm)
+            order_rows["timestamp"].append(_number(order.get("orderTimestamp")))
+            order_rows["total_price"].append(_number(order.get("totalPrice")))
+
+            # Firebase bisa mengembalikan array item sebagai object ber-key indeks.
+            items = order.get("items") or []
+            for entry in items.values() if isinstance(items, dict) else items:
+                if not isinstance(entry, dict):
+                    continue
+                item = entry.get("item") if isinstance(entry.get("item"), dict) else {}
+                item_umkm = self._umkm(item.get("umkmId") or entry.get("umkmId") or order.get("umkmId"))
+                item_rows["order"].append(index)
+                item_rows["item"].append(self._item(item_umkm, item.get("name")))
+                item_rows["price"].append(_number(item.get("price")))
+                item_rows["quantity"].append(_number(entry.get("quantity")))
+            added += 1
+
+        if added:
+            for name, dtype in _ORDER_COLUMNS.items():
+                self._orders[name].append(np.array(order_rows[name], dtype=dtype))
+            for name, dtype in _ITEM_COLUMNS.items():
+                self._order_items[name].append(np.array(item_rows[name], dtype=dtype))
+        return added
+
+    def _column(self, columns, name, dtype):
+        """Menggabungkan potongan kolom menjadi satu array (sekali per append)."""
+        chunks = columns[name]
+        if len(chunks) != 1:
+            columns[name] = [np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)]
+        return columns[name][0]
+
+    def order_column(self, name):
+        return self._column(self._orders, name, _ORDER_COLUMNS[name])
+
+    def item_column(self, name):
+        return self._column(self._order_items, name, _ITEM_COLUMNS[name])
+
+    # --- Laporan ---
+
+    def revenue_per_umkm(self):
+        """List (umkmId, jumlah_order, pendapatan) urut pendapatan terbesar."""
+        umkm = self.order_column("umkm")
+        counts = np.bincount(umkm, minlength=len(self.umkm_ids))
+        revenue = np.bincount(umkm, weights=self.order_column("total_price"),
+                              minlength=len(self.umkm_ids))
+        order = np.argsort(-revenue, kind="stable")
+        return [(self.umkm_ids[index], int(counts[index]), float(revenue[index]))
+                for index in order if counts[index]]
+
+    def revenue_per_item(self):
+        """List (umkmId, nama_menu, quantity, pendapatan) urut pendapatan terbesar."""
+        item = self.item_column("item")
+        quantity = self.item_column("quantity")
+        sold = np.bincount(item, weights=quantity, minlength=len(self.items))
+        revenue = np.bincount(item, weights=self.item_column("price") * quantity,
+                              minlength=len(self.items))
+        order = np.argsort(-revenue, kind="stable")
+        return [(self.umkm_ids[self.items[index][0]], self.items[index][1],
+                 float(sold[index]), float(revenue[index]))
+                for index in order if sold[index]]
+
+    def revenue_per_bucket(self, bucket="day"):
+        """
+        List (awal_bucket, jumlah_order, pendapatan) urut waktu. `bucket`: 'hour'
+        atau 'day' (awal bucket dalam epoch ms), atau 'hour_of_day' (jam 0-23
+        WIB, pola jam ramai gabungan semua hari).
+        """
+        offset = TIMEZONE_OFFSET_HOURS * _HOUR_MS
+        local = self.order_column("timestamp") + offset
+        if bucket == "hour_of_day":
+            slots = (local // _HOUR_MS) % 24
+            counts = np.bincount(slots, minlength=24)
+            revenue = np.bincount(slots, weights=self.order_column("total_price"), minlength=24)
+            return [(hour, int(counts[hour]), float(revenue[hour])) for hour in range(24)]
+        size = {"hour": _HOUR_MS, "day": _DAY_MS}[bucket]
+        starts, inverse = np.unique(local // size, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(starts))
+        revenue = np.bincount(inverse, weights=self.order_column("total_price"),
+                              minlength=len(starts))
+        return [(int(start) * size - offset, int(count), float(total))
+                for start, count, total in zip(starts, counts, revenue)]
+
+    def inconsistent_orders(self, tolerance=PRICE_TOLERANCE):
+        """
+        Order yang totalPrice-nya tidak sama dengan jumlah harga x quantity
+        item-nya. Mengembalikan list (key, totalPrice, total_item).
+        """
+        totals = self.order_column("total_price")
+        computed = np.bincount(self.item_column("order"),
+                               weights=self.item_column("price") * self.item_column("quantity"),
+                               minlength=len(totals))
+        mismatched = np.flatnonzero(np.abs(totals - computed) > tolerance)
+        return [(self.order_keys[index], float(totals[index]), float(computed[index]))
+                for index in mismatched]
+
+    # --- Simpan/muat ---
+
+    def save(self, path):
+        """Menyimpan store ke file .npz (tanpa pickle), ditulis atomik."""
+        arrays = {f"order_{name}": self.order_column(name) for name in _ORDER_COLUMNS}
+        arrays.update({f"item_{name}": self.item_column(name) for name in _ITEM_COLUMNS})
+        arrays["order_keys"] = np.array(self.order_keys, dtype=str)
+        arrays["umkm_ids"] = np.array(self.umkm_ids, dtype=str)
+        arrays["item_umkm"] = np.array([umkm for umkm, _ in self.items], dtype=np.int32)
+        arrays["item_names"] = np.array([name for _, name in self.items], dtype=str)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            store.order_keys = data["order_keys"].tolist()
+            store._key_index = set(store.order_keys)
+            store.umkm_ids = data["umkm_ids"].tolist()
+            store._umkm_index = {umkm_id: index for index, umkm_id in enumerate(store.umkm_ids)}
+            store.items = list(zip(data["item_umkm"].tolist(), data["item_names"].tolist()))
+            store._item_index = {item: index for index, item in enumerate(store.items)}
+            store._orders = {name: [data[f"order_{name}"]] for name in _ORDER_COLUMNS}
+            store._order_items = {name: [data[f"item_{name}"]] for name in _ITEM_COLUMNS}
+        return store
+
+
+# ==============================================================================
+# SUMBER ORDER
+# ==============================================================================
+
+def iter_export_orders(json_file_path):
+    """
+    Iterasi (key, order) dari file export secara streaming: hanya child 'orders'
+    yang di-parse satu per satu, node lain dilewati tanpa di-parse.
+    """
+    with open(json_file_path, "rb") as f:
+        reader = JsonStreamReader(f)
+        reader.read_whitespace()
+        for _, _, node, _ in reader.iter_object_members():
+            if node != "orders" or reader.peek() != b"{":
+                reader.copy_value(lambda chunk: None)
+                continue
+            for _, _, key, _ in reader.iter_object_members():
+                yield key, json.loads(reader.read_value_bytes())
+
+
+def iter_remote_orders(client, after_key=None, page_size=FETCH_PAGE_SIZE):
+    """
+    Iterasi (key, order) dari Firebase per halaman (orderBy="$key"), mulai
+    setelah `after_key`. Memakai key terakhir store sebagai `after_key` berarti
+    hanya order baru yang diunduh.
+    """
+    while True:
+        params = {"orderBy": '"$key"', "limitToFirst": str(page_size + 1)}
+        if after_key is not None:
+            params["startAt"] = json.dumps(after_key)
+        response = client.get("orders", params=params)
+        response.raise_for_status()
+        page = sorted((response.json() or {}).items())
+        page = [(key, order) for key, order in page if key != after_key]
+        yield from page
+        if len(page) < page_size:
+            return
+        after_key = page[-1][0]
+
+
+# ==============================================================================
+# CETAK LAPORAN
+# ==============================================================================
+
+def _bucket_label(start_ms, bucket):
+    if bucket == "hour_of_day":
+        return f"{start_ms:02d}:00"
+    moment = datetime.fromtimestamp(start_ms / 1000, timezone(timedelta(hours=TIMEZONE_OFFSET_HOURS)))
+    return moment.strftime("%Y-%m-%d %H:00" if bucket == "hour" else "%Y-%m-%d")
+
+
+def print_report(store, report, top=20):
+    """Mencetak satu laporan ke stdout beserta waktu hitungnya."""
+    start = time.perf_counter()
+    out = io.StringIO()
+    if report == "umkm":
+        rows = store.revenue_per_umkm()
+        out.write(f"{'UMKM':<24}{'order':>10}{'pendapatan':>18}\n")
+        for umkm_id, count, revenue in rows[:top]:
+            out.write(f"{umkm_id:<24}{count:>10}{revenue:>18,.0f}\n")
+    elif report == "item":
+        rows = store.revenue_per_item()
+        out.write(f"{'UMKM':<16}{'menu':<28}{'terjual':>10}{'pendapatan':>18}\n")
+        for umkm_id, name, sold, revenue in rows[:top]:
+            out.write(f"{umkm_id:<16}{name[:27]:<28}{sold:>10,.0f}{revenue:>18,.0f}\n")
+    elif report == "check":
+        rows = store.inconsistent_orders()
+        out.write(f"{len(rows)} order dengan totalPrice tidak sesuai item:\n")
+        for key, total, computed in rows[:top]:
+            out.write(f"  {key}: totalPrice {total:,.0f}, jumlah item {computed:,.0f}\n")
+    else:
+        rows = store.revenue_per_bucket(report)
+        out.write(f"{'waktu (WIB)':<20}{'order':>10}{'pendapatan':>18}\n")
+        # Bucket waktu ditampilkan dari yang terbaru.
+        shown = rows if report == "hour_of_day" else rows[::-1][:top]
+        for start_ms, count, revenue in shown:
+            out.write(f"{_bucket_label(start_ms, report):<20}{count:>10}{revenue:>18,.0f}\n")
+    elapsed = time.perf_counter() - start
+    print(f"\n=== Laporan '{report}' ({elapsed * 1000:.0f} ms) ===")
+    print(out.getvalue(), end="")
+
+
+REPORTS = ["umkm", "item", "hour", "day", "hour_of_day", "check"]
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Analitik pendapatan dari node 'orders' memakai array kolom NumPy.",
+        epilog="Contoh: python order_analytics.py \"final-ca080-default-rtdb-export (2).json\" "
+               "--store orders_store.npz --report umkm --report day")
+    parser.add_argument("export_file", nargs="?", help="file export JSON sumber order")
+    parser.add_argument("--firebase", action="store_true",
+                        help="ambil order baru langsung dari Firebase")
+    parser.add_argument("--store", help=f"file store incremental (mis. {DEFAULT_STORE_PATH})")
+    parser.add_argument("--report", action="append", choices=REPORTS,
+                        help="laporan yang dicetak (boleh diulang; default: umkm, day, check)")
+    parser.add_argument("--top", type=int, default=20, help="jumlah baris per laporan (default: 20)")
+    args = parser.parse_args()
+
+    if not (args.export_file or args.firebase or args.store):
+        parser.error("isi export_file, --firebase, atau --store")
+
+    store = OrderStore.load(args.store) if args.store and os.path.exists(args.store) else OrderStore()
+    if len(store):
+        print(f"Store '{args.store}': {len(store)} order.")
+
+    start = time.perf_counter()
+    added = 0
+    if args.export_file:
+        added += store.append(iter_export_orders(args.export_file))
+    if args.firebase:
+        with FirebaseClient(FIREBASE_URL) as client:
+            added += store.append(iter_remote_orders(client, store.last_key))
+    if args.export_file or args.firebase:
+        print(f"{added} order baru diratakan dalam {time.perf_counter() - start:.2f} detik "
+              f"(total {len(store)} order).")
+    if args.store and added:
+        store.save(args.store)
+        print(f"Store disimpan ke: {args.store}")
+
+    for report in args.report or ["umkm", "day", "check"]:
+        print_report(store, report, args.top)
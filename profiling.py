@@ -0,0 +1,214 @@
+import json
+import math
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# ==============================================================================
+#             INSTRUMENTASI BERSAMA: PROFIL REQUEST, FASE, DAN MEMORI
+# ==============================================================================
+# Jika diaktifkan (flag --profile / --profile-trace di skrip operasional),
+# setiap request FirebaseClient dicatat: method, path, node, byte kirim/terima,
+# latensi, jumlah retry, dan status. Skrip menandai fasenya dengan
+# `with phase("read"): ...` (read, parse, transform, upload, ...). Di akhir
+# skrip dicetak tabel ringkasan (persentil latensi, per node, path paling
+# lambat, durasi fase, puncak RSS), dan opsional file trace JSON yang bisa
+# dibandingkan antar rollout.
+#
+# Tanpa flag, instrumentasi tidak aktif dan biayanya hanya satu pengecekan None
+# per request.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# Jumlah path paling lambat yang dicetak di ringkasan.
+SLOWEST_SHOWN = 10
+
+_active = None
+
+
+def peak_rss_mb():
+    """Puncak RSS proses saat ini dalam MB (None jika tidak didukung OS, mis. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, fraction):
+    """Persentil sederhana (nearest-rank) dari list angka."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _node_of(path, payload):
+    """Node level pertama yang disentuh request; multi-path PATCH ke root bisa beberapa."""
+    path = path.strip("/")
+    if path:
+        return path.split("/")[0]
+    if isinstance(payload, dict) and payload:
+        return ",".join(sorted({key.strip("/").split("/")[0] for key in payload}))
+    return "/"
+
+
+class Profiler:
+    """Pengumpul catatan request dan fase untuk satu eksekusi skrip (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.phases = []
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+
+    def record_request(self, method, path, payload, sent_bytes, received_bytes, seconds,
+                       retries, status):
+        entry = {"start_s": round(time.perf_counter() - self.start - seconds, 6),
+                 "method": method, "path": "/" + path.strip("/"), "node": _node_of(path, payload),
+                 "sent_bytes": sent_bytes, "received_bytes": received_bytes,
+                 "seconds": round(seconds, 6), "retries": retries, "status": status}
+        with self.lock:
+            self.requests.append(entry)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                self.phases.append({"name": name, "start_s": round(start - self.start, 6),
+                                    "seconds": round(seconds, 6)})
+
+    def summary(self):
+        """Ringkasan yang juga ditulis ke file trace."""
+        latencies = [entry["seconds"] * 1000 for entry in self.requests]
+        return {
+            "duration_s": round(time.perf_counter() - self.start, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "requests": len(self.requests),
+            "retries": sum(entry["retries"] for entry in self.requests),
+            "errors": sum(1 for entry in self.requests
+                          if not isinstance(entry["status"], int) or entry["status"] >= 400),
+            "sent_bytes": sum(entry["sent_bytes"] for entry in self.requests),
+            "received_bytes": sum(entry["received_bytes"] for entry in self.requests),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p90_ms": round(percentile(latencies, 0.90), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(max(latencies, default=0.0), 2),
+        }
+
+    def write_trace(self, path):
+        trace = {"argv": sys.argv,
+                 "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+                 "summary": self.summary(), "phases": self.phases, "requests": self.requests}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2)
+
+    def print_report(self, slowest=SLOWEST_SHOWN):
+        summary = self.summary()
+        peak = f"{summary['peak_rss_mb']:.1f} MB" if summary["peak_rss_mb"] is not None else "n/a"
+        print("\n==================================================================")
+        print("  PROFIL")
+        print("==================================================================")
+        print(f"Durasi total {summary['duration_s']:.2f} detik, puncak RSS {peak}.")
+
+        if self.phases:
+            totals = defaultdict(float)
+            for entry in self.phases:
+                totals[entry["name"]] += entry["seconds"]
+            print(f"\n{'fase':<16}{'detik':>10}{'%':>7}")
+            for name, seconds in totals.items():
+                share = 100 * seconds / summary["duration_s"] if summary["duration_s"] else 0.0
+                print(f"{name:<16}{seconds:>10.3f}{share:>7.1f}")
+
+        if not self.requests:
+            print("\nTidak ada request HTTP.")
+            return
+        print(f"\n{summary['requests']} request ({summary['retries']} retry, {summary['errors']} gagal), "
+              f"kirim {summary['sent_bytes'] / 1024:.1f} KB, terima {summary['received_bytes'] / 1024:.1f} KB.")
+
+        print(f"\n{'method':<8}{'jumlah':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'maks ms':>10}"
+              f"{'KB kirim':>11}{'KB terima':>11}")
+        by_method = defaultdict(list)
+        for entry in self.requests:
+            by_method[entry["method"]].append(entry)
+        for method, entries in sorted(by_method.items()):
+            latencies = [entry["seconds"] * 1000 for entry in entries]
+            print(f"{method:<8}{len(entries):>8}{percentile(latencies, 0.5):>10.1f}"
+                  f"{percentile(latencies, 0.9):>10.1f}{percentile(latencies, 0.99):>10.1f}"
+                  f"{max(latencies):>10.1f}{sum(e['sent_bytes'] for e in entries) / 1024:>11.1f}"
+                  f"{sum(e['received_bytes'] for e in entries) / 1024:>11.1f}")
+
+        print(f"\n{'node':<32}{'jumlah':>8}{'detik':>10}{'KB kirim':>11}{'KB terima':>11}")
+        by_node = defaultdict(list)
+        for entry in self.requests:
+            by_node[entry["node"]].append(entry)
+        for node, entries in sorted(by_node.items(), key=lambda item: -sum(e["seconds"] for e in item[1])):
+            print(f"{node[:31]:<32}{len(entries):>8}{sum(e['seconds'] for e in entries):>10.3f}"
+                  f"{sum(e['sent_bytes'] for e in entries) / 1024:>11.1f}"
+                  f"{sum(e['received_bytes'] for e in entries) / 1024:>11.1f}")
+
+        print(f"\nPath paling lambat:")
+        print(f"{'ms':>9}  {'method':<7}{'status':>16}{'retry':>6}{'KB':>9}  path")
+        for entry in sorted(self.requests, key=lambda e: -e["seconds"])[:slowest]:
+            size = (entry["sent_bytes"] + entry["received_bytes"]) / 1024
+            print(f"{entry['seconds'] * 1000:>9.1f}  {entry['method']:<7}{str(entry['status']):>16}"
+                  f"{entry['retries']:>6}{size:>9.1f}  {entry['path']}")
+
+
+def enable():
+    """Mengaktifkan profiler global untuk proses ini dan mengembalikannya."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def active():
+    """Profiler yang sedang aktif, atau None."""
+    return _active
+
+
+@contextmanager
+def phase(name):
+    """Menandai satu fase skrip; tidak melakukan apa pun jika profiler tidak aktif."""
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+
+def add_profile_arguments(parser):
+    """Menambahkan --profile dan --profile-trace ke parser argparse skrip."""
+    parser.add_argument("--profile", action="store_true",
+                        help="cetak ringkasan request, fase, dan memori di akhir")
+    parser.add_argument("--profile-trace", metavar="FILE",
+                        help="simpan trace JSON setiap request dan fase (mengaktifkan --profile)")
+
+
+def start_profiling(args):
+    """Dipanggil setelah parse_args(): aktifkan profiler jika diminta."""
+    if args.profile or args.profile_trace:
+        enable()
+
+
+def finish_profiling(args):
+    """
+    Dipanggil di blok finally skrip (juga saat skrip gagal): cetak ringkasan dan
+    tulis trace jika diminta.
+    """
+    if _active is None:
+        return
+    _active.print_report()
+    if args.profile_trace:
+        _active.write_trace(args.profile_trace)
+        print(f"\nTrace disimpan ke: {args.profile_trace}")
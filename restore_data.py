@@ -1,5 +1,9 @@
-import requests
-import json
+import argparse
+
+from firebase_client import FirebaseClient
+from geo_index import index_updates_for_plan
+from materialize_summary import dirty_marks_for_plan
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
 
 # ==============================================================================
 # SKRIP PEMULIHAN DATA
@@ -51,9 +55,13 @@ RESTORE_DATA = {
 def restore_data():
     """Menggunakan PATCH untuk memulihkan data tanpa menimpa data lain."""
     print("Memulai proses pemulihan data...")
-    url = f"{FIREBASE_URL}/.json"
-    
-    response = requests.patch(url, data=json.dumps(RESTORE_DATA))
+    with FirebaseClient(FIREBASE_URL) as client:
+        # geo_index dan penanda ringkasan ikut diperbarui dalam PATCH yang sama.
+        with phase("read"):
+            payload = dict(RESTORE_DATA, **index_updates_for_plan(client, RESTORE_DATA))
+        payload.update(dirty_marks_for_plan(RESTORE_DATA))
+        with phase("upload"):
+            response = client.patch("", payload)
     
     if response.status_code == 200:
         print("  -> Data berhasil dipulihkan!")
@@ -64,17 +72,25 @@ def restore_data():
 
 
 if __name__ == "__main__":
-    print("=======================================")
-    print("  Memulai Skrip Pemulihan Data Firebase  ")
-    print("=======================================\n")
-    
-    restore_data()
-    
-    print("=======================================")
-    print("   Skrip Pemulihan Selesai.            ")
-    print("=======================================")
-    print("Database Anda seharusnya sudah kembali normal (plus data baru dari skrip sebelumnya).")
-    print("Selanjutnya, saya akan perbaiki skrip 'update_firebase.py'.")
+    parser = argparse.ArgumentParser(description="Pulihkan RESTORE_DATA ke Firebase (PATCH).")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        print("=======================================")
+        print("  Memulai Skrip Pemulihan Data Firebase  ")
+        print("=======================================\n")
+
+        restore_data()
+
+        print("=======================================")
+        print("   Skrip Pemulihan Selesai.            ")
+        print("=======================================")
+        print("Database Anda seharusnya sudah kembali normal (plus data baru dari skrip sebelumnya).")
+        print("Selanjutnya, saya akan perbaiki skrip 'update_firebase.py'.")
+    finally:
+        finish_profiling(args)
 
 # CARA MENJALANKAN:
 # 1. Buka terminal/command prompt di direktori proyek.
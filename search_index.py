@@ -0,0 +1,327 @@
+import argparse
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from data_schema import normalize_menu, normalize_services
+from firebase_client import FirebaseClient, plan_patch_batches
+
+# ==============================================================================
+#           INDEX PENCARIAN UMKM (NODE 'search_index', SHARD PER TOKEN)
+# ==============================================================================
+# Mencari "kopi" atau "geprek" tanpa index berarti mengunduh seluruh 'umkm' dan
+# 'umkm_menu' lalu mencocokkan string di HP. Skrip ini membangun inverted index:
+#
+#   search_index/<token>/<umkmId>      = skor   (satu shard per token)
+#   search_index_docs/<umkmId>/<token> = skor   (token per UMKM, untuk update)
+#
+# Token berasal dari name, category, description, dan nama item menu/layanan,
+# setelah dinormalisasi (huruf kecil, tanpa aksen, tanpa kata sambung, kata
+# ulang 'kue-kue' menjadi 'kue', akhiran '-nya' juga diindeks tanpa akhiran).
+# Setiap token juga diindeks sebagai prefix (n-gram awal) sehingga ketikan
+# 'gep' sudah menemukan 'geprek'.
+#
+# Query membaca shard setiap token dengan orderBy="$value" + limitToLast,
+# jadi biaya query bergantung pada query, bukan ukuran katalog. Query beberapa
+# kata tidak mengiris daftar teratas yang terpotong: kandidat diambil dari
+# shard paling kecil, lalu token lain dicek per kandidat. Saat katalog
+# berubah, token lama tiap UMKM (search_index_docs) dibandingkan dengan token
+# barunya; hanya entri shard yang berbeda yang ditulis (multi-path PATCH).
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Node index dan node token per UMKM.
+SEARCH_INDEX_NODE = "search_index"
+DOCS_NODE = "search_index_docs"
+# Bobot per field; skor token di satu UMKM adalah jumlah bobot field tempat
+# token itu muncul.
+FIELD_WEIGHTS = {"name": 4.0, "category": 3.0, "item": 2.0, "description": 1.0}
+# Pengali bobot jika token hanya cocok sebagai prefix kata.
+PREFIX_WEIGHT = 0.5
+# Panjang prefix terpendek yang diindeks dan panjang token terpanjang.
+MIN_PREFIX_LENGTH = 2
+MAX_TOKEN_LENGTH = 20
+# Jumlah entri teratas yang dibaca per shard token query. Shard yang lebih
+# kecil dari ini terbaca utuh dan bisa langsung menjadi daftar kandidat.
+CANDIDATES_PER_TOKEN = 200
+
+# Kata sambung/depan yang terlalu umum untuk dicari.
+STOPWORDS = {
+    "dan", "di", "ke", "dari", "yang", "untuk", "dengan", "atau", "ini", "itu", "pada",
+    "dalam", "juga", "ada", "agar", "bisa", "serta", "oleh", "the", "and", "of",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_APOSTROPHES = re.compile(r"['’‘`]")
+
+
+def normalize_text(text):
+    """Huruf kecil tanpa aksen ('Café' -> 'cafe'); apostrof dihapus ("jum'at" -> 'jumat')."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _APOSTROPHES.sub("", stripped)
+
+
+def tokenize(text):
+    """Kata utuh unik dari teks, urut kemunculan (stopword dan 1 huruf dibuang)."""
+    if not isinstance(text, str):
+        return []
+    words = []
+    for word in _WORD.findall(normalize_text(text)):
+        word = word[:MAX_TOKEN_LENGTH]
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        candidates = [word]
+        # 'pedasnya' juga bisa dicari sebagai 'pedas'.
+        if word.endswith("nya") and len(word) - 3 >= 3:
+            candidates.append(word[:-3])
+        for candidate in candidates:
+            if candidate not in words:
+                words.append(candidate)
+    return words
+
+
+def _item_names(umkm_id, menu, services):
+    names = []
+    for normalize, source, field in ((normalize_menu, menu, "name"),
+                                     (normalize_services, services, "service")):
+        if source is None:
+            continue
+        items = normalize(umkm_id, source)
+        if isinstance(items, list):
+            names.extend(item[field] for item in items if item.get(field))
+    return names
+
+
+def document_tokens(umkm_id, umkm, menu=None, services=None):
+    """{token: skor} untuk satu UMKM, termasuk prefix setiap kata."""
+    if not isinstance(umkm, dict):
+        return {}
+    fields = [("name", umkm.get("name")), ("category", umkm.get("category")),
+              ("description", umkm.get("description"))]
+    fields += [("item", name) for name in _item_names(umkm_id, menu, services)]
+
+    best = {}
+    for field, text in fields:
+        weight = FIELD_WEIGHTS[field]
+        for word in tokenize(text):
+            for length in range(MIN_PREFIX_LENGTH, len(word) + 1):
+                token = word[:length]
+                score = weight if length == len(word) else weight * PREFIX_WEIGHT
+                # Per field diambil skor terbaik, lalu dijumlahkan antar field.
+                key = (field, token)
+                best[key] = max(best.get(key, 0.0), score)
+
+    tokens = {}
+    for (_, token), score in best.items():
+        tokens[token] = round(tokens.get(token, 0.0) + score, 2)
+    return tokens
+
+
+def build_documents(umkm_node, menu_node, services_node):
+    """{umkmId: {token: skor}} untuk seluruh katalog."""
+    def children(value):
+        if isinstance(value, list):
+            return {str(index): item for index, item in enumerate(value) if item is not None}
+        return value if isinstance(value, dict) else {}
+
+    umkm_node, menu_node, services_node = children(umkm_node), children(menu_node), children(services_node)
+    return {umkm_id: document_tokens(umkm_id, umkm, menu_node.get(umkm_id), services_node.get(umkm_id))
+            for umkm_id, umkm in umkm_node.items()}
+
+
+def plan_index_updates(old_documents, new_documents):
+    """
+    Multi-path update {path: nilai} yang membawa index dari `old_documents` ke
+    `new_documents` (keduanya {umkmId: {token: skor}}). Hanya entri shard dan
+    dokumen UMKM yang berubah yang ditulis. Mengembalikan (plan, shard_tersentuh).
+    """
+    plan, shards = {}, set()
+    for umkm_id in set(old_documents) | set(new_documents):
+        old, new = old_documents.get(umkm_id) or {}, new_documents.get(umkm_id) or {}
+        if old == new:
+            continue
+        for token in set(old) - set(new):
+            plan[f"{SEARCH_INDEX_NODE}/{token}/{umkm_id}"] = None
+            shards.add(token)
+        for token, score in new.items():
+            if old.get(token) != score:
+                plan[f"{SEARCH_INDEX_NODE}/{token}/{umkm_id}"] = score
+                shards.add(token)
+        plan[f"{DOCS_NODE}/{umkm_id}"] = new or None
+    return plan, shards
+
+
+def search(client, query, limit=20):
+    """
+    Mencari UMKM yang cocok dengan semua kata di `query` (kata terakhir boleh
+    belum selesai diketik). Mengembalikan list (skor, umkmId), terbaik dulu.
+
+    Setiap shard token dibaca paling banyak CANDIDATES_PER_TOKEN entri teratas.
+    Untuk beberapa kata, kandidat diambil dari shard terkecil yang terbaca utuh
+    (jika semua terpotong, shard token terpanjang dibaca utuh), lalu skor token
+    lain setiap kandidat diambil dari shard yang sudah terbaca atau langsung
+    dari search_index/<token>/<umkmId>.
+    """
+    # Kata yang lebih panjang dari token terpanjang diindeks sebagai prefixnya.
+    tokens = [token for token in tokenize(query) if len(token) >= MIN_PREFIX_LENGTH]
+    if not tokens:
+        return []
+    window = max(CANDIDATES_PER_TOKEN, limit)
+
+    def read(token, size=None):
+        params = {"orderBy": '"$value"'}
+        if size is not None:
+            params["limitToLast"] = str(size)
+        response = client.get(f"{SEARCH_INDEX_NODE}/{token}", params=params)
+        response.raise_for_status()
+        return response.json() or {}
+
+    # Satu entri lebih dari jendela untuk mengetahui apakah shard terbaca utuh.
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        shards = dict(zip(tokens, executor.map(lambda token: read(token, window + 1), tokens)))
+    complete = {token for token, shard in shards.items() if len(shard) <= window}
+
+    if len(tokens) == 1:
+        candidates = dict(shards[tokens[0]])
+    else:
+        if complete:
+            pivot = min(complete, key=lambda token: len(shards[token]))
+        else:
+            pivot = max(reversed(tokens), key=len)
+            shards[pivot] = read(pivot)
+            complete.add(pivot)
+        candidates = dict(shards[pivot])
+        lookups = []
+        for token in tokens:
+            if token == pivot:
+                continue
+            shard = shards[token]
+            for umkm_id in list(candidates):
+                if umkm_id in shard:
+                    candidates[umkm_id] += shard[umkm_id]
+                elif token in complete:
+                    del candidates[umkm_id]
+                else:
+                    lookups.append((umkm_id, token))
+
+        # Token yang shard-nya terpotong dicek langsung per kandidat.
+        lookups = [(umkm_id, token) for umkm_id, token in lookups if umkm_id in candidates]
+        results = client.run_parallel(("GET", f"{SEARCH_INDEX_NODE}/{token}/{umkm_id}", None)
+                                      for umkm_id, token in lookups)
+        for (umkm_id, _), (_, response) in zip(lookups, results):
+            response.raise_for_status()
+            score = response.json()
+            if umkm_id not in candidates:
+                continue
+            if isinstance(score, (int, float)):
+                candidates[umkm_id] += score
+            else:
+                del candidates[umkm_id]
+
+    ranked = sorted(((round(score, 2), umkm_id) for umkm_id, score in candidates.items()),
+                    key=lambda item: (-item[0], item[1]))
+    return ranked[:limit]
+
+
+def update_search_index(dry_run=False):
+    """Membaca katalog dari Firebase lalu menulis hanya entri index yang berubah."""
+    nodes = ["umkm", "umkm_menu", "umkm_services", DOCS_NODE]
+    with FirebaseClient(FIREBASE_URL) as client:
+        with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+            responses = list(executor.map(client.get, nodes))
+        values = {}
+        for node, response in zip(nodes, responses):
+            response.raise_for_status()
+            values[node] = response.json() or {}
+
+        start = time.perf_counter()
+        documents = build_documents(values["umkm"], values["umkm_menu"], values["umkm_services"])
+        existing = values[DOCS_NODE] if isinstance(values[DOCS_NODE], dict) else {}
+        plan, shards = plan_index_updates(existing, documents)
+        changed = sum(1 for path in plan if path.startswith(DOCS_NODE + "/"))
+        print(f"{len(documents)} UMKM diindeks dalam {time.perf_counter() - start:.2f} detik: "
+              f"{changed} berubah, {len(shards)} shard token tersentuh, {len(plan)} path.")
+        if dry_run or not plan:
+            for token in sorted(shards)[:50]:
+                print(f"  shard {SEARCH_INDEX_NODE}/{token}")
+            if len(shards) > 50:
+                print(f"  ... dan {len(shards) - 50} shard lain")
+            return True
+
+        results = client.apply_batches(plan_patch_batches(plan))
+        failed = [response for _, response in results if not response.ok]
+        for response in failed:
+            print(f"Gagal menulis index (status {response.status_code}): {response.text}")
+        return not failed
+
+
+# ==============================================================================
+# BENCHMARK (EMULATOR LOKAL)
+# ==============================================================================
+
+def run_benchmark(umkm_counts, queries=("kopi", "geprek", "ayam geprek", "laundry kilat", "ro"),
+                  seed=0):
+    """
+    Membandingkan byte yang dibaca pencarian lewat index dengan mengunduh
+    'umkm' + 'umkm_menu' + 'umkm_services' lalu mencocokkan di klien.
+    """
+    from firebase_emulator import FirebaseEmulator
+    from generate_data import SyntheticDatabase, load_template
+
+    template = load_template()
+    print(f"{'UMKM':>8}  {'query':<16}{'scan penuh':>14}{'index':>12}{'request':>9}{'ms':>8}{'hasil':>7}")
+    for count in umkm_counts:
+        database = SyntheticDatabase(template, count, 0, 0, 0, seed)
+        catalog = {"umkm": dict(database.iter_umkm()),
+                   "umkm_menu": dict(database.iter_catalog("umkm_menu")),
+                   "umkm_services": dict(database.iter_catalog("umkm_services"))}
+        documents = build_documents(catalog["umkm"], catalog["umkm_menu"], catalog["umkm_services"])
+        plan, _ = plan_index_updates({}, documents)
+        with FirebaseEmulator(catalog) as emulator, FirebaseClient(emulator.url) as client:
+            client.apply_batches(plan_patch_batches(plan, max_bytes=4 * 1024 * 1024, max_paths=50000))
+            log_start = len(emulator.request_log)
+            for node in ("umkm", "umkm_menu", "umkm_services"):
+                client.get(node).raise_for_status()
+            scan_bytes = sum(entry[3] for entry in emulator.request_log[log_start:])
+
+            for query in queries:
+                log_start = len(emulator.request_log)
+                start = time.perf_counter()
+                results = search(client, query)
+                elapsed = (time.perf_counter() - start) * 1000
+                log = emulator.request_log[log_start:]
+                print(f"{count:>8}  {query:<16}{scan_bytes / 1024:>11.1f} KB"
+                      f"{sum(entry[3] for entry in log) / 1024:>9.1f} KB{len(log):>9}"
+                      f"{elapsed:>8.1f}{len(results):>7}")
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Perbarui node '{SEARCH_INDEX_NODE}' secara incremental atau jalankan pencarian.",
+        epilog='Contoh: python search_index.py --query "ayam geprek"')
+    parser.add_argument("--dry-run", action="store_true",
+                        help="tampilkan shard yang akan berubah tanpa mengirim apa pun")
+    parser.add_argument("--query", help="cari UMKM lewat index")
+    parser.add_argument("--limit", type=int, default=20, help="jumlah hasil pencarian (default: 20)")
+    parser.add_argument("--benchmark", nargs="*", type=int, metavar="JUMLAH_UMKM",
+                        help="bandingkan byte pencarian index vs scan penuh di emulator lokal "
+                             "(default: 1000 10000)")
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        run_benchmark(args.benchmark or [1000, 10000])
+    elif args.query:
+        with FirebaseClient(FIREBASE_URL) as client:
+            for score, umkm_id in search(client, args.query, args.limit):
+                print(f"  {score:>7.2f}  {umkm_id}")
+    elif update_search_index(args.dry_run):
+        print(f"\n>>> Node '{SEARCH_INDEX_NODE}' sudah terbaru. <<<")
+    else:
+        print(f"\n>>> Sebagian index gagal ditulis, jalankan ulang skrip ini. <<<")
@@ -0,0 +1,416 @@
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from bisect import bisect_right
+from functools import lru_cache
+
+from json_stream import JsonStreamReader
+
+# ==============================================================================
+#          SNAPSHOT STORE: BACKUP BERBASIS HASH, TANPA DUPLIKASI DATA
+# ==============================================================================
+# Setiap export dipecah menjadi objek yang dialamati hash isinya (seperti git):
+# - blob  : satu child node level pertama (mis. umkm/umkm4, reviews/umkm1,
+#           orders/<id>) dalam JSON kanonik
+# - tree  : daftar {key: hash} untuk root dan setiap node level pertama.
+#           Node besar (mis. 'orders') dipecah menjadi potongan urut key
+#           dengan batas potongan ditentukan hash key, sehingga menambah atau
+#           mengubah beberapa child hanya membuat potongan baru di sekitarnya.
+# Objek yang isinya sama hanya disimpan sekali (terkompresi zlib) di satu
+# file SQLite, jadi backup harian tumbuh sebesar perubahannya saja.
+#
+# Diff dua snapshot melewati potongan/subtree yang hash-nya sama tanpa
+# membukanya. Restore menulis subtree mana pun (mis. 'umkm/umkm4' atau seluruh
+# 'reviews') kembali ke Firebase hanya pada path yang berbeda dari data live.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# File database snapshot.
+SNAPSHOT_DB = "snapshots.db"
+# Rata-rata jumlah entri per potongan tree (batas potongan: hash key % nilai ini).
+CHUNK_FACTOR = 32
+
+_BLOB, _LEAF, _INDEX = b"B", b"T", b"I"
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _is_boundary(key, level):
+    digest = hashlib.sha1(f"{level}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % CHUNK_FACTOR == 0
+
+
+def _chunks(entries, level):
+    """Memotong list (key, ...) urut key di batas yang ditentukan hash key."""
+    chunks, current = [], []
+    for entry in entries:
+        current.append(entry)
+        if _is_boundary(entry[0], level):
+            chunks.append(current)
+            current = []
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SnapshotStore:
+    """Penyimpanan objek + daftar snapshot di satu file SQLite."""
+
+    def __init__(self, path=SNAPSHOT_DB):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (hash TEXT PRIMARY KEY, data BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY, created INTEGER NOT NULL, root TEXT NOT NULL,
+                source TEXT, raw_bytes INTEGER, new_objects INTEGER, new_bytes INTEGER);
+        """)
+        self._load = lru_cache(maxsize=4096)(self._load_uncached)
+        self._new_objects = 0
+        self._new_bytes = 0
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # --- Objek ---
+
+    def _put(self, kind, payload):
+        data = kind + payload
+        digest = hashlib.sha1(data).hexdigest()
+        compressed = zlib.compress(data)
+        cursor = self.db.execute("INSERT OR IGNORE INTO objects VALUES (?, ?)", (digest, compressed))
+        if cursor.rowcount:
+            self._new_objects += 1
+            self._new_bytes += len(compressed)
+        return digest
+
+    def _load_uncached(self, digest):
+        row = self.db.execute("SELECT data FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Objek {digest} tidak ada di store.")
+        data = zlib.decompress(row[0])
+        return data[:1], json.loads(data[1:])
+
+    def put_value(self, value):
+        return self._put(_BLOB, _canonical(value))
+
+    def put_map(self, entries):
+        """Menyimpan {key: hash} sebagai tree berpotongan; mengembalikan hash root-nya."""
+        entries = sorted(entries.items())
+        nodes = [(chunk[0][0], self._put(_LEAF, _canonical(dict(chunk))))
+                 for chunk in _chunks(entries, 0)] or [("", self._put(_LEAF, b"{}"))]
+        level = 1
+        while len(nodes) > 1:
+            chunks = _chunks(nodes, level)
+            if len(chunks) == len(nodes):
+                chunks = [nodes]
+            nodes = [(chunk[0][0], self._put(_INDEX, _canonical(chunk))) for chunk in chunks]
+            level += 1
+        return nodes[0][1]
+
+    def is_map(self, digest):
+        return self._load(digest)[0] != _BLOB
+
+    def _leaves(self, digest):
+        """Semua potongan daun (dict {key: hash}) dari sebuah tree."""
+        kind, payload = self._load(digest)
+        if kind == _LEAF:
+            yield payload
+        else:
+            for _, child in payload:
+                yield from self._leaves(child)
+
+    def map_entries(self, digest):
+        entries = {}
+        for leaf in self._leaves(digest):
+            entries.update(leaf)
+        return entries
+
+    def lookup(self, digest, key):
+        """Hash child `key` dari tree `digest` (None jika tidak ada), tanpa membuka semua potongan."""
+        kind, payload = self._load(digest)
+        while kind == _INDEX:
+            position = bisect_right([first for first, _ in payload], key) - 1
+            if position < 0:
+                return None
+            kind, payload = self._load(payload[position][1])
+        return payload.get(key)
+
+    def get_value(self, digest):
+        """Merakit ulang nilai JSON utuh dari sebuah objek."""
+        kind, payload = self._load(digest)
+        if kind == _BLOB:
+            # Salinan, karena objek hasil _load di-cache.
+            return copy.deepcopy(payload)
+        return {key: self.get_value(child) for key, child in self.map_entries(digest).items()}
+
+    def get_path(self, root, path):
+        """Nilai pada `path` (mis. 'umkm/umkm4') di snapshot dengan root `root`."""
+        digest, value = root, None
+        segments = [segment for segment in path.strip("/").split("/") if segment]
+        for segment in segments:
+            if digest is not None and self.is_map(digest):
+                digest = self.lookup(digest, segment)
+                if digest is None:
+                    return None
+                continue
+            if digest is not None:
+                value, digest = self.get_value(digest), None
+            # Di dalam blob: navigasi biasa pada nilai JSON.
+            if isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+                value = value[int(segment)]
+            elif isinstance(value, dict) and segment in value:
+                value = value[segment]
+            else:
+                return None
+        return self.get_value(digest) if digest is not None else value
+
+    # --- Diff ---
+
+    def _expand(self, nodes):
+        """Membuka potongan index menjadi anak-anaknya; mengembalikan (potongan, ada_yang_dibuka)."""
+        result, expanded = [], False
+        for digest in nodes:
+            kind, payload = self._load(digest)
+            if kind == _INDEX:
+                result.extend(child for _, child in payload)
+                expanded = True
+            else:
+                result.append(digest)
+        return result, expanded
+
+    def diff(self, old, new, prefix=""):
+        """
+        Menghasilkan (path, hash_lama, hash_baru) untuk setiap child yang
+        berbeda. Potongan tree yang hash-nya sama di kedua sisi dilewati.
+        """
+        if old == new:
+            return
+        if not (old and new and self.is_map(old) and self.is_map(new)):
+            yield prefix, old, new
+            return
+        old_nodes, new_nodes = [old], [new]
+        while True:
+            common = set(old_nodes) & set(new_nodes)
+            old_nodes, old_expanded = self._expand([d for d in old_nodes if d not in common])
+            new_nodes, new_expanded = self._expand([d for d in new_nodes if d not in common])
+            if not (old_expanded or new_expanded):
+                break
+
+        old_entries, new_entries = {}, {}
+        for digest in old_nodes:
+            old_entries.update(self._load(digest)[1])
+        for digest in new_nodes:
+            new_entries.update(self._load(digest)[1])
+        for key in sorted(old_entries.keys() | new_entries.keys()):
+            old_child, new_child = old_entries.get(key), new_entries.get(key)
+            if old_child != new_child:
+                yield from self.diff(old_child, new_child, f"{prefix}/{key}" if prefix else key)
+
+    # --- Snapshot ---
+
+    def add_snapshot(self, name, nodes, source=None):
+        """
+        Membuat snapshot dari iterable (node, nilai_atau_iterable_child). Nilai
+        node berupa iterator (key, nilai) disimpan sebagai tree per child,
+        nilai biasa sebagai blob. Mengembalikan statistik snapshot.
+        """
+        if self.db.execute("SELECT 1 FROM snapshots WHERE name = ?", (name,)).fetchone():
+            raise ValueError(f"Snapshot '{name}' sudah ada.")
+        self._new_objects = self._new_bytes = 0
+        raw_bytes = 0
+        root = {}
+        for node, value in nodes:
+            if isinstance(value, dict):
+                value = iter(value.items())
+            if not hasattr(value, "__next__"):
+                raw_bytes += len(_canonical(value))
+                root[node] = self.put_value(value)
+                continue
+            children = {}
+            for key, child in value:
+                raw_bytes += len(_canonical(child))
+                children[key] = self.put_value(child)
+            root[node] = self.put_map(children)
+        root_hash = self.put_map(root)
+        stats = {"name": name, "created": int(time.time() * 1000), "root": root_hash,
+                 "source": source, "raw_bytes": raw_bytes, "new_objects": self._new_objects,
+                 "new_bytes": self._new_bytes}
+        self.db.execute("INSERT INTO snapshots VALUES (:name, :created, :root, :source, "
+                        ":raw_bytes, :new_objects, :new_bytes)", stats)
+        self.db.commit()
+        return stats
+
+    def snapshots(self):
+        rows = self.db.execute("SELECT name, created, root, source, raw_bytes, new_objects, new_bytes "
+                               "FROM snapshots ORDER BY created, name").fetchall()
+        keys = ["name", "created", "root", "source", "raw_bytes", "new_objects", "new_bytes"]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def root_of(self, name):
+        row = self.db.execute("SELECT root FROM snapshots WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"Snapshot '{name}' tidak ditemukan.")
+        return row[0]
+
+
+# ==============================================================================
+# SUMBER SNAPSHOT
+# ==============================================================================
+
+def iter_json_export(json_file_path):
+    """
+    (node, nilai) dari file export JSON secara streaming. Node object
+    dikembalikan sebagai iterator (key, child) yang di-parse satu per satu;
+    pemanggil wajib menghabiskannya sebelum lanjut ke node berikutnya.
+    """
+    with open(json_file_path, "rb") as f:
+        reader = JsonStreamReader(f)
+        reader.read_whitespace()
+        for _, _, node, _ in reader.iter_object_members():
+            if reader.peek() == b"{":
+                yield node, ((key, json.loads(reader.read_value_bytes()))
+                             for _, _, key, _ in reader.iter_object_members())
+            else:
+                yield node, json.loads(reader.read_value_bytes())
+
+
+def iter_ndjson_export(export_dir):
+    """(node, nilai) dari folder hasil export_database.py."""
+    from export_database import iter_records, load_manifest, node_file_name
+    manifest = load_manifest(export_dir)
+    if manifest is None or not manifest.get("complete"):
+        raise ValueError(f"'{export_dir}' bukan hasil ekspor yang lengkap.")
+    for node, value in manifest["scalars"].items():
+        yield node, value
+    for node in manifest["nodes"]:
+        yield node, iter_records(os.path.join(export_dir, node_file_name(node, manifest["compress"])))
+
+
+def restore_subtree(store, snapshot, path, dry_run=False):
+    """
+    Mengembalikan `path` di Firebase ke isi snapshot. Data live dibaca dulu,
+    lalu hanya path yang berbeda yang ditulis (multi-path PATCH).
+    """
+    from firebase_client import FirebaseClient, plan_patch_batches
+    from sync_database import diff_documents, print_plan
+
+    path = path.strip("/")
+    value = store.get_path(store.root_of(snapshot), path)
+    with FirebaseClient(FIREBASE_URL) as client:
+        response = client.get(path)
+        response.raise_for_status()
+        changes = diff_documents(response.json(), value, path)
+        if not changes:
+            print(f"'{path or '/'}' sudah sama dengan snapshot '{snapshot}'.")
+            return True
+        print_plan(changes, len(_canonical(value)))
+        if dry_run:
+            return True
+        results = client.apply_batches(plan_patch_batches(changes))
+        return all(response.ok for _, response in results)
+
+
+def _subtree_digest(store, root, path):
+    """Hash objek pada `path`, atau None jika path berada di dalam blob atau tidak ada."""
+    digest = root
+    for segment in [segment for segment in path.split("/") if segment]:
+        digest = store.lookup(digest, segment) if digest and store.is_map(digest) else None
+    return digest
+
+
+def print_diff(store, old_name, new_name, path=""):
+    """Mencetak perbedaan dua snapshot (opsional dibatasi ke satu subtree)."""
+    from sync_database import diff_documents
+
+    path = path.strip("/")
+    old_root, new_root = store.root_of(old_name), store.root_of(new_name)
+    old_digest, new_digest = _subtree_digest(store, old_root, path), _subtree_digest(store, new_root, path)
+    if old_digest or new_digest:
+        changed = ((changed_path, store.get_value(old) if old else None,
+                    store.get_value(new) if new else None)
+                   for changed_path, old, new in store.diff(old_digest, new_digest, path))
+    else:
+        # Path berada di dalam satu blob (mis. 'umkm/umkm4/name').
+        changed = [(path, store.get_path(old_root, path), store.get_path(new_root, path))]
+
+    count = 0
+    for changed_path, old_value, new_value in changed:
+        for leaf_path, value in sorted(diff_documents(old_value, new_value, changed_path).items()):
+            marker = "-" if value is None else ("+" if old_value is None else "~")
+            shown = "" if value is None else " = " + json.dumps(value, ensure_ascii=False)[:70]
+            print(f"  {marker} {leaf_path}{shown}")
+            count += 1
+    print(f"\n{count} path berbeda antara '{old_name}' dan '{new_name}'.")
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Snapshot database berbasis hash: simpan, daftar, diff, dan restore subtree.")
+    parser.add_argument("--db", default=SNAPSHOT_DB, help=f"file store (default: {SNAPSHOT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="simpan snapshot dari file export JSON atau folder NDJSON")
+    add.add_argument("source", help="file export .json atau folder hasil export_database.py")
+    add.add_argument("--name", help="nama snapshot (default: nama file + waktu)")
+
+    commands.add_parser("list", help="daftar snapshot")
+
+    diff = commands.add_parser("diff", help="bandingkan dua snapshot")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--path", default="", help="batasi ke subtree, mis. 'reviews'")
+
+    restore = commands.add_parser("restore", help="tulis ulang satu subtree ke Firebase")
+    restore.add_argument("snapshot")
+    restore.add_argument("path", help="mis. 'umkm/umkm4' atau 'reviews' ('/' = seluruh database)")
+    restore.add_argument("--dry-run", action="store_true", help="tampilkan rencana tanpa menulis")
+    restore.add_argument("--output", help="simpan subtree ke file JSON alih-alih ke Firebase")
+    args = parser.parse_args()
+
+    with SnapshotStore(args.db) as store:
+        if args.command == "add":
+            name = args.name or f"{os.path.basename(args.source.rstrip('/'))}@{time.strftime('%Y%m%d-%H%M%S')}"
+            nodes = (iter_ndjson_export(args.source) if os.path.isdir(args.source)
+                     else iter_json_export(args.source))
+            start = time.perf_counter()
+            stats = store.add_snapshot(name, nodes, source=args.source)
+            print(f"Snapshot '{name}' disimpan dalam {time.perf_counter() - start:.2f} detik: "
+                  f"{stats['raw_bytes'] / 1024:.1f} KB data, {stats['new_objects']} objek baru "
+                  f"({stats['new_bytes'] / 1024:.1f} KB terkompresi).")
+        elif args.command == "list":
+            total = os.path.getsize(args.db)
+            print(f"{'snapshot':<48}{'dibuat':<18}{'data KB':>10}{'baru KB':>10}")
+            for row in store.snapshots():
+                created = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"] / 1000))
+                print(f"{row['name']:<48}{created:<18}{row['raw_bytes'] / 1024:>10.1f}"
+                      f"{row['new_bytes'] / 1024:>10.1f}")
+            print(f"\nUkuran store: {total / 1024:.1f} KB")
+        elif args.command == "diff":
+            print_diff(store, args.old, args.new, args.path)
+        elif args.output:
+            value = store.get_path(store.root_of(args.snapshot), args.path)
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(value, f, indent=2, ensure_ascii=False)
+            print(f"Subtree '{args.path}' dari '{args.snapshot}' disimpan ke: {args.output}")
+        elif restore_subtree(store, args.snapshot, args.path, args.dry_run):
+            print("\n>>> Restore selesai. <<<")
+        else:
+            print("\n>>> Sebagian path gagal ditulis, jalankan ulang perintah ini. <<<")
@@ -0,0 +1,164 @@
+import argparse
+import json
+
+from firebase_client import FirebaseClient, plan_patch_batches
+from geo_index import with_geo_index
+from materialize_summary import DIRTY_NODE, SUMMARY_NODE, dirty_marks_for_plan
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
+from search_index import DOCS_NODE, SEARCH_INDEX_NODE
+
+# ==============================================================================
+#                 SKRIP SINKRONISASI DELTA (HANYA YANG BERUBAH)
+# ==============================================================================
+# Membandingkan file JSON lokal dengan snapshot acuan (file lokal yang terakhir
+# diketahui, mis. 'umkm.json.bak', atau data langsung dari Firebase), lalu
+# hanya mengirim path daun yang berubah sebagai multi-path PATCH.
+# Key yang hilang dari file lokal dihapus (null), kecuali node turunan yang
+# hanya ada di server (SERVER_ONLY_NODES): jika file lokal tidak membawanya,
+# isi acuan dipertahankan. Index pencarian ikut dipertahankan; jalankan
+# search_index.py setelah sync yang mengubah katalog agar hanya token yang
+# berubah yang ditulis ulang. Gunakan --dry-run untuk melihat rencana tanpa
+# mengirim apa pun.
+# ==============================================================================
+
+# --- KONFIGURASI ---
+# URL root database Firebase Anda.
+FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
+# Node turunan yang ditulis skrip lain dan tidak pernah ada di file export lokal.
+SERVER_ONLY_NODES = (SUMMARY_NODE, DIRTY_NODE, SEARCH_INDEX_NODE, DOCS_NODE)
+
+
+def _as_children(value):
+    """Array diperlakukan seperti object ber-key indeks, sama seperti di Firebase."""
+    if isinstance(value, list):
+        return {str(index): item for index, item in enumerate(value) if item is not None}
+    return value
+
+
+def diff_documents(old, new, prefix=""):
+    """
+    Menghasilkan dict {path: nilai} minimal yang mengubah `old` menjadi `new`.
+    Nilai None berarti path tersebut dihapus. Object dibandingkan per key
+    secara rekursif; nilai lain yang berbeda ditulis utuh.
+    """
+    old, new = _as_children(old), _as_children(new)
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        if old == new:
+            return {}
+        # Object kosong sama dengan null di Firebase.
+        return {prefix: new if new != {} else None}
+
+    changes = {}
+    for key in old.keys() - new.keys():
+        changes[f"{prefix}/{key}" if prefix else key] = None
+    for key, new_value in new.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if key not in old:
+            if new_value not in (None, {}, []):
+                changes[path] = new_value
+        else:
+            changes.update(diff_documents(old[key], new_value, path))
+    return changes
+
+
+def print_plan(changes, document_bytes):
+    """Mencetak rencana perubahan dan perbandingan ukurannya dengan unggah penuh."""
+    for path in sorted(changes):
+        value = changes[path]
+        if value is None:
+            print(f"  HAPUS  {path}")
+        else:
+            print(f"  TULIS  {path} = {json.dumps(value, ensure_ascii=False)[:80]}")
+    plan_bytes = len(json.dumps(changes).encode("utf-8"))
+    print(f"\n{len(changes)} path berubah, payload {plan_bytes / 1024:.1f} KB "
+          f"(unggah penuh: {document_bytes / 1024:.1f} KB).")
+
+
+def sync_database(json_file_path, base_file_path=None, dry_run=False):
+    """Menghitung diff file lokal terhadap acuan lalu mengirim hanya perubahannya."""
+    with phase("read"), open(json_file_path, "r") as f:
+        raw_data = f.read()
+    with phase("parse"):
+        local_data = json.loads(raw_data)
+    with phase("transform"):
+        # geo_index diturunkan dari 'umkm' jika file tidak membawanya sendiri.
+        local_data = with_geo_index(local_data)
+    print(f"Berhasil membaca data dari '{json_file_path}'.")
+
+    with FirebaseClient(FIREBASE_URL) as client:
+        if base_file_path:
+            with phase("read"), open(base_file_path, "r") as f:
+                raw_base = f.read()
+            with phase("parse"):
+                base_data = json.loads(raw_base)
+            with phase("transform"):
+                base_data = with_geo_index(base_data)
+            print(f"Acuan diff: snapshot lokal '{base_file_path}'.")
+        else:
+            with phase("read"):
+                response = client.get("")
+                response.raise_for_status()
+            with phase("parse"):
+                base_data = response.json() or {}
+            print("Acuan diff: data terkini di Firebase.")
+
+        with phase("transform"):
+            # Node turunan hanya ada di server; jangan sampai ikut terhapus.
+            for node in SERVER_ONLY_NODES:
+                if node in base_data and node not in local_data:
+                    local_data[node] = base_data[node]
+            changes = diff_documents(base_data, local_data)
+            changes.update(dirty_marks_for_plan(changes))
+        if not changes:
+            print("\nTidak ada perubahan. Database sudah sinkron.")
+            return True
+
+        print("\nRencana perubahan:")
+        print_plan(changes, len(json.dumps(local_data).encode("utf-8")))
+        if dry_run:
+            print("\n(--dry-run) Tidak ada data yang dikirim.")
+            return True
+
+        success = True
+        with phase("upload"):
+            results = client.apply_batches(plan_patch_batches(changes))
+        for (_, _, batch), response in results:
+            if response.status_code != 200:
+                success = False
+                print(f"  Batch {len(batch)} path gagal (Status: {response.status_code}).")
+                print(f"       Response: {response.text}")
+    print("\nSinkronisasi berhasil." if success else "\nSinkronisasi selesai dengan error.")
+    return success
+
+
+# ==============================================================================
+# EKSEKUSI SKRIP
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Kirim hanya perubahan file JSON lokal ke Firebase.",
+        epilog="Contoh: python sync_database.py umkm.json --base umkm.json.bak --dry-run")
+    parser.add_argument("json_file", help="file JSON lokal (kondisi yang diinginkan)")
+    parser.add_argument("--base", help="snapshot acuan lokal; jika tidak diisi, data dibaca dari Firebase")
+    parser.add_argument("--dry-run", action="store_true", help="tampilkan rencana tanpa mengirim")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        sync_database(args.json_file, args.base, args.dry_run)
+    except FileNotFoundError as e:
+        print(f"ERROR: File '{e.filename}' tidak ditemukan.")
+    except json.JSONDecodeError:
+        print("ERROR: Gagal mem-parsing JSON. Pastikan file berisi format JSON yang valid.")
+    finally:
+        finish_profiling(args)
+
+# ==============================================================================
+# CARA MENJALANKAN SKRIP INI:
+# ==============================================================================
+# 1. Instal library 'requests': pip install requests
+# 2. Lihat rencana dulu:   python sync_database.py umkm.json --base umkm.json.bak --dry-run
+# 3. Kirim perubahan:      python sync_database.py umkm.json --base umkm.json.bak
+# 4. Tanpa --base, data acuan dibaca langsung dari Firebase.
+# ==============================================================================
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from data_schema import normalize_menu, normalize_services, _to_price
+
+# ==============================================================================
+#                      UJI NORMALIZER MENU DAN LAYANAN
+# ==============================================================================
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (15000, 15000),
+    (12500.6, 12501),
+    ("15000", 15000),
+    ("15.000", 15000),
+    ("Rp 15.000", 15000),
+    ("Rp. 1.250.000", 1250000),
+    ("1.250,75", 1251),
+    ("7,5", 8),
+    ("gratis", 0),
+    (None, 0),
+])
+def test_to_price(raw, expected):
+    assert _to_price(raw) == expected
+
+
+def test_services_wrapper_keeps_other_fields():
+    with open("umkm_services.json", "r") as f:
+        services = json.load(f)["umkm_services"]["umkm3"]
+
+    normalized = normalize_services("umkm3", services)
+
+    assert normalized["contact_phone"] == "0811-555-1234"
+    assert normalized["operational_hours"] == "08:00 - 20:00"
+    assert [item["service"] for item in normalized["service_packages"]] == [
+        "Paket Kilat 4 Jam", "Paket Reguler"]
+    assert "name" not in normalized["service_packages"][0]
+
+
+def test_wrapper_without_other_fields_is_unwrapped():
+    menu = {"menu_items": [{"menu": "Nasi Goreng", "price": "15.000"}]}
+
+    assert normalize_menu("umkm0", menu) == [{"name": "Nasi Goreng", "price": 15000}]
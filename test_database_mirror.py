@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from database_mirror import MirrorStore, run_mirror
+from firebase_client import FirebaseClient
+from firebase_emulator import FirebaseEmulator
+
+# ==============================================================================
+#        UJI MIRROR: STREAM EMULATOR -> STORE LOKAL, BACA PER REVISI
+# ==============================================================================
+
+DATA = {
+    "umkm": {"umkm0": {"name": "Warung Bakso", "lat": -7.95},
+             "umkm1": {"name": "Kedai Kopi", "lat": -7.96}},
+    "reviews": {"umkm0": {"r1": {"rating": 5}}},
+    "orders": {"o1": {"total": 15000}, "o2": {"total": 7000}},
+    "config": "v1",
+}
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    with FirebaseEmulator(DATA) as emulator, MirrorStore(str(tmp_path / "mirror.db")) as store, \
+            FirebaseClient(emulator.url) as client:
+        stop = threading.Event()
+        thread = threading.Thread(target=run_mirror, args=(store, emulator.url, stop))
+        thread.start()
+        try:
+            wait_until_mirrored(store, emulator)
+            yield emulator, store, client
+        finally:
+            stop.set()
+            thread.join(5)
+        assert not thread.is_alive()
+
+
+def wait_until_mirrored(store, emulator, timeout=5):
+    deadline = time.monotonic() + timeout
+    while store.get("") != emulator.get_data(""):
+        assert time.monotonic() < deadline, "mirror tidak menyusul emulator"
+        time.sleep(0.02)
+
+
+def test_initial_load(mirror):
+    emulator, store, _ = mirror
+    assert store.get("") == DATA
+    assert store.revision == 1
+
+
+def test_put_patch_and_deletes_follow_the_emulator(mirror):
+    emulator, store, client = mirror
+    loaded = store.revision
+
+    client.put("umkm/umkm1/name", "Kedai Kopi Sore").raise_for_status()
+    wait_until_mirrored(store, emulator)
+    renamed = store.revision
+    client.patch("", {"umkm/umkm0/name": "Bakso Mantep", "orders/o1": None,
+                      "reviews/umkm0": None, "config": {"version": 2}}).raise_for_status()
+    wait_until_mirrored(store, emulator)
+    client.delete("orders").raise_for_status()
+    wait_until_mirrored(store, emulator)
+
+    assert store.get("") == emulator.get_data("")
+    assert store.get("orders") is None
+    assert store.get("", revision=loaded) == DATA
+    assert store.get("umkm/umkm1/name", revision=renamed) == "Kedai Kopi Sore"
+    assert store.get("umkm/umkm0/name", revision=renamed) == "Warung Bakso"
+    assert store.get("orders/o1", revision=renamed) == {"total": 15000}
+    assert store.get("config", revision=renamed) == "v1"
+
+
+def test_stop_returns_promptly_on_a_quiet_stream(tmp_path):
+    with FirebaseEmulator(DATA) as emulator, MirrorStore(str(tmp_path / "mirror.db")) as store:
+        stop = threading.Event()
+        thread = threading.Thread(target=run_mirror, args=(store, emulator.url, stop))
+        thread.start()
+        wait_until_mirrored(store, emulator)
+
+        started = time.monotonic()
+        stop.set()
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 2
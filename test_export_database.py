@@ -0,0 +1,28 @@
+import pytest
+
+from export_database import _key_order, export_database, iter_records, node_file_name
+from firebase_client import FirebaseClient
+from firebase_emulator import FirebaseEmulator, _key_rank
+
+# ==============================================================================
+#        UJI URUTAN KEY EKSPOR: HANYA INT 32-BIT KANONIK YANG NUMERIK
+# ==============================================================================
+
+# Urutan orderBy="$key" Firebase: int 32-bit secara numerik, lalu string leksikografis.
+FIREBASE_ORDER = ["-2147483648", "-3", "0", "7", "12", "2147483647",
+                  "-0", "-2147483649", "0001", "2147483648", "628123456789", "abc", "o1"]
+
+
+@pytest.mark.parametrize("order", [_key_order, _key_rank])
+def test_key_order_matches_firebase(order):
+    assert sorted(reversed(FIREBASE_ORDER), key=order) == FIREBASE_ORDER
+
+
+def test_paged_export_keeps_every_record_once(tmp_path):
+    users = {key: {"phone": key} for key in FIREBASE_ORDER}
+    with FirebaseEmulator({"users": users}) as emulator, FirebaseClient(emulator.url) as client:
+        export_database(client, str(tmp_path), page_size=2, workers=2)
+
+    keys = [key for key, _ in iter_records(str(tmp_path / node_file_name("users", False)))]
+    # Halaman ditulis sesuai urutan selesai; yang diuji: tidak ada yang hilang atau dobel.
+    assert sorted(keys, key=_key_order) == FIREBASE_ORDER
@@ -0,0 +1,29 @@
+import pytest
+
+from firebase_client import check_disjoint_paths, plan_patch_batches
+
+# ==============================================================================
+#                   UJI PEMERIKSAAN PATH MULTI-PATH PATCH
+# ==============================================================================
+
+
+@pytest.mark.parametrize("paths", [
+    ["umkm", "umkm/a"],
+    ["umkm", "umkm-x", "umkm/a"],
+    ["umkm/umkm5", "umkm.old", "umkm/umkm5/name"],
+    ["/reviews/", "reviews/umkm1/r1"],
+    ["umkm/a", "umkm/a"],
+    ["", "umkm"],
+])
+def test_overlapping_paths_are_rejected(paths):
+    with pytest.raises(ValueError):
+        check_disjoint_paths(paths)
+
+
+def test_disjoint_paths_are_accepted():
+    check_disjoint_paths(["umkm", "umkm-x/a", "umkm_menu/umkm5", "umkm5", "reviews/umkm1"])
+
+
+def test_plan_patch_batches_rejects_overlap():
+    with pytest.raises(ValueError):
+        plan_patch_batches({"umkm": {}, "umkm-x": 1, "umkm/a": None})
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from geo_index import INDEX_PRECISION, cell_size, distance_m, encode_geohash, query_cells
+
+# ==============================================================================
+#        UJI QUERY RADIUS: SEL YANG DIBACA MENUTUPI SELURUH LINGKARAN
+# ==============================================================================
+
+
+def destination(lat, lng, bearing_deg, distance):
+    """Titik pada jarak `distance` meter dan arah `bearing_deg` dari (lat, lng)."""
+    angle, bearing = distance / 6371000.0, math.radians(bearing_deg)
+    phi1, lambda1 = math.radians(lat), math.radians(lng)
+    phi2 = math.asin(math.sin(phi1) * math.cos(angle)
+                     + math.cos(phi1) * math.sin(angle) * math.cos(bearing))
+    lambda2 = lambda1 + math.atan2(math.sin(bearing) * math.sin(angle) * math.cos(phi1),
+                                   math.cos(angle) - math.sin(phi1) * math.sin(phi2))
+    return math.degrees(phi2), math.degrees(lambda2)
+
+
+@pytest.mark.parametrize("lat, lng", [(-7.956, 112.615), (0.0, 0.0), (60.17, 24.94), (-78.0, 166.0)])
+@pytest.mark.parametrize("radius_m", [300, 2000, 25000])
+def test_points_just_inside_the_radius_are_in_a_queried_cell(lat, lng, radius_m):
+    cells = query_cells(lat, lng, radius_m)
+    for bearing in range(0, 360, 3):
+        point = destination(lat, lng, bearing, radius_m * 0.9999)
+        assert distance_m(lat, lng, *point) <= radius_m
+        cell = encode_geohash(*point, INDEX_PRECISION)
+        assert any(cell.startswith(prefix) for prefix in cells), (bearing, cell)
+
+
+def test_box_edge_on_a_cell_boundary():
+    # Pusat dipilih sehingga titik paling utara lingkaran tepat melewati batas
+    # sel: kotak yang 0,1% terlalu kecil berhenti di sel bawahnya.
+    radius_m, lng = 2000, 112.615
+    precision = len(query_cells(-7.956, lng, radius_m)[0])
+    lat_step = cell_size(precision)[0]
+    boundary = math.ceil(-7.956 / lat_step) * lat_step
+    lat = boundary - radius_m / 111250.0
+
+    north = destination(lat, lng, 0, radius_m * (1 - 1e-6))
+    assert north[0] > boundary
+    cell = encode_geohash(*north, INDEX_PRECISION)
+    assert any(cell.startswith(prefix) for prefix in query_cells(lat, lng, radius_m))
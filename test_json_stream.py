@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from json_stream import DELETE, stream_transform
+
+# ==============================================================================
+#          UJI ROUND-TRIP json_stream (SATU BARIS, COMPACT, DAN RAPI)
+# ==============================================================================
+# Penulisan ulang json_stream bekerja di level byte, jadi hasilnya harus tetap
+# JSON valid untuk semua format file export: satu baris dengan spasi (default
+# json.dumps), compact tanpa spasi, dan rapi (indent, LF maupun CRLF).
+# ==============================================================================
+
+DOCUMENT = {
+    "orders": {"o1": {"items": [{"name": "Kopi \"Tubruk\"", "price": 5000}], "note": "a, b\n"}},
+    "users": {
+        "u1": {"name": "Ani", "balance": 10.0},
+        "u2": {"name": "Budi", "email": "budi@example.com"},
+        "u3": {"name": "Hapus saya"},
+    },
+    "umkm": {"umkm1": {"name": "Warung {Baru}", "tags": []}},
+}
+
+FORMATS = {
+    "satu-baris": lambda data: json.dumps(data),
+    "compact": lambda data: json.dumps(data, separators=(",", ":")),
+    "rapi": lambda data: json.dumps(data, indent=4),
+    "rapi-crlf": lambda data: json.dumps(data, indent=2).replace("\n", "\r\n"),
+}
+
+
+def add_balance(user_id, user_data):
+    if user_id == "u3":
+        return DELETE
+    return dict(user_data, balance=user_data.get("balance", 0.0))
+
+
+def expected_document():
+    expected = json.loads(json.dumps(DOCUMENT))
+    del expected["users"]["u3"]
+    expected["users"]["u2"]["balance"] = 0.0
+    return expected
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("file_format", sorted(FORMATS))
+def test_stream_transform_round_trip(tmp_path, file_format, compact, indent):
+    source = tmp_path / "source.json"
+    target = tmp_path / "target.json"
+    source.write_bytes(FORMATS[file_format](DOCUMENT).encode("utf-8"))
+
+    changed = stream_transform(source, target, {"users": add_balance}, compact=compact,
+                               indent=indent, buffer_size=16)
+
+    assert json.loads(target.read_bytes()) == expected_document()
+    assert changed == {"users": 2}
+
+
+def test_single_line_input_stays_single_line(tmp_path):
+    source = tmp_path / "source.json"
+    target = tmp_path / "target.json"
+    source.write_text(json.dumps(DOCUMENT))
+
+    stream_transform(source, target, {"users": add_balance})
+
+    assert b"\n" not in target.read_bytes()
+
+
+def test_pretty_input_keeps_indentation(tmp_path):
+    source = tmp_path / "source.json"
+    target = tmp_path / "target.json"
+    source.write_text(json.dumps(DOCUMENT, indent=4))
+
+    stream_transform(source, target, {"users": add_balance})
+
+    assert target.read_text() == json.dumps(expected_document(), indent=4)
+
+
+def test_array_node_keeps_indices_of_deleted_children(tmp_path):
+    source = tmp_path / "source.json"
+    target = tmp_path / "target.json"
+    source.write_text(json.dumps({"users": [{"name": "Ani"}, {"name": "Budi"}, {"name": "Cici"}]}, indent=2))
+
+    changed = stream_transform(source, target, {"users": lambda key, user: DELETE if key == "1" else user})
+
+    assert json.loads(target.read_bytes()) == {"users": [{"name": "Ani"}, None, {"name": "Cici"}]}
+    assert changed == {"users": 1}
@@ -0,0 +1,67 @@
+import pytest
+
+import materialize_summary
+from firebase_emulator import FirebaseEmulator
+from materialize_summary import DIRTY_NODE, SUMMARY_NODE, dirty_marks_for_plan, materialize_summaries
+
+# ==============================================================================
+#        UJI MATERIALISASI RINGKASAN: HANYA SUMBER UMKM BERTANDA YANG DIBACA
+# ==============================================================================
+
+DATA = {
+    "umkm": {f"umkm{index}": {"name": f"UMKM {index}"} for index in range(5)},
+    "reviews": {f"umkm{index}": {"r1": {"rating": 4, "comment": "enak"}} for index in range(5)},
+    "umkm_menu": {"umkm0": [{"name": "Bakso", "price": 15000}]},
+    "umkm_services": {"umkm3": [{"name": "Cuci", "price": 7000}]},
+}
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    with FirebaseEmulator(DATA) as emulator:
+        monkeypatch.setattr(materialize_summary, "FIREBASE_URL", emulator.url)
+        assert materialize_summaries()
+        yield emulator
+
+
+def source_reads(emulator):
+    return sorted(path for method, path, *_ in emulator.request_log
+                  if method == "GET" and path.split("/")[1] in materialize_summary.SOURCE_NODES)
+
+
+def test_dirty_marks_for_plan():
+    plan = {"reviews/umkm1/r9": {"rating": 5}, "umkm_menu/umkm2": None,
+            "umkm/umkm3": {"name": "x"}}
+    assert dirty_marks_for_plan(plan, now=7) == {f"{DIRTY_NODE}/umkm1": 7, f"{DIRTY_NODE}/umkm2": 7}
+    assert dirty_marks_for_plan({"reviews": {}}, now=7) == {f"{DIRTY_NODE}/_all": 7}
+
+
+def test_first_run_summarizes_every_umkm(emulator):
+    summaries = emulator.get_data(SUMMARY_NODE)
+    assert sorted(summaries) == sorted(DATA["umkm"])
+    assert summaries["umkm0"]["itemCount"] == 1
+
+
+def test_clean_run_reads_no_sources(emulator):
+    emulator.request_log.clear()
+    assert materialize_summaries()
+    assert source_reads(emulator) == []
+
+
+def test_only_dirty_umkm_is_read(emulator):
+    emulator.handle("PATCH", "", {}, {"reviews/umkm2/r2": {"rating": 1, "comment": "asin"},
+                                      f"{DIRTY_NODE}/umkm2": 1})
+    emulator.request_log.clear()
+
+    assert materialize_summaries()
+
+    assert source_reads(emulator) == ["/reviews/umkm2.json", "/umkm_menu/umkm2.json",
+                                      "/umkm_services/umkm2.json"]
+    assert emulator.get_data(f"{SUMMARY_NODE}/umkm2")["reviewCount"] == 2
+    assert emulator.get_data(DIRTY_NODE) is None
+
+
+def test_deleted_umkm_loses_its_summary(emulator):
+    emulator.handle("DELETE", "umkm/umkm4", {}, None)
+    assert materialize_summaries()
+    assert emulator.get_data(f"{SUMMARY_NODE}/umkm4") is None
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from migrations import MIGRATIONS, VERSION_NODE, read_applied_migrations, run_migrations
+
+# ==============================================================================
+#            UJI MIGRASI PADA SEMUA FORMAT FILE EXPORT
+# ==============================================================================
+
+DOCUMENT = {
+    "users": {"u1": {"name": "Ani", "balance": 5.0}, "u2": {"name": "Budi"}},
+    "reviews": {"umkm1": {"r1": "Enak", "r2": {"author": "Cici", "comment": "Mantap", "rating": "4,5"}}},
+    "orders": {"o1": {"totalPrice": 15000}},
+}
+
+EXPECTED = {
+    "users": {"u1": {"name": "Ani", "balance": 5.0}, "u2": {"name": "Budi", "balance": 0.0}},
+    "reviews": {"umkm1": {"r1": {"author": "Anonymous", "comment": "Enak", "rating": 3.0},
+                          "r2": {"author": "Cici", "comment": "Mantap", "rating": 4.5}}},
+    "orders": {"o1": {"totalPrice": 15000}},
+}
+
+FORMATS = {
+    "satu-baris": lambda data: json.dumps(data),
+    "compact": lambda data: json.dumps(data, separators=(",", ":")),
+    "rapi": lambda data: json.dumps(data, indent=4),
+}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("file_format", sorted(FORMATS))
+def test_run_migrations_output_is_valid(tmp_path, file_format, workers):
+    source = tmp_path / "export.json"
+    target = tmp_path / "migrated.json"
+    source.write_text(FORMATS[file_format](DOCUMENT))
+
+    applied = run_migrations(str(source), str(target), workers=workers, batch_size=1)
+
+    result = json.loads(target.read_bytes())
+    assert applied == list(MIGRATIONS)
+    assert sorted(result.pop(VERSION_NODE)) == sorted(MIGRATIONS)
+    assert result == EXPECTED
+    assert not (tmp_path / "migrated.json.tmp").exists()
+
+
+def test_run_migrations_in_place_is_idempotent(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(DOCUMENT))
+
+    run_migrations(str(path), str(path), workers=1)
+    first = path.read_bytes()
+
+    assert sorted(read_applied_migrations(str(path))) == sorted(MIGRATIONS)
+    assert run_migrations(str(path), str(path), workers=1) == []
+    assert path.read_bytes() == first
+
+
+@pytest.mark.parametrize("file_format", sorted(FORMATS))
+def test_array_node_is_migrated(tmp_path, file_format):
+    # Firebase mengekspor node ber-key 0..n yang padat sebagai array.
+    source = tmp_path / "export.json"
+    target = tmp_path / "migrated.json"
+    source.write_text(FORMATS[file_format](dict(DOCUMENT, users=[{"name": "Ani"}, None, {"name": "Budi"}])))
+
+    run_migrations(str(source), str(target), workers=1)
+
+    assert json.loads(target.read_bytes())["users"] == [
+        {"name": "Ani", "balance": 0.0}, None, {"name": "Budi", "balance": 0.0}]
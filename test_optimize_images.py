@@ -0,0 +1,75 @@
+import json
+import os
+
+from PIL import Image
+
+from optimize_images import asset_url, optimize_all, rewrite_image_urls, variant_path
+
+# ==============================================================================
+#        UJI PENULISAN ULANG imageUrl: EDIT PEMILIK TIDAK DIKEMBALIKAN
+# ==============================================================================
+
+BLOB = "https://github.com/G4l1le30/project/blob/master/assets/images"
+
+
+def variant_url(path, variant):
+    return asset_url(variant_path(path, variant).replace(os.sep, "/"))
+
+
+def manifest_entry(path):
+    return {"sha256": "-", "bytes": 1, "variants": {
+        variant: {"path": variant_path(path, variant).replace(os.sep, "/")}
+        for variant in ("thumb", "detail")}}
+
+
+MANIFEST = {"images": {path: manifest_entry(path) for path in ("umkm7/lama.jpg", "umkm7/baru.png")}}
+
+
+def rewrite(tmp_path, umkm):
+    path = tmp_path / "umkm.json"
+    path.write_text(json.dumps({"umkm": {"umkm7": umkm}}))
+    rewrite_image_urls(MANIFEST, str(path))
+    return json.loads(path.read_text())["umkm"]["umkm7"]
+
+
+def test_rerun_is_stable(tmp_path):
+    first = rewrite(tmp_path, {"imageUrl": f"{BLOB}/umkm7/lama.jpg?raw=true"})
+    assert first["imageUrl"] == variant_url("umkm7/lama.jpg", "detail")
+    assert first["imageOriginalUrl"] == f"{BLOB}/umkm7/lama.jpg?raw=true"
+    assert rewrite(tmp_path, first) == first
+
+
+def test_edited_image_url_survives_rerun(tmp_path):
+    first = rewrite(tmp_path, {"imageUrl": f"{BLOB}/umkm7/lama.jpg?raw=true"})
+    edited = dict(first, imageUrl=f"{BLOB}/umkm7/baru.png?raw=true")
+
+    second = rewrite(tmp_path, edited)
+
+    assert second["imageUrl"] == variant_url("umkm7/baru.png", "detail")
+    assert second["imageThumbUrl"] == variant_url("umkm7/baru.png", "thumb")
+    assert second["imageOriginalUrl"] == f"{BLOB}/umkm7/baru.png?raw=true"
+
+
+def test_external_image_url_drops_stale_variants(tmp_path):
+    first = rewrite(tmp_path, {"imageUrl": f"{BLOB}/umkm7/lama.jpg?raw=true"})
+    edited = dict(first, imageUrl="https://example.com/foto.jpg")
+
+    assert rewrite(tmp_path, edited) == {"imageUrl": "https://example.com/foto.jpg"}
+
+
+def test_same_stem_different_extension_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    folder = tmp_path / "assets" / "images" / "umkm7"
+    folder.mkdir(parents=True)
+    Image.new("RGB", (600, 300), "red").save(folder / "x.jpg")
+    Image.new("RGB", (300, 600), "blue").save(folder / "x.png")
+
+    manifest, processed = optimize_all(workers=1)
+
+    assert processed == 2
+    outputs = [info["path"] for entry in manifest["images"].values()
+               for info in entry["variants"].values()]
+    assert len(set(outputs)) == 4
+    assert all(os.path.exists(path) for path in outputs)
+    with Image.open(manifest["images"]["umkm7/x.png"]["variants"]["thumb"]["path"]) as image:
+        assert image.size == (240, 480)
@@ -0,0 +1,21 @@
+import pytest
+
+from profiling import percentile
+
+# ==============================================================================
+#                       UJI PERSENTIL NEAREST-RANK
+# ==============================================================================
+
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    (list(range(1, 11)), 0.50, 5),
+    (list(range(1, 11)), 0.90, 9),
+    ([1, 2, 3, 4], 0.50, 2),
+    ([1, 2, 3, 4], 0.75, 3),
+    (list(range(1, 101)), 0.99, 99),
+    (list(range(1, 101)), 1.00, 100),
+    ([7], 0.50, 7),
+    ([], 0.50, 0.0),
+])
+def test_percentile_nearest_rank(values, fraction, expected):
+    assert percentile(list(reversed(values)), fraction) == expected
@@ -0,0 +1,47 @@
+import pytest
+
+from firebase_client import FirebaseClient, plan_patch_batches
+from firebase_emulator import FirebaseEmulator
+from search_index import CANDIDATES_PER_TOKEN, build_documents, plan_index_updates, search
+
+# ==============================================================================
+#        UJI PENCARIAN BEBERAPA KATA PADA SHARD YANG LEBIH BESAR DARI JENDELA
+# ==============================================================================
+
+
+@pytest.fixture(scope="module")
+def client():
+    umkm = {f"umkm{index}": {"name": f"Ayam Bakar {index}", "category": "makanan",
+                             "description": "Ayam bakar madu"}
+            for index in range(CANDIDATES_PER_TOKEN + 100)}
+    umkm["target"] = {"name": "Warung Bu Sri", "category": "makanan",
+                      "description": "ayam geprek sambal bawang"}
+    umkm["lain"] = {"name": "Geprek Mas Budi", "category": "minuman", "description": "es teh"}
+    plan, _ = plan_index_updates({}, build_documents(umkm, {}, {}))
+    with FirebaseEmulator({"umkm": umkm}) as emulator, FirebaseClient(emulator.url) as client:
+        client.apply_batches(plan_patch_batches(plan, max_bytes=4 * 1024 * 1024, max_paths=50000))
+        yield client
+
+
+def ids(results):
+    return sorted(umkm_id for _, umkm_id in results)
+
+
+def test_single_token(client):
+    assert ids(search(client, "geprek")) == ["lain", "target"]
+
+
+def test_rare_token_with_common_token(client):
+    assert ids(search(client, "ayam geprek")) == ["target"]
+    assert ids(search(client, "makanan geprek")) == ["target"]
+    assert ids(search(client, "geprek makanan")) == ["target"]
+
+
+def test_all_tokens_common(client):
+    results = search(client, "ayam makanan", limit=1000)
+    assert len(results) == CANDIDATES_PER_TOKEN + 101
+
+
+def test_prefix_of_last_word(client):
+    assert ids(search(client, "ayam gep")) == ["target"]
+    assert search(client, "ayam pizza") == []
@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+from snapshot_store import SnapshotStore
+
+# ==============================================================================
+#        UJI SNAPSHOT STORE: POTONGAN TREE, LOOKUP, DAN DIFF YANG DIPANGKAS
+# ==============================================================================
+
+OLD = {
+    "orders": {f"o{index:05d}": {"total": index * 1000, "items": [{"name": "Kopi", "qty": index % 3}]}
+               for index in range(5000)},
+    "umkm": {"umkm0": {"name": "Warung Bakso"}, "umkm1": {"name": "Kedai Kopi"}},
+    "config": "v1",
+}
+NEW = copy.deepcopy(OLD)
+NEW["orders"]["o00010"]["total"] = 1
+NEW["orders"]["o02500"]["items"][0]["qty"] = 9
+del NEW["orders"]["o04999"]
+NEW["orders"]["o02500a"] = {"total": 5}
+NEW["umkm"]["umkm1"]["name"] = "Kedai Kopi Sore"
+CHANGED = {"orders/o00010", "orders/o02500", "orders/o04999", "orders/o02500a", "umkm/umkm1"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SnapshotStore(str(tmp_path / "snapshots.db")) as store:
+        store.add_snapshot("lama", OLD.items())
+        yield store
+
+
+def test_diff_returns_only_changed_children(store):
+    stats = store.add_snapshot("baru", NEW.items())
+
+    changes = list(store.diff(store.root_of("lama"), store.root_of("baru")))
+
+    assert {path for path, _, _ in changes} == CHANGED
+    # Lima blob baru ditambah beberapa potongan tree di sekitarnya, bukan ribuan.
+    assert stats["new_objects"] < 30
+
+
+def test_unchanged_snapshot_adds_nothing(store):
+    stats = store.add_snapshot("sama", OLD.items())
+    assert stats["new_objects"] == 0
+    assert list(store.diff(store.root_of("lama"), store.root_of("sama"))) == []
+
+
+def test_get_path_and_get_value_round_trip(store):
+    store.add_snapshot("baru", NEW.items())
+    root = store.root_of("baru")
+
+    assert store.get_value(root) == NEW
+    assert store.get_path(root, "orders/o02500") == NEW["orders"]["o02500"]
+    assert store.get_path(root, "orders/o02500/items/0/qty") == 9
+    assert store.get_path(root, "orders/o02500a/total") == 5
+    assert store.get_path(root, "config") == "v1"
+    assert store.get_path(root, "orders/o04999") is None
+    assert store.get_path(root, "orders/a-sebelum-key-pertama") is None
+    assert store.get_path(store.root_of("lama"), "orders/o04999") == OLD["orders"]["o04999"]
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import sync_database
+from firebase_emulator import FirebaseEmulator
+from sync_database import SERVER_ONLY_NODES, sync_database as sync
+
+# ==============================================================================
+#        UJI SINKRONISASI: NODE TURUNAN DI SERVER TIDAK IKUT TERHAPUS
+# ==============================================================================
+
+LOCAL = {
+    "umkm": {"umkm0": {"name": "Warung Bakso", "lat": -7.95, "lng": 112.61}},
+    "reviews": {"umkm0": {"r1": {"rating": 5, "comment": "mantap"}}},
+}
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    server = json.loads(json.dumps(LOCAL))
+    server["reviews"]["umkm0"]["r1"]["rating"] = 4
+    for node in SERVER_ONLY_NODES:
+        server[node] = {"lama": {"turunan": node}}
+    with FirebaseEmulator(server) as emulator:
+        monkeypatch.setattr(sync_database, "FIREBASE_URL", emulator.url)
+        yield emulator
+
+
+def test_sync_keeps_server_only_nodes(emulator, tmp_path, capsys):
+    local_path = tmp_path / "local.json"
+    local_path.write_text(json.dumps(LOCAL))
+
+    assert sync(str(local_path))
+
+    assert "HAPUS" not in capsys.readouterr().out
+    assert emulator.get_data("reviews/umkm0/r1/rating") == 5
+    for node in SERVER_ONLY_NODES:
+        assert emulator.get_data(f"{node}/lama/turunan") == node
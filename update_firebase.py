@@ -1,12 +1,17 @@
-import requests
-import json
+import argparse
+
+from firebase_client import FirebaseClient, plan_patch_batches
+from geo_index import index_updates_for_plan
+from materialize_summary import dirty_marks_for_plan
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
 
 # ==============================================================================
 #                      SKRIP PEMBARUAN DATABASE (VERSI AMAN)
 # ==============================================================================
 # Versi ini telah diperbaiki untuk tidak menghapus data yang tidak seharusnya.
-# Metode penambahan data diubah dari satu PATCH besar ke beberapa PUT yang
-# lebih spesifik untuk memastikan hanya data yang dituju yang diperbarui.
+# Semua penghapusan dan penambahan disusun menjadi multi-path PATCH ke root
+# dengan key berupa path spesifik (mis. 'umkm/umkm5', null = hapus), sehingga
+# hanya path yang dituju yang berubah dan setiap batch diterapkan atomik.
 # ==============================================================================
 
 # KONFIGURASI
@@ -34,45 +39,41 @@ NODES = ["umkm", "umkm_menu", "umkm_services", "reviews"]
 # FUNGSI-FUNGSI (YANG SUDAH DIPERBAIKI)
 # ==============================================================================
 
-def delete_old_umkm_data():
-    """Menghapus data UMKM lama dari semua node terkait."""
-    print("Memulai proses penghapusan data lama...")
-    for umkm_id in IDS_TO_DELETE:
-        for node in NODES:
-            url = f"{FIREBASE_URL}/{node}/{umkm_id}.json"
-            print(f"  Menghapus {node}/{umkm_id}...")
-            response = requests.delete(url)
-            if response.status_code == 200:
-                print(f"    -> Berhasil dihapus.")
-            else:
-                print(f"    -> Tidak ada data untuk dihapus atau terjadi error (Status: {response.status_code}).")
-    print("Proses penghapusan selesai.\n")
-
-def add_new_umkm_data_safely():
+def build_update_plan(ids_to_delete=IDS_TO_DELETE, new_data=NEW_DATA, nodes=NODES):
     """
-    (FUNGSI BARU YANG AMAN) Menambahkan data baru menggunakan PUT ke path spesifik.
-    Ini memastikan tidak ada data lain yang tertimpa.
+    Menggabungkan penghapusan dan penambahan menjadi satu dict {path: nilai}.
+    Path yang dihapus bernilai None. Jika sebuah path dihapus lalu ditambahkan
+    lagi (mis. umkm/umkm5), nilai barunya yang dipakai, karena menulis path
+    tersebut sudah sama dengan menghapus lalu menulis ulang.
     """
-    print("Memulai proses penambahan data baru (metode aman)...")
-    
-    # Iterasi melalui setiap node (umkm, umkm_menu, etc.) dalam data baru
-    for node, umkm_entries in NEW_DATA.items():
-        # Iterasi melalui setiap entri umkm (umkm5, umkm9) dalam node
+    plan = {f"{node}/{umkm_id}": None for umkm_id in ids_to_delete for node in nodes}
+    for node, umkm_entries in new_data.items():
         for umkm_id, data_payload in umkm_entries.items():
-            # Buat URL spesifik untuk setiap data yang akan ditambahkan/diperbarui
-            url = f"{FIREBASE_URL}/{node}/{umkm_id}.json"
-            
-            print(f"  Menambahkan/memperbarui data untuk {node}/{umkm_id}...")
-            # Gunakan PUT pada path spesifik. Ini aman.
-            response = requests.put(url, data=json.dumps(data_payload))
-            
-            if response.status_code == 200:
-                print(f"    -> Berhasil ditambahkan/diperbarui.")
-            else:
-                print(f"    -> Gagal menambahkan data untuk {node}/{umkm_id} (Status: {response.status_code}).")
-                print(f"       Response: {response.text}")
-
-    print("Proses penambahan data baru selesai.\n")
+            plan[f"{node}/{umkm_id}"] = data_payload
+    return plan
+
+
+def apply_update_plan(client, plan):
+    """
+    Mengirim plan sebagai multi-path PATCH ke root. Setiap batch diterapkan
+    Firebase secara atomik, jadi tidak ada lagi kondisi setengah-terhapus
+    seperti yang dulu harus diperbaiki oleh restore_data.py.
+    """
+    batches = plan_patch_batches(plan)
+    deleted = sum(1 for value in plan.values() if value is None)
+    print(f"Mengirim {len(plan)} path ({deleted} hapus, {len(plan) - deleted} tulis) "
+          f"dalam {len(batches)} batch PATCH...")
+
+    success = True
+    for index, (_, response) in enumerate(client.apply_batches(batches), start=1):
+        if response.status_code == 200:
+            print(f"  Batch {index}/{len(batches)} -> Berhasil diterapkan.")
+        else:
+            success = False
+            print(f"  Batch {index}/{len(batches)} -> Gagal (Status: {response.status_code}).")
+            print(f"       Response: {response.text}")
+    print("Proses pembaruan selesai.\n")
+    return success
 
 
 # ==============================================================================
@@ -80,25 +81,43 @@ def add_new_umkm_data_safely():
 # ==============================================================================
 
 if __name__ == "__main__":
-    print("======================================================")
-    print("  Memulai Skrip Pembaruan Database Firebase (V2 AMAN) ")
-    print("======================================================\n")
-    
-    # Langkah 1: Hapus data lama (fungsi ini sudah aman)
-    delete_old_umkm_data()
-    
-    # Langkah 2: Tambah data baru dengan metode yang aman
-    add_new_umkm_data_safely()
-    
-    print("=============================================")
-    print("   Skrip Selesai Dijalankan.               ")
-    print("=============================================")
-    print("Silakan cek Firebase console Anda untuk memverifikasi perubahan.")
+    parser = argparse.ArgumentParser(
+        description="Hapus IDS_TO_DELETE dan tulis NEW_DATA ke Firebase (multi-path PATCH).")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        print("======================================================")
+        print("  Memulai Skrip Pembaruan Database Firebase (V3 BATCH) ")
+        print("======================================================\n")
+
+        # Langkah 1: Susun semua penghapusan dan penambahan menjadi satu plan
+        with phase("transform"):
+            update_plan = build_update_plan()
+
+        # Langkah 2: Kirim plan sebagai multi-path PATCH (atomik per batch),
+        # bersama update geo_index untuk UMKM yang ditambah, dipindah, atau dihapus
+        # dan penanda ringkasan untuk UMKM yang sumbernya berubah
+        with FirebaseClient(FIREBASE_URL) as client:
+            with phase("read"):
+                update_plan.update(index_updates_for_plan(client, update_plan))
+            update_plan.update(dirty_marks_for_plan(update_plan))
+            with phase("upload"):
+                apply_update_plan(client, update_plan)
+
+        print("=============================================")
+        print("   Skrip Selesai Dijalankan.               ")
+        print("=============================================")
+        print("Silakan cek Firebase console Anda untuk memverifikasi perubahan.")
+    finally:
+        finish_profiling(args)
 
 # ==============================================================================
 # CARA MENJALANKAN SKRIP INI:
 # ==============================================================================
 # 1. Pastikan Anda memiliki Python terinstal.
 # 2. Instal library 'requests': pip install requests
-# 3. Jalankan skrip ini dari direktori proyek: python update_firebase.py
+# 3. Pastikan 'firebase_client.py' berada di direktori yang sama.
+# 4. Jalankan skrip ini dari direktori proyek: python update_firebase.py
 # ==============================================================================
\ No newline at end of file
@@ -1,8 +1,11 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import db
+import argparse
+import copy
 import json
 import os
+import re
+import sys
+
+from firebase_client import FirebaseClient
 
 # --- KONFIGURASI ---
 # Akan membaca dari environment variable GOOGLE_APPLICATION_CREDENTIALS
@@ -12,14 +15,145 @@ DEFAULT_SERVICE_ACCOUNT_KEY_PATH = "path/to/your/serviceAccountKey.json" # Fallb
 
 # Ganti dengan URL database Anda
 DATABASE_URL = "https://final-ca080-default-rtdb.firebaseio.com/"
-# Nama file aturan Anda
+# Nama file aturan Anda. Jika tidak ada, aturan yang sedang aktif di server dipakai.
 RULES_FILE = "database.rules.json"
+# Salinan aturan live untuk pengecekan offline jika RULES_FILE tidak ada.
+LIVE_RULES_SNAPSHOT = "ruleStraightUpFromFirebase.txt"
+# Kode sumber aplikasi yang dipindai untuk query orderByChild.
+APP_SOURCE_DIR = os.path.join("app", "src", "main")
+
+# Pola query yang dipakai aplikasi dan skrip: (path, orderBy).
+# Segmen path yang diawali '$' adalah wildcard (mis. 'reviews/$umkmId').
+# orderBy berupa nama child, '$value', atau '$key' ('$key' tidak butuh index).
+QUERY_PATTERNS = [
+    ("orders", "userId"),           # UmkmRepository.getOrdersByUserId
+    ("orders", "orderTimestamp"),   # riwayat order diurutkan per waktu
+    ("orders", "umkmId"),           # order per UMKM (dasbor penjual)
+    ("orders", "$key"),             # order_analytics.py, ekspor per halaman
+    ("geo_index", "$key"),          # geo_index.py, query radius per prefix geohash
+    ("search_index/$token", "$value"),  # search_index.py, kandidat teratas per token
+]
 # -----------------
 
-def update_firebase_rules():
+_COMMENT = re.compile(r'"(?:[^"\\]|\\.)*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_APP_REFERENCE = re.compile(r'val\s+(\w+)\s*=\s*dbRoot\.child\("([^"]+)"\)')
+_APP_QUERY = re.compile(r'(\w+)\.orderByChild\("([^"]+)"\)')
+
+
+def parse_rules(text):
+    """Mem-parse teks aturan; komentar // dan /* */ (diizinkan Firebase) dibuang."""
+    stripped = _COMMENT.sub(lambda m: m.group() if m.group().startswith('"') else "", text)
+    return json.loads(stripped)
+
+
+def required_indexes(patterns=QUERY_PATTERNS):
+    """Mengubah pola query menjadi {path_tuple: [field index]} (urut, tanpa duplikat)."""
+    indexes = {}
+    for path, order_by in patterns:
+        if order_by == "$key":
+            continue
+        field = ".value" if order_by == "$value" else order_by
+        fields = indexes.setdefault(tuple(path.strip("/").split("/")), [])
+        if field not in fields:
+            fields.append(field)
+    return indexes
+
+
+def _find_rule(rules, segments):
+    """Node aturan untuk path `segments` (key '$...' di aturan cocok dengan segmen apa pun)."""
+    node = rules.get("rules", {})
+    for segment in segments:
+        if not isinstance(node, dict):
+            return None
+        if segment in node:
+            node = node[segment]
+            continue
+        wildcards = [key for key in node if key.startswith("$")]
+        if not wildcards:
+            return None
+        node = node[wildcards[0]]
+    return node if isinstance(node, dict) else None
+
+
+def _index_fields(node):
+    fields = node.get(".indexOn", []) if node else []
+    return [fields] if isinstance(fields, str) else list(fields)
+
+
+def merge_indexes(rules, indexes):
     """
-    Menginisialisasi Firebase Admin SDK dan memperbarui aturan Realtime Database.
+    Menggabungkan `.indexOn` ke salinan `rules`. Aturan .read/.write dan index
+    yang sudah ada tidak diubah; node yang belum ada dibuat.
     """
+    merged = copy.deepcopy(rules)
+    for segments, fields in indexes.items():
+        node = merged.setdefault("rules", {})
+        for segment in segments:
+            # Wildcard pola memakai wildcard yang sudah ada di aturan jika ada.
+            if segment.startswith("$"):
+                segment = next((key for key in node if key.startswith("$")), segment)
+            node = node.setdefault(segment, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Aturan di '{'/'.join(segments)}' bukan object, tidak bisa diberi index.")
+        existing = _index_fields(node)
+        node[".indexOn"] = existing + [field for field in fields if field not in existing]
+    return merged
+
+
+def check_indexes(rules, patterns=QUERY_PATTERNS):
+    """Daftar pola (path, orderBy) yang akan berjalan tanpa index pada `rules`."""
+    missing = []
+    for segments, fields in required_indexes(patterns).items():
+        defined = _index_fields(_find_rule(rules, segments))
+        for field in fields:
+            if field not in defined:
+                missing.append(("/".join(segments), "$value" if field == ".value" else field))
+    return missing
+
+
+def scan_app_queries(source_dir=APP_SOURCE_DIR):
+    """Mencari query orderByChild di kode Kotlin aplikasi: set (path, field)."""
+    queries = set()
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            if not name.endswith(".kt"):
+                continue
+            with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                source = f.read()
+            references = dict(_APP_REFERENCE.findall(source))
+            for variable, field in _APP_QUERY.findall(source):
+                if variable in references:
+                    queries.add((references[variable], field))
+    return queries
+
+
+def check_offline(rules_path):
+    """
+    Pengecekan tanpa jaringan: pola query yang tidak punya index, dan query
+    orderByChild di aplikasi yang belum dideklarasikan di QUERY_PATTERNS.
+    Mengembalikan True jika semuanya aman.
+    """
+    with open(rules_path, "r", encoding="utf-8") as f:
+        rules = parse_rules(f.read())
+    ok = True
+    for path, order_by in check_indexes(rules):
+        print(f"  TANPA INDEX   {path} orderBy {order_by}")
+        ok = False
+    for path, field in sorted(scan_app_queries() - set(QUERY_PATTERNS)):
+        print(f"  BELUM DIDEKLARASIKAN   {path} orderByChild(\"{field}\") di aplikasi")
+        ok = False
+    return ok
+
+
+def update_firebase_rules(dry_run=False):
+    """
+    Menginisialisasi Firebase Admin SDK, menggabungkan index dari QUERY_PATTERNS
+    ke aturan (RULES_FILE atau aturan live), lalu memperbaruinya lewat REST.
+    """
+    # Diimpor di sini agar mode --check tetap jalan di mesin tanpa Admin SDK.
+    import firebase_admin
+    from firebase_admin import credentials
+
     service_account_path = os.getenv(SERVICE_ACCOUNT_KEY_ENV_VAR)
 
     if not service_account_path:
@@ -40,14 +174,32 @@ def update_firebase_rules():
 
         print(f"Berhasil menginisialisasi Firebase App.")
 
-        # Baca file aturan
-        with open(RULES_FILE, 'r') as f:
-            rules = json.load(f)
-            print(f"Berhasil membaca aturan dari {RULES_FILE}.")
+        # Admin SDK Python tidak punya API aturan; pakai endpoint REST
+        # /.settings/rules dengan access token dari kredensial yang sama.
+        auth = {"access_token": cred.get_access_token().access_token}
+        with FirebaseClient(DATABASE_URL.rstrip("/")) as client:
+            if os.path.exists(RULES_FILE):
+                with open(RULES_FILE, 'r') as f:
+                    rules = parse_rules(f.read())
+                print(f"Berhasil membaca aturan dari {RULES_FILE}.")
+            else:
+                response = client.get(".settings/rules", params=auth)
+                response.raise_for_status()
+                rules = parse_rules(response.text)
+                print(f"'{RULES_FILE}' tidak ada, memakai aturan yang sedang aktif di server.")
+
+            missing = check_indexes(rules)
+            merged = merge_indexes(rules, required_indexes())
+            for path, order_by in missing:
+                print(f"  + index {path} orderBy {order_by}")
+            if not missing:
+                print("Semua pola query sudah ter-index.")
+            if dry_run:
+                print(json.dumps(merged, indent=2))
+                return
 
-        # Dapatkan referensi ke root database dan perbarui aturan
-        ref = db.reference('/')
-        ref.update_rules(rules)
+            response = client.request("PUT", ".settings/rules", merged, params=auth)
+            response.raise_for_status()
 
         print("\n>>> Aturan Firebase Realtime Database berhasil diperbarui! <<<")
         print("Silakan periksa Firebase Console Anda untuk memverifikasi perubahan.")
@@ -59,4 +211,22 @@ def update_firebase_rules():
         print(f"Terjadi error: {e}")
 
 if __name__ == "__main__":
-    update_firebase_rules()
+    parser = argparse.ArgumentParser(
+        description="Gabungkan .indexOn dari QUERY_PATTERNS ke aturan database lalu deploy.")
+    parser.add_argument("--check", action="store_true",
+                        help="cek offline: pola query yang berjalan tanpa index (tanpa deploy)")
+    parser.add_argument("--rules-file", help="file aturan untuk --check "
+                        f"(default: {RULES_FILE}, atau {LIVE_RULES_SNAPSHOT} jika tidak ada)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="tampilkan aturan hasil gabungan tanpa deploy")
+    args = parser.parse_args()
+
+    if args.check:
+        rules_path = args.rules_file or (RULES_FILE if os.path.exists(RULES_FILE) else LIVE_RULES_SNAPSHOT)
+        print(f"Memeriksa index di '{rules_path}':")
+        if check_offline(rules_path):
+            print("Semua pola query ter-index.")
+        else:
+            sys.exit(1)
+    else:
+        update_firebase_rules(args.dry_run)
@@ -1,6 +1,12 @@
-import requests
+import argparse
 import json
 
+from chunked_upload import (DEFAULT_CHECKPOINT_PATH, DEFAULT_MAX_CHUNK_BYTES, file_fingerprint,
+                            print_upload_stats, upload_chunked)
+from firebase_client import FirebaseClient
+from geo_index import with_geo_index
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
+
 # ==============================================================================
 #                      SKRIP UNGGAH DATABASE LENGKAP
 # ==============================================================================
@@ -14,8 +20,12 @@ FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
 # Path ke file JSON yang akan diunggah.
 JSON_FILE_PATH = "umkm.json"
 
-def upload_database():
-    """Membaca file JSON lokal dan mengunggahnya ke Firebase, menimpa semua data."""
+def upload_database(chunked=False, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                    checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """
+    Membaca file JSON lokal dan mengunggahnya ke Firebase, menimpa semua data.
+    Dengan `chunked=True`, data dikirim bertahap dan paralel (lihat chunked_upload.py).
+    """
     
     print("===================================================")
     print("   Memulai Proses Unggah Database ke Firebase    ")
@@ -23,8 +33,13 @@ def upload_database():
     
     # Langkah 1: Baca data dari file JSON lokal
     try:
-        with open(JSON_FILE_PATH, 'r') as f:
-            data_to_upload = json.load(f)
+        with phase("read"), open(JSON_FILE_PATH, 'r') as f:
+            raw_data = f.read()
+        with phase("parse"):
+            data_to_upload = json.loads(raw_data)
+        with phase("transform"):
+            # geo_index dibangun dari 'umkm' agar ikut terunggah.
+            data_to_upload = with_geo_index(data_to_upload)
         print(f"Berhasil membaca data dari '{JSON_FILE_PATH}'.")
     except FileNotFoundError:
         print(f"ERROR: File '{JSON_FILE_PATH}' tidak ditemukan.")
@@ -37,21 +52,33 @@ def upload_database():
 
     # Langkah 2: Kirim data ke Firebase menggunakan permintaan PUT
     # Permintaan PUT ke root URL akan menimpa seluruh database.
-    url = f"{FIREBASE_URL}/.json"
-    print(f"\nMengirim data ke: {url}")
-    print("PERINGATAN: Operasi ini akan menimpa semua data yang ada di Firebase.")
+    # Klien dibuka sebagai context manager supaya session tertutup juga saat
+    # pengguna membatalkan.
+    with FirebaseClient(FIREBASE_URL) as client:
+        url = client.url()
+        print(f"\nMengirim data ke: {url}")
+        print("PERINGATAN: Operasi ini akan menimpa semua data yang ada di Firebase.")
     
-    # Konfirmasi dari pengguna sebelum melanjutkan
-    confirmation = input("Apakah Anda yakin ingin melanjutkan? (y/n): ")
-    if confirmation.lower() != 'y':
-        print("\nProses dibatalkan oleh pengguna.")
-        return
+        # Konfirmasi dari pengguna sebelum melanjutkan
+        confirmation = input("Apakah Anda yakin ingin melanjutkan? (y/n): ")
+        if confirmation.lower() != 'y':
+            print("\nProses dibatalkan oleh pengguna.")
+            return
         
-    print("\nMelanjutkan proses unggah...")
-    response = requests.put(url, data=json.dumps(data_to_upload))
+        print("\nMelanjutkan proses unggah...")
+        with phase("upload"):
+            if chunked:
+                fingerprint = file_fingerprint(JSON_FILE_PATH, max_chunk_bytes)
+                stats = upload_chunked(client, data_to_upload, fingerprint,
+                                       max_chunk_bytes, checkpoint_path)
+                print_upload_stats(stats)
+                success = stats["failed"] == 0
+            else:
+                response = client.put("", data_to_upload)
+                success = response.status_code == 200
     
     # Langkah 3: Periksa hasil respons
-    if response.status_code == 200:
+    if success:
         print("\n=============================================")
         print("   BERHASIL! Database telah diperbarui.      ")
         print("=============================================")
@@ -60,8 +87,12 @@ def upload_database():
         print("\n=============================================")
         print(f"   GAGAL! Terjadi kesalahan saat mengunggah. ")
         print("=============================================")
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.text}")
+        if chunked:
+            print(f"Potongan yang belum selesai tercatat di '{checkpoint_path}'.")
+            print("Jalankan ulang perintah yang sama untuk melanjutkan.")
+        else:
+            print(f"Status Code: {response.status_code}")
+            print(f"Response: {response.text}")
 
 
 # ==============================================================================
@@ -69,7 +100,21 @@ def upload_database():
 # ==============================================================================
 
 if __name__ == "__main__":
-    upload_database()
+    parser = argparse.ArgumentParser(description=f"Unggah '{JSON_FILE_PATH}' ke Firebase.")
+    parser.add_argument("--chunked", action="store_true",
+                        help="unggah bertahap & paralel, bisa dilanjutkan jika terputus")
+    parser.add_argument("--max-chunk-bytes", type=int, default=DEFAULT_MAX_CHUNK_BYTES,
+                        help=f"anggaran byte per potongan (default: {DEFAULT_MAX_CHUNK_BYTES})")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"file checkpoint (default: {DEFAULT_CHECKPOINT_PATH})")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        upload_database(args.chunked, args.max_chunk_bytes, args.checkpoint)
+    finally:
+        finish_profiling(args)
 
 # ==============================================================================
 # CARA MENJALANKAN SKRIP INI:
@@ -79,4 +124,6 @@ if __name__ == "__main__":
 # 3. Tempatkan skrip ini di direktori yang sama dengan file 'umkm.json'.
 # 4. Jalankan skrip ini dari terminal: python upload_database.py
 # 5. Anda akan diminta konfirmasi sebelum data diunggah. Ketik 'y' lalu Enter.
+# 6. Untuk database besar, gunakan: python upload_database.py --chunked
+#    Jika terputus, jalankan ulang perintah yang sama untuk melanjutkan.
 # ==============================================================================
@@ -1,6 +1,11 @@
-import requests
+import argparse
 import json
-import sys
+
+from chunked_upload import (DEFAULT_CHECKPOINT_PATH, DEFAULT_MAX_CHUNK_BYTES, file_fingerprint,
+                            print_upload_stats, upload_chunked)
+from firebase_client import FirebaseClient
+from geo_index import with_geo_index
+from profiling import add_profile_arguments, finish_profiling, phase, start_profiling
 
 # ==============================================================================
 #             SKRIP UNGGAH FILE JSON SPESIFIK KE FIREBASE
@@ -13,8 +18,12 @@ import sys
 # URL root database Firebase Anda.
 FIREBASE_URL = "https://final-ca080-default-rtdb.firebaseio.com"
 
-def upload_database(json_file_path):
-    """Membaca file JSON yang ditentukan dan mengunggahnya ke Firebase."""
+def upload_database(json_file_path, chunked=False, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                    checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """
+    Membaca file JSON yang ditentukan dan mengunggahnya ke Firebase.
+    Dengan `chunked=True`, data dikirim bertahap dan paralel (lihat chunked_upload.py).
+    """
     
     print("===================================================")
     print("   Memulai Proses Unggah Database ke Firebase    ")
@@ -22,8 +31,13 @@ def upload_database(json_file_path):
     
     # Langkah 1: Baca data dari file JSON lokal
     try:
-        with open(json_file_path, 'r') as f:
-            data_to_upload = json.load(f)
+        with phase("read"), open(json_file_path, 'r') as f:
+            raw_data = f.read()
+        with phase("parse"):
+            data_to_upload = json.loads(raw_data)
+        with phase("transform"):
+            # geo_index dibangun dari 'umkm' agar ikut terunggah.
+            data_to_upload = with_geo_index(data_to_upload)
         print(f"Berhasil membaca data dari '{json_file_path}'.")
     except FileNotFoundError:
         print(f"ERROR: File '{json_file_path}' tidak ditemukan.")
@@ -33,21 +47,33 @@ def upload_database(json_file_path):
         return
 
     # Langkah 2: Kirim data ke Firebase menggunakan permintaan PUT
-    url = f"{FIREBASE_URL}/.json"
-    print(f"\nMengirim data ke: {url}")
-    print("PERINGATAN: Operasi ini akan menimpa semua data yang ada di Firebase.")
+    # Klien dibuka sebagai context manager supaya session tertutup juga saat
+    # pengguna membatalkan.
+    with FirebaseClient(FIREBASE_URL) as client:
+        url = client.url()
+        print(f"\nMengirim data ke: {url}")
+        print("PERINGATAN: Operasi ini akan menimpa semua data yang ada di Firebase.")
     
-    # Konfirmasi dari pengguna
-    confirmation = input("Apakah Anda yakin ingin melanjutkan? (y/n): ")
-    if confirmation.lower() != 'y':
-        print("\nProses dibatalkan oleh pengguna.")
-        return
+        # Konfirmasi dari pengguna
+        confirmation = input("Apakah Anda yakin ingin melanjutkan? (y/n): ")
+        if confirmation.lower() != 'y':
+            print("\nProses dibatalkan oleh pengguna.")
+            return
         
-    print("\nMelanjutkan proses unggah...")
-    response = requests.put(url, data=json.dumps(data_to_upload))
+        print("\nMelanjutkan proses unggah...")
+        with phase("upload"):
+            if chunked:
+                fingerprint = file_fingerprint(json_file_path, max_chunk_bytes)
+                stats = upload_chunked(client, data_to_upload, fingerprint,
+                                       max_chunk_bytes, checkpoint_path)
+                print_upload_stats(stats)
+                success = stats["failed"] == 0
+            else:
+                response = client.put("", data_to_upload)
+                success = response.status_code == 200
     
     # Langkah 3: Periksa hasil respons
-    if response.status_code == 200:
+    if success:
         print("\n=============================================")
         print("   BERHASIL! Database telah diperbarui.      ")
         print("=============================================")
@@ -55,17 +81,32 @@ def upload_database(json_file_path):
         print("\n=============================================")
         print(f"   GAGAL! Terjadi kesalahan saat mengunggah. ")
         print("=============================================")
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.text}")
+        if chunked:
+            print(f"Potongan yang belum selesai tercatat di '{checkpoint_path}'.")
+            print("Jalankan ulang perintah yang sama untuk melanjutkan.")
+        else:
+            print(f"Status Code: {response.status_code}")
+            print(f"Response: {response.text}")
 
 # ==============================================================================
 # EKSEKUSI SKRIP
 # ==============================================================================
 if __name__ == "__main__":
-    # Pastikan nama file diberikan sebagai argumen command-line
-    if len(sys.argv) < 2:
-        print("Cara penggunaan: python upload_to_firebase.py <nama_file_json>")
-        print("Contoh: python upload_to_firebase.py database_with_balance.json")
-    else:
-        file_path = sys.argv[1]
-        upload_database(file_path)
+    parser = argparse.ArgumentParser(
+        description="Unggah file JSON ke Firebase (menimpa seluruh database).",
+        epilog="Contoh: python upload_to_firebase.py database_with_balance.json --chunked")
+    parser.add_argument("json_file", help="file JSON yang akan diunggah")
+    parser.add_argument("--chunked", action="store_true",
+                        help="unggah bertahap & paralel, bisa dilanjutkan jika terputus")
+    parser.add_argument("--max-chunk-bytes", type=int, default=DEFAULT_MAX_CHUNK_BYTES,
+                        help=f"anggaran byte per potongan (default: {DEFAULT_MAX_CHUNK_BYTES})")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"file checkpoint (default: {DEFAULT_CHECKPOINT_PATH})")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args)
+
+    try:
+        upload_database(args.json_file, args.chunked, args.max_chunk_bytes, args.checkpoint)
+    finally:
+        finish_profiling(args)